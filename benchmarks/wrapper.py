@@ -0,0 +1,246 @@
+# Benchmark the overhead of the sensible wrapper around a BMI component.
+#
+# Run from the root of the repository, with sensible_bmi either installed or
+# on the path, with:
+#
+#     PYTHONPATH=src python -m benchmarks.wrapper --sizes 1000 100000
+#
+# Each benchmark is timed against a synthetic, in-memory component (see
+# testing.synthetic_bmi) so that what is measured is the cost of the
+# wrapper and of moving data, not of the model.
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+from sensible_bmi._grid import sensible_grid
+from sensible_bmi._version import __version__
+from sensible_bmi.sensible_bmi import make_sensible
+from sensible_bmi.sensible_bmi import SensibleBmi
+
+from testing.synthetic_bmi import GRID_TYPES
+from testing.synthetic_bmi import synthetic_bmi
+
+DEFAULT_SIZES = (1_000, 100_000, 10_000_000)
+
+
+def timeit(func: Callable[[], Any], repeat: int = 5, number: int = 1) -> list[float]:
+    """Time a function, returning the time per call of each repetition."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        times.append((time.perf_counter() - start) / number)
+    return times
+
+
+def summarize(name: str, times: list[float], **kwds: Any) -> dict[str, Any]:
+    return {
+        "name": name,
+        **kwds,
+        "repeat": len(times),
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "max": max(times),
+        "times": times,
+    }
+
+
+def initialized(cls: type[SensibleBmi], where: str, eager: bool = False) -> SensibleBmi:
+    sensible = cls()
+    sensible.initialize(where=where, eager=eager)
+    return sensible
+
+
+def bench_initialize(
+    cls: type[SensibleBmi], where: str, repeat: int
+) -> list[dict[str, Any]]:
+    results = []
+    for eager in (False, True):
+        components: list[SensibleBmi] = []
+
+        def run(_eager: bool = eager) -> None:
+            components.append(initialized(cls, where, eager=_eager))
+
+        times = timeit(run, repeat=repeat)
+        for component in components:
+            component.finalize()
+        results.append(summarize("initialize", times, eager=eager))
+    return results
+
+
+def bench_grids(sensible: SensibleBmi, repeat: int) -> list[dict[str, Any]]:
+    results = []
+    for grid_id, grid_type in enumerate(GRID_TYPES):
+        times = timeit(lambda _id=grid_id: sensible_grid(sensible.bmi, _id), repeat)
+        results.append(summarize("sensible_grid", times, grid=grid_type))
+
+        arrays = {
+            "uniform_rectilinear": ("x_of_node", "y_of_node"),
+            "rectilinear": ("x_of_node", "y_of_node"),
+            "structured_quadrilateral": ("x_of_node", "y_of_node"),
+            "points": ("x_of_node", "y_of_node"),
+            "unstructured": (
+                "x_of_node",
+                "y_of_node",
+                "edge_nodes",
+                "face_nodes",
+                "face_edges",
+            ),
+        }[grid_type]
+
+        def fetch(_id: int = grid_id, _arrays: Sequence[str] = arrays) -> None:
+            grid = sensible_grid(sensible.bmi, _id)
+            for array in _arrays:
+                getattr(grid, array)
+
+        times = timeit(fetch, repeat)
+        results.append(summarize("sensible_grid_arrays", times, grid=grid_type))
+    return results
+
+
+def bench_vars(sensible: SensibleBmi, repeat: int, number: int) -> list[dict[str, Any]]:
+    out_var = sensible.var["unstructured__out_0"]
+    in_var = sensible.var["unstructured__in_0"]
+    buffer = out_var.empty()
+    values = in_var.ones()
+
+    cases: dict[str, Callable[[], Any]] = {
+        "bmi.get_value": lambda: sensible.bmi.get_value(out_var.name, buffer),
+        "get": out_var.get,
+        "get_out": lambda: out_var.get(out=buffer),
+        "get_recycle": lambda: out_var.release(out_var.get(recycle=True)),
+        "data": lambda: out_var.data,
+        "bmi.set_value": lambda: sensible.bmi.set_value(in_var.name, values),
+        "set": lambda: in_var.set(values),
+        "set_scalar": lambda: in_var.set(1.0),
+    }
+    return [
+        summarize(
+            name, timeit(func, repeat=repeat, number=number), nbytes=buffer.nbytes
+        )
+        for name, func in cases.items()
+    ]
+
+
+def bench_update(
+    sensible: SensibleBmi, repeat: int, n_steps: int
+) -> list[dict[str, Any]]:
+    def loop(update: Callable[[], Any]) -> Callable[[], None]:
+        def run() -> None:
+            for _ in range(n_steps):
+                update()
+
+        return run
+
+    def in_session() -> None:
+        with sensible.session():
+            for _ in range(n_steps):
+                sensible.update()
+
+    def run_until() -> None:
+        sensible.run_until(sensible.time.current + n_steps)
+
+    cases: dict[str, Callable[[], Any]] = {
+        "bmi.update": loop(sensible.bmi.update),
+        "update": loop(sensible.update),
+        "update_session": in_session,
+        "run_until": run_until,
+    }
+    return [
+        summarize(name, timeit(func, repeat=repeat), n_steps=n_steps)
+        for name, func in cases.items()
+    ]
+
+
+def run_benchmarks(
+    sizes: Sequence[int], repeat: int = 5, number: int = 10, n_steps: int = 1000
+) -> dict[str, Any]:
+    results = []
+    with tempfile.TemporaryDirectory() as where:
+        for n_nodes in sizes:
+            cls = make_sensible("Synthetic", synthetic_bmi(n_nodes))
+
+            size_results = bench_initialize(cls, where, repeat)
+
+            sensible = initialized(cls, where)
+            size_results += bench_grids(sensible, repeat)
+            size_results += bench_vars(sensible, repeat, number)
+            size_results += bench_update(sensible, repeat, n_steps)
+            sensible.finalize()
+
+            results += [
+                {"n_nodes": sensible.bmi.get_grid_node_count(0)} | result
+                for result in size_results
+            ]
+            print(f"finished benchmarks for {n_nodes} nodes", file=sys.stderr)
+
+    return {
+        "meta": {
+            "sensible_bmi": __version__,
+            "numpy": np.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        },
+        "benchmarks": results,
+    }
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the overhead of the sensible wrapper around a BMI component."
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=lambda s: int(float(s)),
+        default=DEFAULT_SIZES,
+        help="number of grid nodes of the synthetic components",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="number of times to repeat each timing"
+    )
+    parser.add_argument(
+        "--number",
+        type=int,
+        default=10,
+        help="number of calls per repetition for variable get/set",
+    )
+    parser.add_argument(
+        "--steps", type=int, default=1000, help="number of steps in update loops"
+    )
+    parser.add_argument(
+        "--output", "-o", default="-", help="file to write JSON results to"
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        args.sizes, repeat=args.repeat, number=args.number, n_steps=args.steps
+    )
+
+    if args.output == "-":
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as fp:
+            json.dump(results, fp, indent=2)
+        print(f"wrote benchmark results to {args.output}", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
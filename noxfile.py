@@ -52,6 +52,22 @@ def test(session: nox.Session) -> None:
     session.run("coverage", "xml", "-o", "coverage.xml")
 
 
+@nox.session
+def benchmark(session: nox.Session) -> None:
+    """Benchmark the wrapper layer (options are passed to benchmarks.wrapper)."""
+    session.install("-r", "requirements.in")
+    # the benchmarks import sensible_bmi, so it must be installed (or src must
+    # be on PYTHONPATH) when running benchmarks.wrapper outside of this session
+    session.install(".")
+
+    session.run(
+        "python",
+        "-m",
+        "benchmarks.wrapper",
+        *(session.posargs or ("--output", "benchmarks.json")),
+    )
+
+
 @nox.session
 def lint(session: nox.Session) -> None:
     """Look for lint."""
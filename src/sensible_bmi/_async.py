@@ -0,0 +1,407 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+import threading
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Mapping
+from collections.abc import MutableMapping
+from concurrent.futures import Executor
+from concurrent.futures import ThreadPoolExecutor
+from types import TracebackType
+from typing import Any
+from typing import TypeVar
+
+from numpy.typing import ArrayLike
+from numpy.typing import NDArray
+from sensible_bmi._errors import SensibleError
+from sensible_bmi._grid import SensibleGrid
+from sensible_bmi._time import SensibleTime
+from sensible_bmi._utils import LazyMapping
+from sensible_bmi._var import SensibleInputVar
+from sensible_bmi._var import SensibleOutputVar
+from sensible_bmi._var import SensibleVar
+from sensible_bmi.sensible_bmi import SensibleBmi
+
+T = TypeVar("T")
+
+MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def default_executor() -> ThreadPoolExecutor:
+    """The thread pool shared by asynchronous components by default.
+
+    The pool is created the first time it is needed and has at most
+    :data:`MAX_WORKERS` threads.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=MAX_WORKERS, thread_name_prefix="sensible-bmi"
+            )
+        return _executor
+
+
+class AsyncSensibleVar:
+    """A component variable whose values are moved without blocking.
+
+    Descriptive attributes (name, units, etc.) are read directly while
+    getting and setting values are coroutines that run on the component's
+    executor.
+    """
+
+    def __init__(self, component: AsyncSensibleBmi, var: SensibleVar):
+        self._component = component
+        self._var = var
+
+    @property
+    def sync(self) -> SensibleVar:
+        """The underlying (blocking) variable."""
+        return self._var
+
+    @property
+    def name(self) -> str:
+        return self._var.name
+
+    @property
+    def units(self) -> str:
+        return self._var.units
+
+    @property
+    def location(self) -> str | None:
+        return self._var.location
+
+    @property
+    def grid(self) -> int | None:
+        return self._var.grid
+
+    @property
+    def type(self) -> str:
+        return self._var.type
+
+    @property
+    def itemsize(self) -> int:
+        return self._var.itemsize
+
+    @property
+    def nbytes(self) -> int:
+        return self._var.nbytes
+
+    @property
+    def size(self) -> int:
+        return self._var.size
+
+    @property
+    def is_input(self) -> bool:
+        return isinstance(self._var, SensibleInputVar)
+
+    @property
+    def is_output(self) -> bool:
+        return isinstance(self._var, SensibleOutputVar)
+
+    def empty(self) -> NDArray[Any]:
+        return self._var.empty()
+
+    async def get(self, out: NDArray[Any] | None = None) -> NDArray[Any]:
+        """Get a copy of the variable's values (see :meth:`SensibleOutputVar.get`)."""
+        return await self._component._call(self._output().get, out=out)
+
+    async def get_at(
+        self, indices: Any, out: NDArray[Any] | None = None
+    ) -> NDArray[Any]:
+        """Get the values at particular elements (see :meth:`SensibleOutputVar.get_at`)."""
+        return await self._component._call(self._output().get_at, indices, out=out)
+
+    async def set(self, values: ArrayLike) -> None:
+        """Set the variable's values (see :meth:`SensibleInputVar.set`)."""
+        await self._component._call(self._input().set, values)
+
+    async def set_at(self, indices: Any, values: ArrayLike) -> None:
+        """Set the values at particular elements (see :meth:`SensibleInputVar.set_at`)."""
+        await self._component._call(self._input().set_at, indices, values)
+
+    def _output(self) -> SensibleOutputVar:
+        if not isinstance(self._var, SensibleOutputVar):
+            raise SensibleError(f"{self.name!r}: not an output variable")
+        return self._var
+
+    def _input(self) -> SensibleInputVar:
+        if not isinstance(self._var, SensibleInputVar):
+            raise SensibleError(f"{self.name!r}: not an input variable")
+        return self._var
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._component!r}, {self.name!r})"
+
+
+class AsyncSensibleGrid:
+    """A component grid whose arrays are fetched without blocking.
+
+    The grid's id, rank and type are read directly while its other
+    attributes, which may have to be fetched from the component, are got
+    with :meth:`get`, a coroutine that runs on the component's executor.
+    """
+
+    def __init__(self, component: AsyncSensibleBmi, grid: SensibleGrid):
+        self._component = component
+        self._grid = grid
+
+    @property
+    def sync(self) -> SensibleGrid:
+        """The underlying (blocking) grid."""
+        return self._grid
+
+    @property
+    def id(self) -> int:
+        return self._grid.id
+
+    @property
+    def rank(self) -> int:
+        return self._grid.rank
+
+    @property
+    def type(self) -> str:
+        return self._grid.type
+
+    async def get(self, name: str) -> Any:
+        """Get an attribute of the grid (``"x_of_node"``, ``"shape"``, etc.)."""
+        return await self._component._call(getattr, self._grid, name)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._component!r}, {self.id!r})"
+
+
+class AsyncSensibleTime:
+    """Time information about a component.
+
+    The start, stop and step of a component don't change and so are read
+    directly, while the current time is got with :meth:`current`, a
+    coroutine that runs on the component's executor.
+    """
+
+    def __init__(self, component: AsyncSensibleBmi, time: SensibleTime):
+        self._component = component
+        self._time = time
+
+    @property
+    def units(self) -> str:
+        return self._time.units
+
+    @property
+    def start(self) -> float:
+        return self._time.start
+
+    @property
+    def stop(self) -> float:
+        return self._time.stop
+
+    @property
+    def step(self) -> float:
+        return self._time.step
+
+    async def current(self) -> float:
+        """The component's current time."""
+        return await self._component.current_time()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._component!r})"
+
+
+class AsyncSensibleBmi:
+    """Drive a sensible component from asyncio without blocking the event loop.
+
+    Every call into the component runs on an executor, one call at a time
+    for each component. Initializing, updating and finalizing run from
+    within the component's working directory.
+    Calls to different components run concurrently, so many components (or
+    the members of an ensemble) can be stepped together with
+    :func:`asyncio.gather`.
+
+    Parameters
+    ----------
+    component : SensibleBmi or type
+        The component to drive or a sensible class (see :func:`make_sensible`),
+        in which case a new instance is created.
+    executor : Executor, optional
+        The executor on which calls run. By default, a thread pool shared by
+        all asynchronous components (see :func:`default_executor`).
+
+    Notes
+    -----
+    Components run in threads and so change into their working directories
+    through :func:`~sensible_bmi._utils.as_cwd`: components that run in the
+    same directory step in parallel while those in different directories
+    take turns. Getting and setting variables doesn't change directory and
+    so never waits for other components.
+    """
+
+    def __init__(
+        self,
+        component: SensibleBmi | type[SensibleBmi],
+        executor: Executor | None = None,
+    ):
+        if isinstance(component, type):
+            component = component()
+        self._sensible = component
+        self._executor = executor
+        self._serial = asyncio.Lock()
+        self._var: LazyMapping[str, AsyncSensibleVar] | None = None
+        self._grid: LazyMapping[int, AsyncSensibleGrid] | None = None
+
+    @property
+    def sync(self) -> SensibleBmi:
+        """The underlying (blocking) component."""
+        return self._sensible
+
+    @property
+    def executor(self) -> Executor:
+        return default_executor() if self._executor is None else self._executor
+
+    async def _call(self, func: Callable[..., T], *args: Any, **kwds: Any) -> T:
+        """Run a blocking call on the executor, one at a time for the component.
+
+        Calls that need the component's working directory (initialize,
+        update, run_until and finalize) change into it themselves, so other
+        calls don't have to wait for components in other directories.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._serial:
+            return await loop.run_in_executor(
+                self.executor, functools.partial(func, *args, **kwds)
+            )
+
+    async def initialize(
+        self,
+        filepath: str | None = None,
+        where: str | None = ".",
+        **kwds: Any,
+    ) -> None:
+        """Initialize the component (see :meth:`SensibleBmi.initialize`).
+
+        The component's variables and grids are described as part of
+        initializing so that :attr:`var` and :attr:`grid` never have to call
+        into the component.
+        """
+
+        def initialize() -> None:
+            self._sensible.initialize(filepath, where=where, **kwds)
+            with self._sensible.session():
+                self._sensible.var.load()
+                self._sensible.grid.load()
+
+        loop = asyncio.get_running_loop()
+        async with self._serial:
+            await loop.run_in_executor(self.executor, initialize)
+        self._var = LazyMapping(
+            self._sensible.var,
+            lambda name: AsyncSensibleVar(self, self._sensible.var[name]),
+        )
+        self._grid = LazyMapping(
+            self._sensible.grid,
+            lambda grid: AsyncSensibleGrid(self, self._sensible.grid[grid]),
+        )
+
+    async def update(self) -> None:
+        """Update the component by a single time step."""
+        await self._call(self._sensible.update)
+
+    async def run_until(
+        self,
+        time: float,
+        every: float | None = None,
+        callback: Callable[[SensibleBmi], Any] | None = None,
+    ) -> None:
+        """Update the component until some time (see :meth:`SensibleBmi.run_until`).
+
+        Note that *callback* is called, with the underlying component, from
+        the executor rather than from the event loop.
+        """
+        await self._call(
+            functools.partial(
+                self._sensible.run_until, time, every=every, callback=callback
+            )
+        )
+
+    async def get_many(
+        self,
+        names: Iterable[str],
+        out: MutableMapping[str, NDArray[Any]] | None = None,
+    ) -> MutableMapping[str, NDArray[Any]]:
+        """Get the values of several output variables (see :meth:`SensibleBmi.get_many`)."""
+        return await self._call(self._sensible.get_many, names, out=out)
+
+    async def set_many(self, values: Mapping[str, ArrayLike]) -> None:
+        """Set the values of several input variables (see :meth:`SensibleBmi.set_many`)."""
+        await self._call(self._sensible.set_many, values)
+
+    async def current_time(self) -> float:
+        """The component's current time."""
+        return await self._call(self._sensible.bmi.get_current_time)
+
+    async def finalize(self) -> None:
+        """Finalize the component (see :meth:`SensibleBmi.finalize`)."""
+        loop = asyncio.get_running_loop()
+        async with self._serial:
+            await loop.run_in_executor(self.executor, self._sensible.finalize)
+        self._var = None
+        self._grid = None
+
+    def _not_initialized(self, name: str) -> SensibleError:
+        return SensibleError(
+            f"`{self.__class__.__name__}.{name}` is not available until"
+            " this component has been initialized."
+            " Did you forget to run initialize?"
+        )
+
+    @property
+    def var(self) -> Mapping[str, AsyncSensibleVar]:
+        """The component's input and output variables."""
+        if self._var is None:
+            raise self._not_initialized("var")
+        return self._var
+
+    @property
+    def grid(self) -> Mapping[int, AsyncSensibleGrid]:
+        """The component's grids."""
+        if self._grid is None:
+            raise self._not_initialized("grid")
+        return self._grid
+
+    @property
+    def name(self) -> str:
+        return self._sensible.name
+
+    @property
+    def time(self) -> AsyncSensibleTime:
+        """Time information about the component."""
+        if self._var is None:
+            raise self._not_initialized("time")
+        return AsyncSensibleTime(self, self._sensible.time)
+
+    @property
+    def input_var_names(self) -> frozenset[str]:
+        return self._sensible.input_var_names
+
+    @property
+    def output_var_names(self) -> frozenset[str]:
+        return self._sensible.output_var_names
+
+    async def __aenter__(self) -> AsyncSensibleBmi:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.finalize()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._sensible.__class__.__name__})"
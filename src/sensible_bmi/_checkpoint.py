@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from collections.abc import Callable
+from collections.abc import Iterable
+from typing import Any
+from typing import NamedTuple
+
+import numpy as np
+from numpy.typing import NDArray
+from sensible_bmi._errors import SensibleError
+from sensible_bmi._var import SensibleVar
+
+MAGIC = b"SBMICKPT"
+VERSION = 2
+ALIGN = 64
+
+_HEADER = np.dtype(
+    [
+        ("magic", "S8"),
+        ("version", "<u4"),
+        ("complete", "<u4"),
+        ("generation", "<u8"),
+        ("time", "<f8"),
+        ("count", "<u8"),
+        ("names_nbytes", "<u8"),
+        ("data_offset", "<u8"),
+        ("data_nbytes", "<u8"),
+    ]
+)
+_ENTRY = np.dtype(
+    [
+        ("offset", "<u8"),
+        ("nbytes", "<u8"),
+        ("name_offset", "<u8"),
+        ("name_nbytes", "<u8"),
+        ("dtype", "S8"),
+        ("digest", "u1", (16,)),
+    ]
+)
+
+
+class _Layout(NamedTuple):
+    names: tuple[str, ...]
+    dtypes: tuple[str, ...]
+    offsets: tuple[int, ...]
+    nbytes: tuple[int, ...]
+    names_blob: bytes
+    meta_nbytes: int
+    data_offset: int
+    data_nbytes: int
+
+
+def _round_up(n: int, align: int = ALIGN) -> int:
+    return -(-n // align) * align
+
+
+def _layout(variables: Iterable[SensibleVar]) -> _Layout:
+    names, dtypes, offsets, nbytes = [], [], [], []
+    end = 0
+    for var in variables:
+        names.append(var.name)
+        dtypes.append(np.dtype(var.type).str)
+        offsets.append(end)
+        nbytes.append(var.nbytes)
+        end += _round_up(var.nbytes)
+    names_blob = "".join(names).encode()
+    meta_nbytes = _round_up(
+        _HEADER.itemsize + _ENTRY.itemsize * len(names) + len(names_blob)
+    )
+    return _Layout(
+        tuple(names),
+        tuple(dtypes),
+        tuple(offsets),
+        tuple(nbytes),
+        names_blob,
+        meta_nbytes,
+        2 * meta_nbytes,
+        end,
+    )
+
+
+def _digest(values: NDArray[Any]) -> bytes:
+    return hashlib.blake2b(values.data, digest_size=16).digest()
+
+
+def _header(
+    time: float, layout: _Layout, complete: bool, generation: int
+) -> NDArray[Any]:
+    return np.array(
+        [
+            (
+                MAGIC,
+                VERSION,
+                int(complete),
+                generation,
+                time,
+                len(layout.names),
+                len(layout.names_blob),
+                layout.data_offset,
+                layout.data_nbytes,
+            )
+        ],
+        dtype=_HEADER,
+    )
+
+
+def _index(
+    layout: _Layout, digests: list[bytes], offsets: Iterable[int]
+) -> NDArray[Any]:
+    index = np.zeros(len(layout.names), dtype=_ENTRY)
+    index["offset"] = list(offsets)
+    index["nbytes"] = layout.nbytes
+    index["name_nbytes"] = [len(name.encode()) for name in layout.names]
+    index["name_offset"][1:] = np.cumsum(index["name_nbytes"])[:-1]
+    index["dtype"] = [dtype.encode() for dtype in layout.dtypes]
+    index["digest"] = np.frombuffer(b"".join(digests), dtype=np.uint8).reshape((-1, 16))
+    return index
+
+
+def _read_index(fp: Any) -> tuple[NDArray[Any], NDArray[Any], tuple[str, ...]]:
+    buffer = fp.read(_HEADER.itemsize)
+    if len(buffer) != _HEADER.itemsize or not buffer.startswith(MAGIC):
+        raise SensibleError(f"{fp.name}: not a checkpoint")
+    header = np.frombuffer(buffer, dtype=_HEADER)
+    if header["version"][0] != VERSION:
+        raise SensibleError(
+            f"{fp.name}: unsupported checkpoint version ({header['version'][0]})"
+        )
+    count = int(header["count"][0])
+    buffer = fp.read(_ENTRY.itemsize * count)
+    names_blob = fp.read(int(header["names_nbytes"][0]))
+    if len(buffer) != _ENTRY.itemsize * count or len(names_blob) != int(
+        header["names_nbytes"][0]
+    ):
+        raise SensibleError(f"{fp.name}: checkpoint is truncated")
+    index = np.frombuffer(buffer, dtype=_ENTRY)
+    names = tuple(
+        names_blob[start : start + size].decode()
+        for start, size in zip(index["name_offset"], index["name_nbytes"])
+    )
+    return header, index, names
+
+
+def _read_slots(
+    fp: Any,
+) -> list[tuple[int, NDArray[Any], NDArray[Any], tuple[str, ...]]]:
+    """Read the index of each of the checkpoint's two slots.
+
+    Returns
+    -------
+    list of tuple
+        For each slot that can be read: its number, header, index and names.
+    """
+    header, index, names = _read_index(fp)
+    slots = [(0, header, index, names)]
+
+    fp.seek(int(header["data_offset"][0]) // 2)
+    try:
+        slots.append((1, *_read_index(fp)))
+    except SensibleError:
+        pass
+    return slots
+
+
+def _latest(
+    slots: list[tuple[int, NDArray[Any], NDArray[Any], tuple[str, ...]]],
+) -> tuple[int, NDArray[Any], NDArray[Any], tuple[str, ...]] | None:
+    """The complete slot with the highest generation, if there is one."""
+    complete = [slot for slot in slots if slot[1]["complete"][0]]
+    if not complete:
+        return None
+    return max(complete, key=lambda slot: int(slot[1]["generation"][0]))
+
+
+def _fsync(fp: Any) -> None:
+    fp.flush()
+    os.fsync(fp.fileno())
+
+
+def write_checkpoint(
+    path: str | os.PathLike[str],
+    time: float,
+    variables: Iterable[SensibleVar],
+    get_value: Callable[[str, NDArray[Any]], Any],
+    incremental: bool = False,
+) -> int:
+    """Write the values of variables to a checkpoint file.
+
+    The values are gathered into a single buffer, laid out as they are in
+    the file, so that they can be written with one call. Each variable's
+    values start on a 64-byte boundary.
+
+    A checkpoint file has two slots, each with its own index, and room for
+    two copies of each variable's values. An incremental write fills the
+    slot that isn't the latest complete checkpoint and writes a variable's
+    values only if they have changed, into the copy that the latest
+    checkpoint doesn't use. The latest complete checkpoint is never
+    modified, so if writing is interrupted it can still be read.
+
+    Parameters
+    ----------
+    path : str or path-like
+        Path to the checkpoint file.
+    time : float
+        The time of the checkpoint.
+    variables : iterable of SensibleVar
+        The variables to write.
+    get_value : callable
+        Function that places the values of a variable (given by name) into
+        a buffer (typically a component's ``get_value``).
+    incremental : bool, optional
+        If ``True`` and *path* is a checkpoint of the same variables, write
+        only the variables whose values have changed since that checkpoint
+        was written. Otherwise, write a new file that then replaces *path*.
+
+    Returns
+    -------
+    int
+        The number of bytes of values that were written.
+    """
+    path = os.fspath(path)
+    layout = _layout(variables)
+
+    data = np.empty(layout.data_nbytes, dtype=np.uint8)
+    digests = []
+    for name, dtype, offset, nbytes in zip(
+        layout.names, layout.dtypes, layout.offsets, layout.nbytes
+    ):
+        values = data[offset : offset + nbytes].view(dtype)
+        get_value(name, values)
+        digests.append(_digest(values))
+
+    if incremental and os.path.isfile(path):
+        with open(path, "r+b") as fp:
+            try:
+                slots = _read_slots(fp)
+            except SensibleError:
+                slots = []
+            latest = _latest(slots)
+            if (
+                len(slots) == 2
+                and latest is not None
+                and _is_same_layout(latest[1], latest[2], latest[3], layout)
+                and os.fstat(fp.fileno()).st_size
+                == layout.data_offset + 2 * layout.data_nbytes
+            ):
+                return _update(fp, time, layout, data, digests, latest)
+
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".ckpt")
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(_header(time, layout, complete=True, generation=1).tobytes())
+            fp.write(_index(layout, digests, layout.offsets).tobytes())
+            fp.write(layout.names_blob)
+            fp.seek(layout.meta_nbytes)
+            fp.write(_header(time, layout, complete=False, generation=0).tobytes())
+            fp.write(_index(layout, digests, layout.offsets).tobytes())
+            fp.write(layout.names_blob)
+            fp.seek(layout.data_offset)
+            fp.write(data.data)
+            fp.truncate(layout.data_offset + 2 * layout.data_nbytes)
+            _fsync(fp)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+    return sum(layout.nbytes)
+
+
+def _is_same_layout(
+    header: NDArray[Any], index: NDArray[Any], names: tuple[str, ...], layout: _Layout
+) -> bool:
+    """Whether a slot of a checkpoint holds the variables of *layout*."""
+    if (
+        names != layout.names
+        or int(header["data_offset"][0]) != layout.data_offset
+        or int(header["data_nbytes"][0]) != layout.data_nbytes
+    ):
+        return False
+    offsets = [
+        offset if offset < layout.data_nbytes else offset - layout.data_nbytes
+        for offset in index["offset"].tolist()
+    ]
+    digests = [digest.tobytes() for digest in index["digest"]]
+    return (
+        offsets == list(layout.offsets)
+        and index.tobytes() == _index(layout, digests, index["offset"]).tobytes()
+    )
+
+
+def _update(
+    fp: Any,
+    time: float,
+    layout: _Layout,
+    data: NDArray[np.uint8],
+    digests: list[bytes],
+    latest: tuple[int, NDArray[Any], NDArray[Any], tuple[str, ...]],
+) -> int:
+    """Write a new checkpoint into the slot not used by the latest one.
+
+    The values of variables that haven't changed are shared with the
+    latest checkpoint. The slot is marked incomplete while it is being
+    written, and complete only once everything else is on disk.
+    """
+    slot, header, index, _ = latest
+    generation = int(header["generation"][0]) + 1
+    meta = (1 - slot) * layout.meta_nbytes
+
+    fp.seek(meta)
+    fp.write(_header(time, layout, complete=False, generation=generation).tobytes())
+    _fsync(fp)
+
+    offsets, written = [], 0
+    for offset, nbytes, digest, entry in zip(
+        layout.offsets, layout.nbytes, digests, index
+    ):
+        if digest == entry["digest"].tobytes():
+            offsets.append(int(entry["offset"]))
+            continue
+        copy = (int(entry["offset"]) + layout.data_nbytes) % (2 * layout.data_nbytes)
+        fp.seek(layout.data_offset + copy)
+        fp.write(data[offset : offset + nbytes])
+        offsets.append(copy)
+        written += nbytes
+
+    fp.seek(meta + _HEADER.itemsize)
+    fp.write(_index(layout, digests, offsets).tobytes())
+    fp.write(layout.names_blob)
+    _fsync(fp)
+
+    fp.seek(meta)
+    fp.write(_header(time, layout, complete=True, generation=generation).tobytes())
+    _fsync(fp)
+
+    return written
+
+
+def read_checkpoint(
+    path: str | os.PathLike[str],
+) -> tuple[float, dict[str, NDArray[Any]]]:
+    """Read a checkpoint file.
+
+    Parameters
+    ----------
+    path : str or path-like
+        Path to the checkpoint file.
+
+    Returns
+    -------
+    time : float
+        The time of the checkpoint.
+    values : dict
+        The values of each variable, keyed by name, as read-only memory
+        maps of the file.
+    """
+    path = os.fspath(path)
+    with open(path, "rb") as fp:
+        latest = _latest(_read_slots(fp))
+    if latest is None:
+        raise SensibleError(f"{path}: checkpoint is incomplete")
+    _, header, index, names = latest
+
+    data_offset = int(header["data_offset"][0])
+    data_nbytes = 2 * int(header["data_nbytes"][0])
+    if os.path.getsize(path) - data_offset < data_nbytes or data_nbytes < int(
+        np.max(index["offset"] + index["nbytes"], initial=0)
+    ):
+        raise SensibleError(f"{path}: checkpoint is truncated")
+
+    data = (
+        np.memmap(path, dtype=np.uint8, mode="r", offset=data_offset)
+        if data_nbytes > 0
+        else np.empty(0, dtype=np.uint8)
+    )
+    values = {}
+    for name, entry in zip(names, index):
+        offset, nbytes = int(entry["offset"]), int(entry["nbytes"])
+        values[name] = data[offset : offset + nbytes].view(entry["dtype"].decode())
+
+    return float(header["time"][0]), values
@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from collections.abc import Iterator
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+from sensible_bmi._errors import SensibleError
+from sensible_bmi._errors import ValidationError
+from sensible_bmi._regrid import Regridder
+from sensible_bmi._stats import CallStats
+from sensible_bmi._stats import instrumented
+from sensible_bmi._units import conversion
+from sensible_bmi._var import SensibleInputVar
+from sensible_bmi._var import SensibleOutputVar
+from sensible_bmi.sensible_bmi import SensibleBmi
+
+
+class Link:
+    """Move the values of an output variable into an input variable.
+
+    Everything about the exchange is worked out once, when the link is
+    created: the variables are checked against each other, buffers are
+    allocated and the steps needed to convert the values (regridding,
+    scaling and casting) are chosen. Each exchange then only runs those
+    steps, in place, on the preallocated buffers.
+
+    Parameters
+    ----------
+    src, dst : SensibleBmi
+        The components that provide and receive the values.
+    src_name, dst_name : str
+        Names of the output variable of *src* and the input variable of *dst*.
+    regrid : str or Regridder, optional
+        How to move values between grids: either an interpolation method
+        (see :class:`Regridder`) or a regridder. Needed if the variables
+        are on grids that differ.
+    scale, offset : float, optional
+        Values are converted with ``value * scale + offset``. If not given,
+        and the variables have different units, the scale and offset are
+        found from the units (see :func:`~sensible_bmi._units.conversion`).
+    casting : {"same_kind", "unsafe"}, optional
+        Casting allowed between the types of the variables (see
+        :func:`numpy.can_cast`).
+    stats : CallStats, optional
+        Where to record the time taken by each exchange.
+    """
+
+    def __init__(
+        self,
+        src: SensibleBmi,
+        src_name: str,
+        dst: SensibleBmi,
+        dst_name: str,
+        regrid: str | Regridder | None = None,
+        scale: float | None = None,
+        offset: float = 0.0,
+        casting: str = "same_kind",
+        stats: CallStats | None = None,
+    ):
+        src_var, dst_var = src.var[src_name], dst.var[dst_name]
+        if not isinstance(src_var, SensibleOutputVar):
+            raise SensibleError(f"{src_name!r}: not an output variable")
+        if not isinstance(dst_var, SensibleInputVar):
+            raise SensibleError(f"{dst_name!r}: not an input variable")
+
+        self._src = src_var
+        self._dst = dst_var
+        self._name = f"{src.name}.{src_name}->{dst.name}.{dst_name}"
+        self._stats = CallStats() if stats is None else stats
+
+        if scale is None:
+            try:
+                scale, offset = conversion(src_var.units, dst_var.units)
+            except ValidationError as error:
+                raise ValidationError(
+                    f"{self._name}: {error}, give a scale (and offset) to convert"
+                ) from None
+        if not np.can_cast(src_var.type, dst_var.type, casting=casting):  # type: ignore[arg-type]
+            raise ValidationError(
+                f"{self._name}: can't cast {src_var.type} to {dst_var.type}"
+                f" with {casting!r} casting"
+            )
+        self._scale = scale
+        self._offset = offset
+
+        self._regridder = self._make_regridder(src, dst, regrid)
+        if self._regridder is None:
+            self._check_same_grid(src, dst)
+
+        self._src_buf = src_var.empty()
+        self._dst_buf = dst_var.empty()
+        self._steps = self._compile()
+
+    def _make_regridder(
+        self, src: SensibleBmi, dst: SensibleBmi, regrid: str | Regridder | None
+    ) -> Regridder | None:
+        if regrid is None:
+            return None
+        for var in (self._src, self._dst):
+            if var.location != "node" or var.grid is None:
+                raise ValidationError(
+                    f"{self._name}: {var.name!r} must be defined on grid nodes to"
+                    " regrid"
+                )
+        assert self._src.grid is not None and self._dst.grid is not None
+        src_grid, dst_grid = src.grid[self._src.grid], dst.grid[self._dst.grid]
+        if isinstance(regrid, str):
+            return Regridder(src_grid, dst_grid, method=regrid)
+        if (regrid.src.fingerprint, regrid.dst.fingerprint) != (
+            src_grid.fingerprint,
+            dst_grid.fingerprint,
+        ):
+            raise ValidationError(f"{self._name}: regridder is for other grids")
+        return regrid
+
+    def _check_same_grid(self, src: SensibleBmi, dst: SensibleBmi) -> None:
+        if self._src.size == 1 and self._dst.size > 1:
+            return
+        if self._src.size != self._dst.size:
+            raise ValidationError(
+                f"{self._name}: sizes differ ({self._src.size} and {self._dst.size}),"
+                " give a way to regrid"
+            )
+        if self._src.location != self._dst.location:
+            raise ValidationError(
+                f"{self._name}: locations differ ({self._src.location} and"
+                f" {self._dst.location})"
+            )
+        if self._src.grid is not None and self._dst.grid is not None:
+            src_grid, dst_grid = src.grid[self._src.grid], dst.grid[self._dst.grid]
+            if src_grid.fingerprint != dst_grid.fingerprint:
+                raise ValidationError(
+                    f"{self._name}: grids differ, give a way to regrid"
+                )
+
+    def _compile(self) -> list[Callable[[], Any]]:
+        """Choose the steps (each bound to its buffers) of an exchange."""
+        src, dst = self._src, self._dst
+        is_converted = self._scale != 1.0 or self._offset != 0.0
+
+        if self._regridder is None and not is_converted and src.type == dst.type:
+            if src.is_zero_copy and src.size == dst.size:
+                return [lambda: dst.set(src.data)]
+            return [lambda: src.get(out=self._src_buf), lambda: dst.set(self._src_buf)]
+
+        steps: list[Callable[[], Any]] = [lambda: src.get(out=self._src_buf)]
+        values: NDArray[Any] = self._src_buf
+
+        if self._regridder is not None:
+            if values.dtype != np.float64:
+                cast = np.empty(values.shape)
+                steps.append(lambda: np.copyto(cast, self._src_buf))
+                values = cast
+            regridder, source = self._regridder, values
+            regridded = np.empty(dst.size)
+            steps.append(lambda: regridder.regrid(source, out=regridded))
+            values = regridded
+
+        if is_converted:
+            work = (
+                self._dst_buf
+                if np.issubdtype(self._dst_buf.dtype, np.floating)
+                else np.empty(dst.size)
+            )
+            scale, offset, converted = self._scale, self._offset, values
+            steps.append(
+                lambda: np.multiply(converted, scale, out=work, casting="unsafe")
+            )
+            if offset != 0.0:
+                steps.append(lambda: np.add(work, offset, out=work))
+            values = work
+
+        if values is not self._dst_buf:
+            final = values
+            steps.append(lambda: np.copyto(self._dst_buf, final, casting="unsafe"))
+        steps.append(lambda: dst.set(self._dst_buf))
+
+        return steps
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def src(self) -> SensibleOutputVar:
+        return self._src
+
+    @property
+    def dst(self) -> SensibleInputVar:
+        return self._dst
+
+    @property
+    def regridder(self) -> Regridder | None:
+        return self._regridder
+
+    @property
+    def scale(self) -> float:
+        return self._scale
+
+    @property
+    def offset(self) -> float:
+        return self._offset
+
+    @property
+    def n_steps(self) -> int:
+        """Number of steps in an exchange (including the get and the set)."""
+        return len(self._steps)
+
+    @instrumented("exchange", nbytes=lambda self, _: self._dst.nbytes)
+    def __call__(self) -> None:
+        """Move the current values of the output variable to the input variable."""
+        for step in self._steps:
+            step()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._name!r})"
+
+
+class Coupler:
+    """A list of links between components that are exchanged together.
+
+    Parameters
+    ----------
+    timing : bool, optional
+        Whether to record the time taken by each link (see :attr:`stats`).
+
+    Examples
+    --------
+    >>> coupler = Coupler()  # doctest: +SKIP
+    >>> coupler.link(a, "land_surface__elevation", b, "land_surface__elevation")  # doctest: +SKIP
+    >>> for _ in range(10):  # doctest: +SKIP
+    ...     a.update()
+    ...     coupler.exchange()
+    ...     b.update()
+    """
+
+    def __init__(self, timing: bool = True):
+        self._links: list[Link] = []
+        self._stats = CallStats(enabled=timing)
+
+    def link(
+        self,
+        src: SensibleBmi,
+        src_name: str,
+        dst: SensibleBmi,
+        dst_name: str,
+        **kwds: Any,
+    ) -> Link:
+        """Add a link from an output variable to an input variable.
+
+        Parameters
+        ----------
+        src, dst : SensibleBmi
+            The components that provide and receive the values.
+        src_name, dst_name : str
+            Names of the output and input variables.
+        **kwds
+            Keywords passed on to :class:`Link`.
+
+        Returns
+        -------
+        Link
+            The new link.
+        """
+        link = Link(src, src_name, dst, dst_name, stats=self._stats, **kwds)
+        self._links.append(link)
+        return link
+
+    def exchange(self) -> None:
+        """Run each link, in the order they were added."""
+        for link in self._links:
+            link()
+
+    @property
+    def stats(self) -> CallStats:
+        """Calls and time taken by each link, keyed by link name."""
+        return self._stats
+
+    def timings(self) -> dict[str, dict[str, Any]]:
+        """Calls, time and bytes moved for each link, keyed by link name."""
+        return self._stats.as_dict().get("exchange", {})
+
+    def __len__(self) -> int:
+        return len(self._links)
+
+    def __iter__(self) -> Iterator[Link]:
+        return iter(self._links)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({[link.name for link in self._links]!r})"
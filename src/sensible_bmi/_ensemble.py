@@ -0,0 +1,351 @@
+from __future__ import annotations
+
+import contextlib
+import multiprocessing
+import os
+import traceback
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Mapping
+from collections.abc import Sequence
+from multiprocessing.connection import Connection
+from multiprocessing.context import BaseContext
+from multiprocessing.shared_memory import SharedMemory
+from types import MappingProxyType
+from types import TracebackType
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+from sensible_bmi._errors import SensibleError
+from sensible_bmi._errors import ValidationError
+from sensible_bmi.sensible_bmi import SensibleBmi
+
+
+def _serve(
+    conn: Connection, cls: type[SensibleBmi], configs: Sequence[Mapping[str, Any]]
+) -> None:
+    """Run commands sent by an :class:`Ensemble` on some of its members.
+
+    Each worker process holds its own members, so members never share a
+    working directory with members in other processes.
+    """
+    members: list[SensibleBmi] = []
+    arrays: dict[str, NDArray[Any]] = {}
+    handles: list[SharedMemory] = []
+
+    def gather() -> list[float]:
+        for i, member in enumerate(members):
+            for name, array in arrays.items():
+                member.var[name].get(out=array[i])
+        return [member.time.current for member in members]
+
+    try:
+        while True:
+            command, args = conn.recv()
+            try:
+                reply: Any = None
+                if command == "initialize":
+                    for config in configs:
+                        member = cls()
+                        member.initialize(**config)
+                        members.append(member)
+                    reply = [
+                        {
+                            name: (member.var[name].size, member.var[name].type)
+                            for name in args
+                        }
+                        for member in members
+                    ]
+                elif command == "attach":
+                    first, buffers = args
+                    for name, (shm_name, shape, dtype) in buffers.items():
+                        handles.append(SharedMemory(name=shm_name))
+                        arrays[name] = np.ndarray(
+                            shape, dtype=dtype, buffer=handles[-1].buf
+                        )[first : first + len(members)]
+                    reply = gather()
+                elif command == "update":
+                    for member in members:
+                        member.update()
+                    reply = gather()
+                elif command == "run_until":
+                    for member in members:
+                        member.run_until(args)
+                    reply = gather()
+                elif command == "close":
+                    for member in members:
+                        member.finalize()
+                    conn.send(("ok", None))
+                    break
+                else:
+                    raise ValueError(f"{command!r}: unknown command")
+            except Exception:
+                conn.send(("error", traceback.format_exc()))
+            else:
+                conn.send(("ok", reply))
+    finally:
+        arrays.clear()
+        for handle in handles:
+            handle.close()
+        conn.close()
+
+
+class Ensemble:
+    """Run many instances of a sensible component in parallel.
+
+    Members are spread over a pool of worker processes, each of which
+    initializes and steps its members. A separate process for each group of
+    members is needed because components change the (process-wide) working
+    directory as they run.
+
+    After each step, the values of the requested output variables of every
+    member are gathered into arrays, in shared memory, that have a leading
+    dimension for the member. They are not sent through a pipe.
+
+    Parameters
+    ----------
+    cls : type
+        The sensible class (see :func:`make_sensible`) of the members. If
+        processes are not started by forking, it must be picklable (pass
+        *module* to :func:`make_sensible`).
+    members : sequence of dict
+        Keywords passed to :meth:`SensibleBmi.initialize` for each member (a
+        separate *where* for each member, for instance).
+    outputs : iterable of str, optional
+        Names of output variables to gather after each step.
+    n_workers : int, optional
+        Number of worker processes. The default is one per member, up to the
+        number of CPUs.
+    mp_context : str or multiprocessing context, optional
+        The start method (or context) used to create the worker processes.
+
+    Notes
+    -----
+    An ensemble is best used as a context manager, which starts the workers
+    on entry and, on exit, finalizes the members and releases the shared
+    memory.
+    """
+
+    def __init__(
+        self,
+        cls: type[SensibleBmi],
+        members: Sequence[Mapping[str, Any]],
+        outputs: Iterable[str] = (),
+        n_workers: int | None = None,
+        mp_context: str | BaseContext | None = None,
+    ):
+        if len(members) == 0:
+            raise ValidationError("an ensemble must have at least one member")
+        if n_workers is None:
+            n_workers = min(len(members), os.cpu_count() or 1)
+        elif n_workers < 1:
+            raise ValidationError(f"{n_workers}: number of workers must be positive")
+
+        self._cls = cls
+        self._members = [dict(member) for member in members]
+        self._output_names = tuple(outputs)
+        self._n_workers = min(n_workers, len(self._members))
+        self._context = (
+            mp_context
+            if isinstance(mp_context, BaseContext)
+            else multiprocessing.get_context(mp_context)
+        )
+
+        self._workers: list[tuple[Any, Connection, slice]] = []
+        self._shared: list[SharedMemory] = []
+        self._outputs: dict[str, NDArray[Any]] = {}
+        self._time = np.full(len(self._members), np.nan)
+
+    @property
+    def n_members(self) -> int:
+        return len(self._members)
+
+    @property
+    def n_workers(self) -> int:
+        return self._n_workers
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the workers have been started and not yet closed."""
+        return bool(self._workers)
+
+    @property
+    def outputs(self) -> Mapping[str, NDArray[Any]]:
+        """Gathered output values, each with a leading member dimension.
+
+        The arrays are read-only views of shared memory that are overwritten
+        after each step; copy them to keep their values.
+        """
+        return MappingProxyType(self._outputs)
+
+    @property
+    def time(self) -> NDArray[np.float64]:
+        """The current time of each member."""
+        time = self._time.view()
+        time.setflags(write=False)
+        return time
+
+    def start(self) -> Ensemble:
+        """Start the workers and initialize the members.
+
+        Returns
+        -------
+        Ensemble
+            This ensemble.
+        """
+        if self._workers:
+            raise SensibleError("ensemble is already running")
+
+        bounds = np.linspace(0, self.n_members, self._n_workers + 1).astype(int)
+        try:
+            for start, stop in zip(bounds[:-1], bounds[1:]):
+                conn, child_conn = self._context.Pipe()
+                process = self._context.Process(  # type: ignore[attr-defined]
+                    target=_serve,
+                    args=(child_conn, self._cls, self._members[start:stop]),
+                    daemon=True,
+                )
+                process.start()
+                child_conn.close()
+                self._workers.append((process, conn, slice(start, stop)))
+
+            specs = [
+                spec
+                for reply in self._broadcast("initialize", self._output_names)
+                for spec in reply
+            ]
+            for member, spec in enumerate(specs):
+                for name, (size, dtype) in spec.items():
+                    if (size, dtype) != specs[0][name]:
+                        raise ValidationError(
+                            f"{name!r}: member {member} has {size} values of type"
+                            f" {dtype} but member 0 has {specs[0][name][0]} values"
+                            f" of type {specs[0][name][1]}"
+                        )
+
+            buffers = {}
+            for name, (size, dtype) in specs[0].items():
+                shape = (self.n_members, size)
+                nbytes = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+                self._shared.append(SharedMemory(create=True, size=nbytes))
+                array = np.ndarray(shape, dtype=dtype, buffer=self._shared[-1].buf)
+                array.setflags(write=False)
+                self._outputs[name] = array
+                buffers[name] = (self._shared[-1].name, shape, dtype)
+
+            self._send_each(
+                lambda span: ("attach", (span.start, buffers)), collect_time=True
+            )
+        except BaseException:
+            self.close()
+            raise
+
+        return self
+
+    def update(self) -> None:
+        """Advance every member by one time step."""
+        self._broadcast("update", None, collect_time=True)
+
+    def run_until(self, time: float) -> None:
+        """Run every member until some time.
+
+        Parameters
+        ----------
+        time : float
+            The time to run to.
+        """
+        self._broadcast("run_until", time, collect_time=True)
+
+    def close(self) -> None:
+        """Finalize the members, stop the workers and release shared memory."""
+        workers, self._workers = self._workers, []
+        errors = []
+        for process, conn, _ in workers:
+            try:
+                conn.send(("close", None))
+                status, payload = conn.recv()
+            except (EOFError, OSError):
+                pass
+            else:
+                if status == "error":
+                    errors.append(payload)
+            conn.close()
+        for process, _, _ in workers:
+            process.join(timeout=5.0)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+
+        self._outputs.clear()
+        for shared in self._shared:
+            with contextlib.suppress(BufferError):
+                shared.close()
+            shared.unlink()
+        self._shared.clear()
+
+        if errors:
+            raise SensibleError("error closing ensemble members:\n" + "\n".join(errors))
+
+    def _broadcast(
+        self, command: str, args: Any, collect_time: bool = False
+    ) -> list[Any]:
+        return self._send_each(lambda _: (command, args), collect_time=collect_time)
+
+    def _send_each(
+        self, message: Callable[[slice], tuple[str, Any]], collect_time: bool = False
+    ) -> list[Any]:
+        if not self._workers:
+            raise SensibleError("ensemble is not running (call start first)")
+
+        sent = []
+        for process, conn, span in self._workers:
+            try:
+                conn.send(message(span))
+            except OSError:
+                sent.append(False)
+            else:
+                sent.append(True)
+
+        replies, errors = [], []
+        for (process, conn, span), was_sent in zip(self._workers, sent):
+            died = ("error", f"worker {process.pid} exited unexpectedly")
+            if not was_sent:
+                status, payload = died
+            else:
+                try:
+                    status, payload = conn.recv()
+                except (EOFError, OSError):
+                    status, payload = died
+            if status == "error":
+                errors.append(f"members {span.start}-{span.stop - 1}: {payload}")
+            else:
+                replies.append(payload)
+                if collect_time:
+                    self._time[span] = payload
+
+        if errors:
+            raise SensibleError("\n".join(errors))
+        return replies
+
+    def __enter__(self) -> Ensemble:
+        return self.start()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        if getattr(self, "_workers", None):
+            with contextlib.suppress(Exception):
+                self.close()
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}({self._cls.__name__},"
+            f" n_members={self.n_members}, n_workers={self._n_workers})"
+        )
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+def hash_config(filepath: str | os.PathLike[str] | None) -> str:
+    """Hash the contents of a component's input file.
+
+    Parameters
+    ----------
+    filepath : str or path-like, optional
+        Path to the input file. If not given (or empty), the hash of an
+        empty file is returned.
+
+    Examples
+    --------
+    >>> from sensible_bmi._geometry import hash_config
+    >>> hash_config(None) == hash_config("")
+    True
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if filepath:
+        with open(filepath, "rb") as fp:
+            for chunk in iter(lambda: fp.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+class GeometryCache:
+    """An on-disk cache of the grid arrays of a component.
+
+    Arrays are stored as ``.npy`` files, one directory per component and
+    input file, and are loaded back as read-only memory maps, so that
+    processes that load the same array share its pages.
+
+    Parameters
+    ----------
+    root : str or path-like
+        Directory that holds the caches of all components.
+    component : str
+        Name of the component.
+    config_hash : str, optional
+        Hash of the component's input file (see :func:`hash_config`).
+
+    Examples
+    --------
+    >>> import tempfile
+    >>> import numpy as np
+    >>> from sensible_bmi._geometry import GeometryCache
+    >>> with tempfile.TemporaryDirectory() as root:
+    ...     cache = GeometryCache(root, "Model")
+    ...     cache.load(0, "x") is None
+    ...     cache.save(0, "x", np.arange(3.0))
+    ...     cache.load(0, "x")
+    True
+    memmap([0., 1., 2.])
+    """
+
+    def __init__(
+        self, root: str | os.PathLike[str], component: str, config_hash: str = ""
+    ):
+        self._root = os.fspath(root)
+        self._component = component
+        self._config_hash = config_hash
+        self._path = os.path.join(
+            self._root,
+            "-".join(
+                part
+                for part in (re.sub(r"[^\w.-]", "_", component), config_hash)
+                if part
+            ),
+        )
+
+    @property
+    def path(self) -> str:
+        """Directory that holds the component's arrays."""
+        return self._path
+
+    @property
+    def component(self) -> str:
+        return self._component
+
+    @property
+    def config_hash(self) -> str:
+        return self._config_hash
+
+    def _array_path(self, grid: int, name: str) -> str:
+        return os.path.join(self._path, f"grid-{grid}", f"{name}.npy")
+
+    def load(self, grid: int, name: str) -> NDArray[Any] | None:
+        """Load a grid array, if it has been cached.
+
+        Parameters
+        ----------
+        grid : int
+            The grid id.
+        name : str
+            Name of the array (``"x"``, ``"face_nodes"``, etc.).
+
+        Returns
+        -------
+        ndarray or None
+            The array, memory mapped read-only, or ``None`` if it is not in
+            the cache.
+        """
+        try:
+            return np.load(self._array_path(grid, name), mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+
+    def save(self, grid: int, name: str, array: NDArray[Any]) -> None:
+        """Save a grid array to the cache.
+
+        The array is written to a temporary file that then replaces any
+        existing one, so that a partly written array is never loaded.
+
+        Parameters
+        ----------
+        grid : int
+            The grid id.
+        name : str
+            Name of the array.
+        array : ndarray
+            The array to save.
+        """
+        path = self._array_path(grid, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".npy")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                np.save(fp, array)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def clear(self) -> None:
+        """Remove all of the component's cached arrays."""
+        shutil.rmtree(self._path, ignore_errors=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}({self._root!r}, {self._component!r},"
+            f" {self._config_hash!r})"
+        )
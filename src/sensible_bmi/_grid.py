@@ -1,24 +1,343 @@
 from __future__ import annotations
 
 import ctypes
+import hashlib
 import os
 import pprint
+import time
+import weakref
+from abc import ABC
+from abc import abstractmethod
+from collections.abc import Callable
+from typing import Any
+from typing import TypeVar
 
 import numpy as np
 from bmipy.bmi import Bmi
+from numpy.typing import ArrayLike
+from numpy.typing import DTypeLike
 from numpy.typing import NDArray
+from sensible_bmi._errors import ValidationError
+from sensible_bmi._geometry import GeometryCache
+from sensible_bmi._spatial import cell_on_axis
+from sensible_bmi._spatial import FaceIndex
+from sensible_bmi._spatial import nearest_on_axis
+from sensible_bmi._spatial import NodeIndex
+from sensible_bmi._stats import CallStats
 from sensible_bmi._validators import validate_grid_rank
 from sensible_bmi._validators import validate_grid_type
 
+T = TypeVar("T")
+
+
+class Adjacency:
+    """Ragged lists of element ids stored in compressed sparse row form.
+
+    The ids adjacent to element ``i`` are
+    ``indices[offsets[i] : offsets[i + 1]]``.
+
+    Examples
+    --------
+    >>> from sensible_bmi._grid import Adjacency
+    >>> adjacency = Adjacency([0, 2, 3], [7, 8, 9])
+    >>> len(adjacency)
+    2
+    >>> adjacency[0]
+    array([7, 8])
+    >>> adjacency.counts
+    array([2, 1])
+    """
+
+    __slots__ = ("_offsets", "_indices")
+
+    def __init__(self, offsets: ArrayLike, indices: ArrayLike):
+        self._offsets = np.asarray(offsets)
+        self._indices = np.asarray(indices)
+        for array in (self._offsets, self._indices):
+            if array.flags.writeable:
+                array.setflags(write=False)
+
+    @property
+    def offsets(self) -> NDArray[np.int_]:
+        return self._offsets
+
+    @property
+    def indices(self) -> NDArray[np.int_]:
+        return self._indices
+
+    @property
+    def counts(self) -> NDArray[np.int_]:
+        return np.diff(self._offsets)
+
+    @property
+    def nbytes(self) -> int:
+        return self._offsets.nbytes + self._indices.nbytes
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, element: int) -> NDArray[np.int_]:
+        return self._indices[self._offsets[element] : self._offsets[element + 1]]
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._offsets!r}, {self._indices!r})"
+
+
+_REDUCERS = {"mean": np.add, "sum": np.add, "min": np.minimum, "max": np.maximum}
+
+
+def _reduce_adjacent(
+    values: NDArray[Any],
+    adjacency: Adjacency,
+    ufunc: np.ufunc,
+    mean: bool = False,
+    out: NDArray[Any] | None = None,
+) -> NDArray[Any]:
+    """Reduce the *values* at each row of *adjacency*."""
+    if out is None:
+        dtype = np.result_type(values.dtype, np.float64) if mean else values.dtype
+        out = np.empty(len(adjacency), dtype=dtype)
+    elif out.shape != (len(adjacency),):
+        raise ValueError(f"out must have shape ({len(adjacency)},)")
+    elif mean and not np.issubdtype(out.dtype, np.inexact):
+        raise ValueError(
+            f"out must have a floating-point type for means (got {out.dtype})"
+        )
+
+    counts = adjacency.counts
+    is_empty = counts == 0
+    gathered = values[adjacency.indices]
+
+    if gathered.size == 0:
+        pass
+    elif not is_empty.any():
+        ufunc.reduceat(gathered, adjacency.offsets[:-1], out=out)
+    else:
+        out[~is_empty] = ufunc.reduceat(gathered, adjacency.offsets[:-1][~is_empty])
+
+    if is_empty.any():
+        out[is_empty] = np.nan if np.issubdtype(out.dtype, np.inexact) else 0
+
+    if mean:
+        np.divide(out, counts, out=out, where=~is_empty, casting="unsafe")
+
+    return out
+
+
+def _invert(
+    ids: NDArray[np.integer[Any]], owners: NDArray[np.integer[Any]], n: int
+) -> Adjacency:
+    """Invert a many-to-one map from *owners* to *ids*.
+
+    Negative ids are taken to be padding and are ignored.
+    """
+    is_valid = ids >= 0
+    if not np.all(is_valid):
+        ids, owners = ids[is_valid], owners[is_valid]
+
+    offsets = np.empty(n + 1, dtype=np.intp)
+    offsets[0] = 0
+    np.cumsum(np.bincount(ids, minlength=n), out=offsets[1:])
+
+    return Adjacency(offsets, owners[np.argsort(ids, kind="stable")])
+
+
+def _digest(parts: tuple[Any, ...]) -> str:
+    """Hash a sequence of values and arrays into a hex string."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(f"{part.dtype.str}{part.shape}".encode())
+            digest.update(np.ascontiguousarray(part).data)
+        else:
+            digest.update(repr(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class _GridCache(dict[str, Any]):
+    """Arrays fetched or derived for a grid (a dict that can be weakly referenced)."""
+
+
+_SHARED_CACHES: weakref.WeakValueDictionary[str, _GridCache] = (
+    weakref.WeakValueDictionary()
+)
+
+
+def shared_grid_count() -> int:
+    """Number of distinct grids whose arrays are shared through :meth:`intern`."""
+    return len(_SHARED_CACHES)
+
 
 class SensibleGrid:
-    def __init__(self, bmi: Bmi, grid: int):
+    def __init__(
+        self,
+        bmi: Bmi,
+        grid: int,
+        stats: CallStats | None = None,
+        geometry: GeometryCache | None = None,
+    ):
         self._bmi = bmi
         self._id = grid
+        self._stats = CallStats() if stats is None else stats
+        self._geometry = geometry
 
         self._rank = validate_grid_rank(bmi.get_grid_rank(grid))
         self._type = validate_grid_type(bmi.get_grid_type(grid))
 
+        self._cache = _GridCache()
+        self._is_interned = False
+
+    @property
+    def cached(self) -> frozenset[str]:
+        """Names of the arrays that have been fetched or derived."""
+        return frozenset(self._cache)
+
+    def clear_cache(self, *names: str) -> None:
+        """Release arrays that have been fetched from the component.
+
+        Parameters
+        ----------
+        *names : str, optional
+            Names of the arrays to release (as listed in :attr:`cached`). If not
+            given, release all of them. Released arrays are fetched again from
+            the component the next time they are accessed.
+
+        Notes
+        -----
+        An interned grid stops sharing its arrays with other grids, which
+        keep theirs.
+        """
+        if self._is_interned:
+            self._cache = _GridCache(self._cache)
+            self._is_interned = False
+
+        if names:
+            for name in names:
+                self._cache.pop(name, None)
+        else:
+            self._cache.clear()
+
+    @property
+    def is_interned(self) -> bool:
+        """Whether the grid shares its arrays with identical grids."""
+        return self._is_interned
+
+    def intern(self) -> SensibleGrid:
+        """Share arrays with all other interned grids of the same geometry.
+
+        Grids are matched by :attr:`fingerprint`. Arrays that an identical
+        grid has already fetched or derived replace this grid's copies, and
+        any array fetched or derived from now on is seen by all of them. This
+        means that many components (the members of an ensemble, say) can
+        hold one copy of their grids' arrays.
+
+        Returns
+        -------
+        SensibleGrid
+            This grid.
+        """
+        if self._is_interned:
+            return self
+
+        shared = _SHARED_CACHES.setdefault(self.fingerprint, self._cache)
+        if shared is not self._cache:
+            for name, value in self._cache.items():
+                shared.setdefault(name, value)
+            self._cache = shared
+        self._is_interned = True
+
+        return self
+
+    def _cached(self, name: str, build: Callable[[], T]) -> T:
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+        value = build()
+        if isinstance(value, np.ndarray):
+            value.setflags(write=False)
+        self._cache[name] = value
+        return value
+
+    def _fetch(
+        self, name: str, shape: int | tuple[int, ...], dtype: DTypeLike
+    ) -> NDArray[Any]:
+        def fetch() -> NDArray[Any]:
+            start = time.perf_counter()
+            array = self._load(name, shape, dtype)
+            if array is not None:
+                op = "load"
+            else:
+                op = "fetch"
+                array = np.empty(shape, dtype=dtype)
+                getattr(self._bmi, f"get_grid_{name}")(self._id, array.reshape(-1))
+                if self._geometry is not None:
+                    self._geometry.save(self._id, name, array)
+            self._stats.record(
+                op,
+                f"grid {self._id}: {name}",
+                time.perf_counter() - start,
+                nbytes=array.nbytes,
+            )
+            return array
+
+        return self._cached(name, fetch)
+
+    def _load(
+        self, name: str, shape: int | tuple[int, ...], dtype: DTypeLike
+    ) -> NDArray[Any] | None:
+        """Load an array from the geometry cache, if it is there and valid."""
+        if self._geometry is None:
+            return None
+        array = self._geometry.load(self._id, name)
+        if array is None:
+            return None
+        expected = (shape,) if isinstance(shape, int) else tuple(shape)
+        if array.shape != expected or array.dtype != np.dtype(dtype):
+            return None
+        return array
+
+    def _fetch_coordinate(self, dim: str, size: int) -> NDArray[np.float64]:
+        if "xyz".index(dim) >= self._rank:
+            raise AttributeError(
+                f"{dim}_of_node: coordinate not defined for a grid of rank {self._rank}"
+            )
+        return self._fetch(dim, size, ctypes.c_double)
+
+    def _require_rank_2(self, name: str) -> None:
+        if self._rank != 2:
+            raise AttributeError(
+                f"{name}: only defined for grids of rank 2 (got {self._rank})"
+            )
+
+    def _node_index(self) -> NodeIndex:
+        self._require_rank_2("find_nearest_node")
+        return self._cached(
+            "node_index",
+            lambda: NodeIndex(getattr(self, "x_of_node"), getattr(self, "y_of_node")),
+        )
+
+    @property
+    def fingerprint(self) -> str:
+        """A hash of the grid's geometry.
+
+        Grids with the same fingerprint have the same type, rank, shape,
+        coordinates and connectivity, regardless of which component they
+        came from.
+        """
+        return self._cached("fingerprint", lambda: _digest(self._fingerprint_parts()))
+
+    def _fingerprint_parts(self) -> tuple[Any, ...]:
+        return (self._type, self._rank)
+
+    def _coordinates(self) -> tuple[NDArray[np.float64], ...]:
+        return tuple(getattr(self, f"{dim}_of_node") for dim in "xyz"[: self._rank])
+
+    @property
+    def stats(self) -> CallStats:
+        return self._stats
+
     @property
     def id(self) -> int:
         return self._id
@@ -45,36 +364,50 @@ class SensibleGrid:
 
 
 class SensiblePointGrid(SensibleGrid):
-    def __init__(self, bmi: Bmi, grid: int):
-        super().__init__(bmi, grid)
+    def __init__(
+        self,
+        bmi: Bmi,
+        grid: int,
+        stats: CallStats | None = None,
+        geometry: GeometryCache | None = None,
+    ):
+        super().__init__(bmi, grid, stats=stats, geometry=geometry)
 
         self._node_count = bmi.get_grid_node_count(grid)
 
-        self._x: NDArray[np.float64]
-        self._y: NDArray[np.float64]
-        self._z: NDArray[np.float64]
-
-        for dim in ("x", "y", "z")[: self.rank]:
-            array = np.empty(self._node_count, dtype=ctypes.c_double)
-            getattr(bmi, f"get_grid_{dim}")(grid, array)
-            array.setflags(write=False)
-            self.__dict__[f"_{dim}"] = array
-
     @property
     def node_count(self) -> int:
         return self._node_count
 
     @property
     def x_of_node(self) -> NDArray[np.float64]:
-        return self._x
+        return self._fetch_coordinate("x", self._node_count)
 
     @property
     def y_of_node(self) -> NDArray[np.float64]:
-        return self._y
+        return self._fetch_coordinate("y", self._node_count)
 
     @property
     def z_of_node(self) -> NDArray[np.float64]:
-        return self._z
+        return self._fetch_coordinate("z", self._node_count)
+
+    def find_nearest_node(self, x: ArrayLike, y: ArrayLike) -> NDArray[np.intp]:
+        """Find the node nearest to each of a set of points.
+
+        Parameters
+        ----------
+        x, y : array_like
+            Coordinates of the points.
+
+        Returns
+        -------
+        ndarray of int
+            Id of the nearest node to each point.
+        """
+        return self._node_index().nearest(x, y)
+
+    def _fingerprint_parts(self) -> tuple[Any, ...]:
+        return super()._fingerprint_parts() + self._coordinates()
 
     def __str__(self) -> str:
         with np.printoptions(threshold=6):
@@ -93,25 +426,103 @@ class SensiblePointGrid(SensibleGrid):
 
 
 class SensibleUniformRectilinearGrid(SensibleGrid):
-    def __init__(self, bmi: Bmi, grid: int):
-        super().__init__(bmi, grid)
+    def __init__(
+        self,
+        bmi: Bmi,
+        grid: int,
+        stats: CallStats | None = None,
+        geometry: GeometryCache | None = None,
+    ):
+        super().__init__(bmi, grid, stats=stats, geometry=geometry)
 
         shape = np.empty(self.rank, dtype=ctypes.c_int)
         bmi.get_grid_shape(grid, shape)
-        self._shape = tuple(shape)
+        self._shape = tuple(int(n) for n in shape)
 
         spacing = np.empty(self.rank, dtype=ctypes.c_double)
         bmi.get_grid_spacing(grid, spacing)
-        self._spacing = tuple(spacing)
+        self._spacing = tuple(float(d) for d in spacing)
 
         origin = np.empty(self.rank, dtype=ctypes.c_double)
         bmi.get_grid_origin(grid, origin)
-        self._origin = tuple(origin)
+        self._origin = tuple(float(x) for x in origin)
+
+        self._node_count = int(np.prod(shape))
 
     @property
     def shape(self) -> tuple[int, ...]:
         return self._shape
 
+    @property
+    def node_count(self) -> int:
+        return self._node_count
+
+    @property
+    def x_of_node(self) -> NDArray[np.float64]:
+        """x-coordinate of each node.
+
+        Like the coordinates of the other grid types, this is a flat array
+        with a value for each node. To avoid storing a coordinate for each
+        node, use :meth:`node_coordinate_view`.
+        """
+        return self._flat_coordinate_of_node("x")
+
+    @property
+    def y_of_node(self) -> NDArray[np.float64]:
+        """y-coordinate of each node (see :attr:`x_of_node`)."""
+        return self._flat_coordinate_of_node("y")
+
+    @property
+    def z_of_node(self) -> NDArray[np.float64]:
+        """z-coordinate of each node (see :attr:`x_of_node`)."""
+        return self._flat_coordinate_of_node("z")
+
+    def node_coordinate_view(self, dim: str) -> NDArray[np.float64]:
+        """A coordinate of each node, as a read-only array shaped like the grid.
+
+        The array is a broadcast view of one of the grid's axes, so it does
+        not take up memory for each node.
+
+        Parameters
+        ----------
+        dim : {"x", "y", "z"}
+            The coordinate.
+
+        Returns
+        -------
+        ndarray of float
+            The coordinate of each node.
+        """
+        if dim not in ("x", "y", "z") or "xyz".index(dim) >= self._rank:
+            raise AttributeError(
+                f"{dim}_of_node: coordinate not defined for a grid of rank {self._rank}"
+            )
+        axis = self._rank - 1 - "xyz".index(dim)
+
+        def build() -> NDArray[np.float64]:
+            return self._origin[axis] + self._spacing[axis] * np.arange(
+                self._shape[axis], dtype=float
+            )
+
+        values = self._cached(dim, build)
+        return np.broadcast_to(
+            values.reshape([-1 if i == axis else 1 for i in range(self._rank)]),
+            self._shape,
+        )
+
+    def _flat_coordinate_of_node(self, dim: str) -> NDArray[np.float64]:
+        view = self.node_coordinate_view(dim)
+        return self._cached(
+            f"{dim}_of_node", lambda: np.ascontiguousarray(view).reshape(-1)
+        )
+
+    def _fingerprint_parts(self) -> tuple[Any, ...]:
+        return super()._fingerprint_parts() + (
+            self._shape,
+            tuple(float(value) for value in self._spacing),
+            tuple(float(value) for value in self._origin),
+        )
+
     @property
     def spacing(self) -> tuple[float, ...]:
         return self._spacing
@@ -120,6 +531,59 @@ class SensibleUniformRectilinearGrid(SensibleGrid):
     def origin(self) -> tuple[float, ...]:
         return self._origin
 
+    def find_nearest_node(self, x: ArrayLike, y: ArrayLike) -> NDArray[np.intp]:
+        """Find the node nearest to each of a set of points.
+
+        Parameters
+        ----------
+        x, y : array_like
+            Coordinates of the points.
+
+        Returns
+        -------
+        ndarray of int
+            Id of the nearest node to each point.
+        """
+        self._require_rank_2("find_nearest_node")
+        row, col = (
+            np.clip(
+                np.rint(
+                    (np.asarray(coord, dtype=float) - self._origin[axis])
+                    / self._spacing[axis]
+                ),
+                0,
+                self._shape[axis] - 1,
+            ).astype(np.intp)
+            for axis, coord in ((0, y), (1, x))
+        )
+        return row * self._shape[1] + col
+
+    def find_face(self, x: ArrayLike, y: ArrayLike) -> NDArray[np.intp]:
+        """Find the face that contains each of a set of points.
+
+        Parameters
+        ----------
+        x, y : array_like
+            Coordinates of the points.
+
+        Returns
+        -------
+        ndarray of int
+            Id of the face that contains each point, or -1 for points that
+            are not within the grid.
+        """
+        self._require_rank_2("find_face")
+        row, col = (
+            _cell_of_uniform_axis(
+                np.asarray(coord, dtype=float),
+                self._origin[axis],
+                self._spacing[axis],
+                self._shape[axis] - 1,
+            )
+            for axis, coord in ((0, y), (1, x))
+        )
+        return np.where((row >= 0) & (col >= 0), row * (self._shape[1] - 1) + col, -1)
+
     def __str__(self) -> str:
         return pprint.pformat(
             {
@@ -127,46 +591,96 @@ class SensibleUniformRectilinearGrid(SensibleGrid):
                 "rank": self.rank,
                 "type": self.type,
                 "shape": self.shape,
+                "node_count": self.node_count,
                 "spacing": self.spacing,
                 "origin": self.origin,
             }
         )
 
 
+def _cell_of_uniform_axis(
+    values: NDArray[np.float64], origin: float, spacing: float, n_cells: int
+) -> NDArray[np.intp]:
+    """Index of the cell along a uniform axis, or -1 if outside of the axis."""
+    position = (values - origin) / spacing
+    cell = np.minimum(np.floor(position), n_cells - 1).astype(np.intp)
+    cell[(position < 0.0) | (position > n_cells)] = -1
+    return cell
+
+
 class SensibleRectilinearGrid(SensibleGrid):
-    def __init__(self, bmi: Bmi, grid: int):
-        super().__init__(bmi, grid)
+    def __init__(
+        self,
+        bmi: Bmi,
+        grid: int,
+        stats: CallStats | None = None,
+        geometry: GeometryCache | None = None,
+    ):
+        super().__init__(bmi, grid, stats=stats, geometry=geometry)
 
         shape = np.empty(self.rank, dtype=ctypes.c_int)
         bmi.get_grid_shape(grid, shape)
-        self._shape: tuple[int, ...] = tuple(shape)
-
-        self._x: NDArray[np.float64]
-        self._y: NDArray[np.float64]
-        self._z: NDArray[np.float64]
-
-        dims = ("x", "y", "z")[self.rank - 1 :: -1]
-        for dim, name in enumerate(dims):
-            array = np.empty(self._shape[dim], dtype=ctypes.c_double)
-            getattr(bmi, f"get_grid_{name}")(grid, array)
-            array.setflags(write=False)
-            self.__dict__[f"_{name}"] = array
+        self._shape: tuple[int, ...] = tuple(int(n) for n in shape)
 
     @property
     def shape(self) -> tuple[int, ...]:
         return self._shape
 
+    @property
+    def node_count(self) -> int:
+        return int(np.prod(self._shape))
+
     @property
     def x_of_node(self) -> NDArray[np.float64]:
-        return self._x
+        return self._fetch_coordinate("x", self._shape[self.rank - 1])
 
     @property
     def y_of_node(self) -> NDArray[np.float64]:
-        return self._y
+        return self._fetch_coordinate("y", self._shape[self.rank - 2])
 
     @property
     def z_of_node(self) -> NDArray[np.float64]:
-        return self._z
+        return self._fetch_coordinate("z", self._shape[self.rank - 3])
+
+    def find_nearest_node(self, x: ArrayLike, y: ArrayLike) -> NDArray[np.intp]:
+        """Find the node nearest to each of a set of points.
+
+        Parameters
+        ----------
+        x, y : array_like
+            Coordinates of the points.
+
+        Returns
+        -------
+        ndarray of int
+            Id of the nearest node to each point.
+        """
+        self._require_rank_2("find_nearest_node")
+        row = nearest_on_axis(self.y_of_node, y)
+        col = nearest_on_axis(self.x_of_node, x)
+        return row * self._shape[1] + col
+
+    def find_face(self, x: ArrayLike, y: ArrayLike) -> NDArray[np.intp]:
+        """Find the face that contains each of a set of points.
+
+        Parameters
+        ----------
+        x, y : array_like
+            Coordinates of the points.
+
+        Returns
+        -------
+        ndarray of int
+            Id of the face that contains each point, or -1 for points that
+            are not within the grid.
+        """
+        self._require_rank_2("find_face")
+        row = cell_on_axis(self.y_of_node, y)
+        col = cell_on_axis(self.x_of_node, x)
+        return np.where((row >= 0) & (col >= 0), row * (self._shape[1] - 1) + col, -1)
+
+    def _fingerprint_parts(self) -> tuple[Any, ...]:
+        return super()._fingerprint_parts() + (self._shape,) + self._coordinates()
 
     def __str__(self) -> str:
         with np.printoptions(threshold=6):
@@ -185,41 +699,374 @@ class SensibleRectilinearGrid(SensibleGrid):
             )
 
 
-class SensibleStructuredQuadrilateralGrid(SensibleGrid):
-    def __init__(self, bmi: Bmi, grid: int):
-        super().__init__(bmi, grid)
+class _SensibleMesh(SensibleGrid, ABC):
+    """A grid of nodes connected by edges that bound faces.
 
-        shape = np.empty(self.rank, dtype=ctypes.c_int)
-        bmi.get_grid_shape(grid, shape)
-        self._shape = tuple(shape)
+    Subclasses provide the element counts along with *edge_nodes*,
+    *nodes_per_face*, *face_nodes* and *face_edges*, from which the
+    remaining connectivity is derived (and cached).
+    """
+
+    @property
+    @abstractmethod
+    def node_count(self) -> int:
+        """Number of nodes."""
+
+    @property
+    @abstractmethod
+    def edge_count(self) -> int:
+        """Number of edges."""
+
+    @property
+    @abstractmethod
+    def face_count(self) -> int:
+        """Number of faces."""
+
+    @property
+    @abstractmethod
+    def edge_nodes(self) -> NDArray[np.intc]:
+        """Nodes at the tail and head of each edge."""
+
+    @property
+    @abstractmethod
+    def nodes_per_face(self) -> NDArray[np.intc]:
+        """Number of nodes (and edges) of each face."""
+
+    @property
+    @abstractmethod
+    def face_nodes(self) -> NDArray[np.intc]:
+        """Nodes of each face, listed one face after another."""
+
+    @property
+    @abstractmethod
+    def face_edges(self) -> NDArray[np.intc]:
+        """Edges of each face, listed one face after another."""
+
+    @property
+    def face_offsets(self) -> NDArray[np.intp]:
+        """Offsets to the start of each face in *face_nodes* and *face_edges*."""
+
+        def build() -> NDArray[np.intp]:
+            offsets = np.empty(self.face_count + 1, dtype=np.intp)
+            offsets[0] = 0
+            np.cumsum(self.nodes_per_face, out=offsets[1:])
+            return offsets
+
+        return self._cached("face_offsets", build)
+
+    @property
+    def face_of_face_node(self) -> NDArray[np.intp]:
+        """The face that each entry of *face_nodes* (or *face_edges*) belongs to."""
+        return self._cached(
+            "face_of_face_node",
+            lambda: np.repeat(np.arange(self.face_count), self.nodes_per_face),
+        )
+
+    @property
+    def nodes_at_face(self) -> Adjacency:
+        """Nodes of each face."""
+        return self._cached(
+            "nodes_at_face", lambda: Adjacency(self.face_offsets, self.face_nodes)
+        )
+
+    @property
+    def edges_at_face(self) -> Adjacency:
+        """Edges of each face."""
+        return self._cached(
+            "edges_at_face", lambda: Adjacency(self.face_offsets, self.face_edges)
+        )
+
+    @property
+    def faces_at_node(self) -> Adjacency:
+        """Faces that each node is part of, in increasing order."""
+        return self._cached(
+            "faces_at_node",
+            lambda: _invert(self.face_nodes, self.face_of_face_node, self.node_count),
+        )
+
+    @property
+    def edges_at_node(self) -> Adjacency:
+        """Edges that each node is part of, in increasing order."""
+        return self._cached(
+            "edges_at_node",
+            lambda: _invert(
+                self.edge_nodes.reshape(-1),
+                np.repeat(np.arange(self.edge_count), 2),
+                self.node_count,
+            ),
+        )
+
+    @property
+    def faces_at_edge(self) -> Adjacency:
+        """Faces on either side of each edge, in increasing order."""
+        return self._cached(
+            "faces_at_edge",
+            lambda: _invert(self.face_edges, self.face_of_face_node, self.edge_count),
+        )
 
-        self._node_count = np.prod(shape)
+    @property
+    def nodes_at_edge(self) -> Adjacency:
+        """Nodes at the tail and head of each edge."""
+        return self._cached(
+            "nodes_at_edge",
+            lambda: Adjacency(
+                np.arange(0, 2 * self.edge_count + 1, 2), self.edge_nodes.reshape(-1)
+            ),
+        )
+
+    def find_nearest_node(self, x: ArrayLike, y: ArrayLike) -> NDArray[np.intp]:
+        """Find the node nearest to each of a set of points.
+
+        Parameters
+        ----------
+        x, y : array_like
+            Coordinates of the points.
+
+        Returns
+        -------
+        ndarray of int
+            Id of the nearest node to each point.
+        """
+        return self._node_index().nearest(x, y)
+
+    def find_face(self, x: ArrayLike, y: ArrayLike) -> NDArray[np.intp]:
+        """Find the face that contains each of a set of points.
+
+        Parameters
+        ----------
+        x, y : array_like
+            Coordinates of the points.
+
+        Returns
+        -------
+        ndarray of int
+            Id of the face that contains each point, or -1 for points that
+            are not within the grid.
+        """
+        self._require_rank_2("find_face")
+        index = self._cached(
+            "face_index",
+            lambda: FaceIndex(
+                getattr(self, "x_of_node"),
+                getattr(self, "y_of_node"),
+                self.face_offsets,
+                self.face_nodes,
+            ),
+        )
+        return index.locate(x, y)
+
+    def map_values(
+        self,
+        values: ArrayLike,
+        src: str,
+        dst: str,
+        how: str = "mean",
+        out: NDArray[Any] | None = None,
+    ) -> NDArray[Any]:
+        """Map values from one type of grid element to another.
+
+        Each destination element is assigned a reduction of the values at the
+        source elements it is connected to. Destination elements with no
+        connected source elements are assigned NaN (or, for integer output,
+        zero).
+
+        Parameters
+        ----------
+        values : array_like
+            Values at each of the source elements.
+        src, dst : {"node", "edge", "face"}
+            Types of the source and destination elements.
+        how : {"mean", "sum", "min", "max"}, optional
+            How to reduce the values connected to each destination element.
+        out : ndarray, optional
+            Buffer into which the mapped values are placed.
+
+        Returns
+        -------
+        ndarray
+            Values at each of the destination elements.
+        """
+        try:
+            ufunc = _REDUCERS[how]
+        except KeyError:
+            raise ValidationError(
+                f"{how!r}: invalid reduction (not one of {', '.join(_REDUCERS)})"
+            ) from None
+        if src == dst or {src, dst} - {"node", "edge", "face"}:
+            raise ValidationError(f"unable to map values from {src!r} to {dst!r}")
+
+        values = np.asarray(values)
+        n_src = getattr(self, f"{src}_count")
+        if values.shape != (n_src,):
+            raise ValueError(
+                f"values must have shape ({n_src},) to match the number of"
+                f" {src}s (got {values.shape})"
+            )
+
+        return _reduce_adjacent(
+            values,
+            getattr(self, f"{src}s_at_{dst}"),
+            ufunc,
+            mean=how == "mean",
+            out=out,
+        )
+
+    def map_node_to_face(
+        self, values: ArrayLike, how: str = "mean", out: NDArray[Any] | None = None
+    ) -> NDArray[Any]:
+        """Map values at nodes to faces (see :meth:`map_values`)."""
+        return self.map_values(values, "node", "face", how=how, out=out)
+
+    def map_face_to_node(
+        self, values: ArrayLike, how: str = "mean", out: NDArray[Any] | None = None
+    ) -> NDArray[Any]:
+        """Map values at faces to nodes (see :meth:`map_values`)."""
+        return self.map_values(values, "face", "node", how=how, out=out)
+
+    def map_node_to_edge(
+        self, values: ArrayLike, how: str = "mean", out: NDArray[Any] | None = None
+    ) -> NDArray[Any]:
+        """Map values at nodes to edges (see :meth:`map_values`)."""
+        return self.map_values(values, "node", "edge", how=how, out=out)
+
+    def map_edge_to_node(
+        self, values: ArrayLike, how: str = "mean", out: NDArray[Any] | None = None
+    ) -> NDArray[Any]:
+        """Map values at edges to nodes (see :meth:`map_values`)."""
+        return self.map_values(values, "edge", "node", how=how, out=out)
+
+    def map_edge_to_face(
+        self, values: ArrayLike, how: str = "mean", out: NDArray[Any] | None = None
+    ) -> NDArray[Any]:
+        """Map values at edges to faces (see :meth:`map_values`)."""
+        return self.map_values(values, "edge", "face", how=how, out=out)
+
+    def map_face_to_edge(
+        self, values: ArrayLike, how: str = "mean", out: NDArray[Any] | None = None
+    ) -> NDArray[Any]:
+        """Map values at faces to edges (see :meth:`map_values`)."""
+        return self.map_values(values, "face", "edge", how=how, out=out)
+
+
+class SensibleStructuredQuadrilateralGrid(_SensibleMesh):
+    def __init__(
+        self,
+        bmi: Bmi,
+        grid: int,
+        stats: CallStats | None = None,
+        geometry: GeometryCache | None = None,
+    ):
+        super().__init__(bmi, grid, stats=stats, geometry=geometry)
 
-        self._x: NDArray[np.float64]
-        self._y: NDArray[np.float64]
-        self._z: NDArray[np.float64]
+        shape = np.empty(self.rank, dtype=ctypes.c_int)
+        bmi.get_grid_shape(grid, shape)
+        self._shape = tuple(int(n) for n in shape)
 
-        for dim in ("x", "y", "z")[: self.rank]:
-            array = np.empty(self._node_count, dtype=ctypes.c_double)
-            getattr(bmi, f"get_grid_{dim}")(grid, array)
-            array.setflags(write=False)
-            self.__dict__[f"_{dim}"] = array
+        self._node_count = int(np.prod(shape))
 
     @property
     def shape(self) -> tuple[int, ...]:
         return self._shape
 
+    @property
+    def node_count(self) -> int:
+        return self._node_count
+
+    @property
+    def edge_count(self) -> int:
+        n_rows, n_cols = self._shape_2d()
+        return n_rows * (n_cols - 1) + (n_rows - 1) * n_cols
+
+    @property
+    def face_count(self) -> int:
+        n_rows, n_cols = self._shape_2d()
+        return (n_rows - 1) * (n_cols - 1)
+
+    @property
+    def edge_nodes(self) -> NDArray[np.intc]:
+        """Nodes at the tail and head of each edge.
+
+        Edges that run along rows are numbered first, followed by those
+        that run along columns.
+        """
+        return self._topology("edge_nodes")
+
+    @property
+    def nodes_per_face(self) -> NDArray[np.intc]:
+        return self._cached(
+            "nodes_per_face", lambda: np.full(self.face_count, 4, dtype=np.intc)
+        )
+
+    @property
+    def face_nodes(self) -> NDArray[np.intc]:
+        return self._topology("face_nodes")
+
+    @property
+    def face_edges(self) -> NDArray[np.intc]:
+        return self._topology("face_edges")
+
+    def _shape_2d(self) -> tuple[int, int]:
+        if self._rank != 2:
+            raise AttributeError(
+                f"edges and faces are only defined for grids of rank 2"
+                f" (got {self._rank})"
+            )
+        return self._shape[0], self._shape[1]
+
+    def _topology(self, name: str) -> NDArray[np.intc]:
+        """Get *edge_nodes*, *face_nodes* or *face_edges*.
+
+        The three are built, and cached, together.
+        """
+        if name not in self._cache:
+            arrays = self._build_topology()
+            for key, array in zip(("edge_nodes", "face_nodes", "face_edges"), arrays):
+                array.setflags(write=False)
+                self._cache.setdefault(key, array)
+        return self._cache[name]
+
+    def _build_topology(
+        self,
+    ) -> tuple[NDArray[np.intc], NDArray[np.intc], NDArray[np.intc]]:
+        n_rows, n_cols = self._shape_2d()
+        nodes = np.arange(n_rows * n_cols, dtype=np.intc).reshape((n_rows, n_cols))
+
+        edge_nodes = np.concatenate(
+            (
+                np.stack((nodes[:, :-1], nodes[:, 1:]), axis=-1).reshape((-1, 2)),
+                np.stack((nodes[:-1, :], nodes[1:, :]), axis=-1).reshape((-1, 2)),
+            )
+        )
+        face_nodes = np.stack(
+            (nodes[:-1, :-1], nodes[:-1, 1:], nodes[1:, 1:], nodes[1:, :-1]), axis=-1
+        )
+
+        n_row_edges = n_rows * (n_cols - 1)
+        row_edges = np.arange(n_row_edges, dtype=np.intc).reshape((n_rows, n_cols - 1))
+        col_edges = n_row_edges + np.arange(
+            (n_rows - 1) * n_cols, dtype=np.intc
+        ).reshape((n_rows - 1, n_cols))
+        face_edges = np.stack(
+            (row_edges[:-1, :], col_edges[:, 1:], row_edges[1:, :], col_edges[:, :-1]),
+            axis=-1,
+        )
+
+        return edge_nodes, face_nodes.reshape(-1), face_edges.reshape(-1)
+
+    def _fingerprint_parts(self) -> tuple[Any, ...]:
+        return super()._fingerprint_parts() + (self._shape,) + self._coordinates()
+
     @property
     def x_of_node(self) -> NDArray[np.float64]:
-        return self._x
+        return self._fetch_coordinate("x", self._node_count)
 
     @property
     def y_of_node(self) -> NDArray[np.float64]:
-        return self._y
+        return self._fetch_coordinate("y", self._node_count)
 
     @property
     def z_of_node(self) -> NDArray[np.float64]:
-        return self._z
+        return self._fetch_coordinate("z", self._node_count)
 
     def __str__(self) -> str:
         with np.printoptions(threshold=6):
@@ -234,42 +1081,20 @@ class SensibleStructuredQuadrilateralGrid(SensibleGrid):
             )
 
 
-class SensibleUnstructuredGrid(SensibleGrid):
-    def __init__(self, bmi: Bmi, grid: int):
-        super().__init__(bmi, grid)
+class SensibleUnstructuredGrid(_SensibleMesh):
+    def __init__(
+        self,
+        bmi: Bmi,
+        grid: int,
+        stats: CallStats | None = None,
+        geometry: GeometryCache | None = None,
+    ):
+        super().__init__(bmi, grid, stats=stats, geometry=geometry)
 
         self._node_count = bmi.get_grid_node_count(grid)
         self._edge_count = bmi.get_grid_edge_count(grid)
         self._face_count = bmi.get_grid_face_count(grid)
 
-        self._x: NDArray[np.float64]
-        self._y: NDArray[np.float64]
-        self._z: NDArray[np.float64]
-
-        for dim in ("x", "y", "z")[: self.rank]:
-            array = np.empty(self._node_count, dtype=ctypes.c_double)
-            getattr(bmi, f"get_grid_{dim}")(grid, array)
-            array.setflags(write=False)
-            self.__dict__[f"_{dim}"] = array
-
-        self._edge_nodes = np.empty((self.edge_count, 2), dtype=ctypes.c_int)
-        bmi.get_edge_nodes(grid, self._edge_nodes.reshape(-1))
-        self._edge_nodes.setflags(write=False)
-
-        self._nodes_per_face = np.empty(self._face_count, dtype=ctypes.c_int)
-        bmi.get_nodes_per_face(grid, self._nodes_per_face)
-        self._nodes_per_face.setflags(write=False)
-
-        self._face_nodes = np.empty(self._nodes_per_face.sum(), dtype=ctypes.c_int)
-        bmi.get_face_nodes(grid, self._face_nodes)
-        self._face_nodes.setflags(write=False)
-
-        self._face_edges = np.empty(
-            (self._nodes_per_face - 1).sum(), dtype=ctypes.c_int
-        )
-        bmi.get_face_edges(grid, self._face_edges)
-        self._face_edges.setflags(write=False)
-
     @property
     def node_count(self) -> int:
         return self._node_count
@@ -284,31 +1109,38 @@ class SensibleUnstructuredGrid(SensibleGrid):
 
     @property
     def x_of_node(self) -> NDArray[np.float64]:
-        return self._x
+        return self._fetch_coordinate("x", self._node_count)
 
     @property
     def y_of_node(self) -> NDArray[np.float64]:
-        return self._y
+        return self._fetch_coordinate("y", self._node_count)
 
     @property
     def z_of_node(self) -> NDArray[np.float64]:
-        return self._z
+        return self._fetch_coordinate("z", self._node_count)
 
     @property
-    def nodes_per_face(self) -> NDArray[np.int_]:
-        return self._nodes_per_face
+    def nodes_per_face(self) -> NDArray[np.intc]:
+        return self._fetch("nodes_per_face", self._face_count, ctypes.c_int)
 
     @property
-    def edge_nodes(self) -> NDArray[np.float64]:
-        return self._edge_nodes
+    def edge_nodes(self) -> NDArray[np.intc]:
+        return self._fetch("edge_nodes", (self._edge_count, 2), ctypes.c_int)
 
     @property
-    def face_nodes(self) -> NDArray[np.float64]:
-        return self._face_nodes
+    def face_nodes(self) -> NDArray[np.intc]:
+        return self._fetch("face_nodes", int(self.nodes_per_face.sum()), ctypes.c_int)
 
     @property
-    def face_edges(self) -> NDArray[np.float64]:
-        return self._face_edges
+    def face_edges(self) -> NDArray[np.intc]:
+        return self._fetch("face_edges", int(self.nodes_per_face.sum()), ctypes.c_int)
+
+    def _fingerprint_parts(self) -> tuple[Any, ...]:
+        return (
+            super()._fingerprint_parts()
+            + self._coordinates()
+            + (self.edge_nodes, self.nodes_per_face, self.face_nodes, self.face_edges)
+        )
 
     def __str__(self) -> str:
         return pprint.pformat(
@@ -332,6 +1164,13 @@ _GRID_CLASS = {
 }
 
 
-def sensible_grid(bmi: Bmi, grid_id: int) -> SensibleGrid:
+def sensible_grid(
+    bmi: Bmi,
+    grid_id: int,
+    stats: CallStats | None = None,
+    intern: bool = False,
+    geometry: GeometryCache | None = None,
+) -> SensibleGrid:
     grid_type: str = bmi.get_grid_type(grid_id)
-    return _GRID_CLASS[grid_type](bmi, grid_id)
+    grid = _GRID_CLASS[grid_type](bmi, grid_id, stats=stats, geometry=geometry)
+    return grid.intern() if intern else grid
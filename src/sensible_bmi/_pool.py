@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any
+
+import numpy as np
+from numpy.typing import DTypeLike
+from numpy.typing import NDArray
+from sensible_bmi._validators import validate_pool_max_bytes
+
+
+class BufferPool:
+    """A pool of recycled arrays.
+
+    Arrays are handed back to the pool with :meth:`release` and handed out
+    again by :meth:`acquire` when one of the same size and type is asked for.
+    If the pool holds more than *max_bytes*, the least recently released
+    arrays are dropped.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        Maximum number of bytes held by the pool. If not given, the pool is
+        not capped.
+
+    Examples
+    --------
+    >>> from sensible_bmi._pool import BufferPool
+    >>> pool = BufferPool(max_bytes=1024)
+    >>> a = pool.acquire(8, "float64")
+    >>> pool.release(a)
+    >>> pool.acquire(8, "float64") is a
+    True
+    >>> pool.stats["hits"], pool.stats["misses"]
+    (1, 1)
+    """
+
+    def __init__(self, max_bytes: int | None = None):
+        self._max_bytes = validate_pool_max_bytes(max_bytes)
+
+        self._free: OrderedDict[int, NDArray[Any]] = OrderedDict()
+        self._free_by_key: dict[tuple[int, np.dtype[Any]], dict[int, None]] = {}
+        self._bytes_held = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def max_bytes(self) -> int | None:
+        """Maximum number of bytes held by the pool."""
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes: int | None) -> None:
+        self._max_bytes = validate_pool_max_bytes(max_bytes)
+        self._evict()
+
+    @property
+    def bytes_held(self) -> int:
+        """Number of bytes in arrays waiting to be reused."""
+        return self._bytes_held
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Counts of pool hits, misses and evictions, and what the pool holds."""
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "buffers": len(self._free),
+            "bytes_held": self._bytes_held,
+        }
+
+    def acquire(self, size: int, dtype: DTypeLike) -> NDArray[Any]:
+        """Get an uninitialized 1D array, reusing a released one if possible.
+
+        Parameters
+        ----------
+        size : int
+            Number of elements in the array.
+        dtype : data-type
+            Type of the array's elements.
+
+        Returns
+        -------
+        ndarray
+            A writable array.
+        """
+        dtype = np.dtype(dtype)
+        ids = self._free_by_key.get((size, dtype))
+        if ids:
+            array_id, _ = ids.popitem()
+            array = self._free.pop(array_id)
+            self._bytes_held -= array.nbytes
+            self._hits += 1
+            return array
+
+        self._misses += 1
+        return np.empty(size, dtype=dtype)
+
+    def release(self, array: NDArray[Any]) -> None:
+        """Hand an array back to the pool so it can be reused.
+
+        The caller must not use *array* after releasing it.
+
+        Parameters
+        ----------
+        array : ndarray
+            A writable, contiguous 1D array.
+        """
+        if not isinstance(array, np.ndarray):
+            raise TypeError(f"expected an ndarray, got {type(array).__name__}")
+        if array.ndim != 1 or not array.flags.c_contiguous:
+            raise ValueError("only contiguous 1D arrays can be released")
+        if not array.flags.writeable:
+            raise ValueError("read-only arrays can not be released")
+
+        array_id = id(array)
+        if array_id in self._free:
+            return
+
+        self._free[array_id] = array
+        self._free_by_key.setdefault((array.size, array.dtype), {})[array_id] = None
+        self._bytes_held += array.nbytes
+
+        self._evict()
+
+    def clear(self) -> None:
+        """Drop all of the arrays held by the pool."""
+        self._free.clear()
+        self._free_by_key.clear()
+        self._bytes_held = 0
+
+    def _evict(self) -> None:
+        if self._max_bytes is None:
+            return
+        while self._bytes_held > self._max_bytes:
+            array_id, array = self._free.popitem(last=False)
+            del self._free_by_key[(array.size, array.dtype)][array_id]
+            self._bytes_held -= array.nbytes
+            self._evictions += 1
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(max_bytes={self._max_bytes!r})"
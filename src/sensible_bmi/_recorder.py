@@ -0,0 +1,510 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import queue
+import re
+import threading
+import zlib
+from collections.abc import Iterable
+from types import TracebackType
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+from sensible_bmi._errors import SensibleError
+from sensible_bmi._errors import ValidationError
+from sensible_bmi._grid import SensibleGrid
+from sensible_bmi._var import SensibleOutputVar
+from sensible_bmi.sensible_bmi import SensibleBmi
+
+FORMAT_VERSION = 1
+COMPRESSIONS = (None, "zlib", "delta")
+
+_HEADER = "header.json"
+_TIME = "time.bin"
+_UNSAFE = re.compile(r"[^\w.-]")
+_INDEX_ENTRY = np.dtype([("offset", "<i8"), ("nbytes", "<i8"), ("count", "<i8")])
+
+
+def _var_header(var: SensibleOutputVar, filename: str) -> dict[str, Any]:
+    return {
+        "units": var.units,
+        "location": var.location,
+        "grid": var.grid,
+        "type": var.type,
+        "dtype": np.dtype(var.type).str,
+        "itemsize": var.itemsize,
+        "size": var.size,
+        "file": filename,
+    }
+
+
+def _grid_header(grid: SensibleGrid) -> dict[str, Any]:
+    header: dict[str, Any] = {"type": grid.type, "rank": grid.rank}
+    for name in ("shape", "spacing", "origin"):
+        if hasattr(grid, name):
+            header[name] = [value.item() for value in np.asarray(getattr(grid, name))]
+    if hasattr(grid, "node_count"):
+        header["node_count"] = int(getattr(grid, "node_count"))
+    return header
+
+
+def _as_unsigned(values: NDArray[Any]) -> NDArray[Any]:
+    return values.view(f"u{values.dtype.itemsize}")
+
+
+def _encode(values: NDArray[Any], compression: str | None, level: int) -> bytes:
+    """Encode a chunk of snapshots (one per row)."""
+    if compression == "delta":
+        bits = _as_unsigned(values)
+        delta = bits.copy()
+        np.subtract(bits[1:], bits[:-1], out=delta[1:])
+        values = delta
+    if compression is None:
+        return values.tobytes()
+    return zlib.compress(values.tobytes(), level)
+
+
+def _decode(
+    blob: bytes, compression: str | None, dtype: np.dtype[Any], count: int, size: int
+) -> NDArray[Any]:
+    """Decode a chunk of *count* snapshots, each of *size* values."""
+    if compression is not None:
+        blob = zlib.decompress(blob)
+    values = np.frombuffer(blob, dtype=dtype).reshape((count, size))
+    if compression == "delta":
+        bits = _as_unsigned(values)
+        values = np.cumsum(bits, axis=0, dtype=bits.dtype).view(dtype)
+    return values
+
+
+class _Chunk:
+    """A buffer that holds up to a chunk's worth of snapshots."""
+
+    __slots__ = ("time", "values", "count")
+
+    def __init__(self, size: int, variables: Iterable[SensibleOutputVar]):
+        self.time = np.empty(size)
+        self.values = {
+            var.name: np.empty((size, var.size), var.type) for var in variables
+        }
+        self.count = 0
+
+
+class Recorder:
+    """Record snapshots of a component's output variables to disk.
+
+    Snapshots are gathered, in memory, into chunks that are written to an
+    append-only store by a background thread. There are two chunk buffers:
+    while one is being written, the other is filled. The component only
+    waits on the writer if it fills the second buffer before the first
+    has been written.
+
+    The store is a directory that contains a JSON header describing the
+    variables and their grids, a file of the time of each snapshot, and a
+    file of values for each variable (see :class:`RecordStore`).
+
+    Parameters
+    ----------
+    component : SensibleBmi
+        An initialized component.
+    names : iterable of str
+        Names of the output variables to record.
+    path : str or path-like
+        Directory of the store. It must not already contain a store.
+    every : float, optional
+        Interval, in model time, between snapshots taken by :meth:`update`.
+        If not given, each call to :meth:`update` takes a snapshot.
+    chunk_size : int, optional
+        Number of snapshots in each chunk.
+    compression : {None, "zlib", "delta"}, optional
+        How chunks are compressed. *"zlib"* compresses the values with
+        zlib. *"delta"* first replaces each snapshot with its (bitwise)
+        difference from the previous one in the chunk, which compresses
+        better when values change slowly. Both are lossless.
+    level : int, optional
+        The zlib compression level.
+
+    Examples
+    --------
+    Take snapshots as the component runs by passing the recorder as a
+    callback,
+
+    >>> component.run_until(10.0, every=2.0, callback=recorder)  # doctest: +SKIP
+    """
+
+    def __init__(
+        self,
+        component: SensibleBmi,
+        names: Iterable[str],
+        path: str | os.PathLike[str],
+        every: float | None = None,
+        chunk_size: int = 16,
+        compression: str | None = None,
+        level: int = 6,
+    ):
+        if compression not in COMPRESSIONS:
+            raise ValidationError(
+                f"{compression!r}: invalid compression (not one of"
+                f" {', '.join(repr(c) for c in COMPRESSIONS)})"
+            )
+        if chunk_size < 1:
+            raise ValidationError(f"{chunk_size}: chunk size must be positive")
+        if every is not None and not every > 0.0:
+            raise ValidationError(f"{every}: interval must be positive")
+
+        variables = []
+        for name in names:
+            var = component.var[name]
+            if not isinstance(var, SensibleOutputVar):
+                raise SensibleError(f"{name!r}: not an output variable")
+            if compression == "delta" and var.itemsize not in (1, 2, 4, 8):
+                raise ValidationError(
+                    f"{name!r}: delta compression requires an itemsize of 1, 2, 4"
+                    f" or 8 (got {var.itemsize})"
+                )
+            variables.append(var)
+
+        self._path = os.fspath(path)
+        if os.path.exists(os.path.join(self._path, _HEADER)):
+            raise SensibleError(f"{self._path}: store already exists")
+
+        self._component = component
+        self._variables = variables
+        self._every = every
+        self._chunk_size = chunk_size
+        self._compression = compression
+        self._level = level
+        self._next_time = -math.inf
+
+        filenames = {
+            var.name: f"{n}-{_UNSAFE.sub('_', var.name)}.bin"
+            for n, var in enumerate(variables)
+        }
+        grids = sorted({var.grid for var in variables if var.grid is not None})
+        header = {
+            "format": FORMAT_VERSION,
+            "component": component.name,
+            "time_units": component.time.units,
+            "compression": compression,
+            "chunk_size": chunk_size,
+            "vars": {
+                var.name: _var_header(var, filenames[var.name]) for var in variables
+            },
+            "grids": {str(grid): _grid_header(component.grid[grid]) for grid in grids},
+        }
+
+        os.makedirs(self._path, exist_ok=True)
+        self._files = {
+            name: open(os.path.join(self._path, filename), "ab")
+            for name, filename in filenames.items()
+        }
+        self._index = (
+            {}
+            if compression is None
+            else {
+                name: open(os.path.join(self._path, filename + ".index"), "ab")
+                for name, filename in filenames.items()
+            }
+        )
+        self._time = open(os.path.join(self._path, _TIME), "ab")
+        with open(os.path.join(self._path, _HEADER), "w") as fp:
+            json.dump(header, fp, indent=2)
+
+        self._free: queue.Queue[_Chunk] = queue.Queue()
+        for _ in range(2):
+            self._free.put(_Chunk(chunk_size, variables))
+        self._pending: queue.Queue[_Chunk | None] = queue.Queue()
+        self._current: _Chunk | None = None
+        self._error: BaseException | None = None
+        self._count = 0
+        self._closed = False
+
+        self._writer = threading.Thread(
+            target=self._write_chunks, name=f"recorder-{component.name}", daemon=True
+        )
+        self._writer.start()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        """Names of the recorded variables."""
+        return tuple(var.name for var in self._variables)
+
+    @property
+    def count(self) -> int:
+        """Number of snapshots taken so far."""
+        return self._count
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def record(self) -> None:
+        """Take a snapshot of the variables now."""
+        self._raise_if_failed()
+        if self._closed:
+            raise SensibleError("recorder is closed")
+
+        if self._current is None:
+            self._current = self._free.get()
+            self._current.count = 0
+        chunk = self._current
+
+        for var in self._variables:
+            var.get(out=chunk.values[var.name][chunk.count])
+        now = self._component.time.current
+        chunk.time[chunk.count] = now
+        chunk.count += 1
+        self._count += 1
+
+        if self._every is not None:
+            self._next_time = now + self._every
+        if chunk.count == self._chunk_size:
+            self._submit()
+
+    def update(self) -> bool:
+        """Take a snapshot if one is due.
+
+        Returns
+        -------
+        bool
+            Whether a snapshot was taken.
+        """
+        now = self._component.time.current
+        if now < self._next_time and not math.isclose(now, self._next_time):
+            return False
+        self.record()
+        return True
+
+    def __call__(self, component: SensibleBmi) -> None:
+        self.update()
+
+    def flush(self) -> None:
+        """Write all snapshots taken so far and wait for them to be written."""
+        if self._current is not None and self._current.count > 0:
+            self._submit()
+        self._pending.join()
+        self._raise_if_failed()
+
+    def close(self) -> None:
+        """Write any remaining snapshots, stop the writer and close the store."""
+        if self._closed:
+            return
+        try:
+            if self._error is None and self._current is not None:
+                if self._current.count > 0:
+                    self._submit()
+        finally:
+            self._closed = True
+            self._pending.put(None)
+            self._writer.join()
+            for fp in (*self._files.values(), *self._index.values(), self._time):
+                fp.close()
+        self._raise_if_failed()
+
+    def _submit(self) -> None:
+        assert self._current is not None
+        self._pending.put(self._current)
+        self._current = None
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise SensibleError(f"unable to write to {self._path}") from self._error
+
+    def _write_chunks(self) -> None:
+        while True:
+            chunk = self._pending.get()
+            try:
+                if chunk is None:
+                    return
+                if self._error is None:
+                    self._write(chunk)
+            except BaseException as error:
+                self._error = error
+            finally:
+                if chunk is not None:
+                    self._free.put(chunk)
+                self._pending.task_done()
+
+    def _write(self, chunk: _Chunk) -> None:
+        for name, values in chunk.values.items():
+            blob = _encode(values[: chunk.count], self._compression, self._level)
+            fp = self._files[name]
+            offset = fp.tell()
+            fp.write(blob)
+            fp.flush()
+            if self._compression is not None:
+                entry = np.array([(offset, len(blob), chunk.count)], _INDEX_ENTRY)
+                self._index[name].write(entry.tobytes())
+                self._index[name].flush()
+        # the time is written last so that it counts only complete snapshots
+        self._time.write(chunk.time[: chunk.count].astype("<f8").tobytes())
+        self._time.flush()
+
+    def __enter__(self) -> Recorder:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}({self._component.name!r}, {list(self.names)!r},"
+            f" {self._path!r})"
+        )
+
+
+class RecordStore:
+    """Read back the snapshots written by a :class:`Recorder`.
+
+    Parameters
+    ----------
+    path : str or path-like
+        Directory of the store.
+
+    Notes
+    -----
+    Values of an uncompressed store are memory mapped rather than read.
+    Values of a compressed store are decompressed, one chunk at a time, as
+    they are needed.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]):
+        self._path = os.fspath(path)
+        try:
+            with open(os.path.join(self._path, _HEADER)) as fp:
+                self._header = json.load(fp)
+        except FileNotFoundError:
+            raise SensibleError(f"{self._path}: not a store") from None
+        if self._header.get("format") != FORMAT_VERSION:
+            raise SensibleError(
+                f"{self._header.get('format')!r}: unsupported store format"
+            )
+        self._time = _memmap(os.path.join(self._path, _TIME), np.dtype("<f8"))
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def header(self) -> dict[str, Any]:
+        return self._header
+
+    @property
+    def component(self) -> str:
+        return str(self._header["component"])
+
+    @property
+    def compression(self) -> str | None:
+        return self._header["compression"]
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        """Names of the recorded variables."""
+        return tuple(self._header["vars"])
+
+    @property
+    def time(self) -> NDArray[np.float64]:
+        """The time of each snapshot."""
+        return self._time
+
+    def __len__(self) -> int:
+        return len(self._time)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._header["vars"]
+
+    def __getitem__(self, name: str) -> NDArray[Any]:
+        """All the snapshots of a variable, one per row."""
+        info = self._var(name)
+        dtype = np.dtype(info["dtype"])
+        path = os.path.join(self._path, info["file"])
+        if self.compression is None:
+            return _memmap(path, dtype, (len(self), info["size"]))
+
+        chunks = [
+            self._read_chunk(name, n) for n in range(len(self._chunk_index(name)))
+        ]
+        values = (
+            np.concatenate(chunks)[: len(self)]
+            if chunks
+            else np.empty((0, info["size"]), dtype=dtype)
+        )
+        values.setflags(write=False)
+        return values
+
+    def index(self, time: float) -> int:
+        """Index of the snapshot taken at a time.
+
+        Raises
+        ------
+        KeyError
+            If no snapshot was taken at *time*.
+        """
+        i = int(np.searchsorted(self._time, time))
+        for candidate in (i - 1, i):
+            if 0 <= candidate < len(self) and math.isclose(self._time[candidate], time):
+                return candidate
+        raise KeyError(time)
+
+    def snapshot(self, time: float) -> dict[str, NDArray[Any]]:
+        """The values of every variable at a time."""
+        i = self.index(time)
+        return {name: self._row(name, i) for name in self.names}
+
+    def _var(self, name: str) -> dict[str, Any]:
+        try:
+            return dict(self._header["vars"][name])
+        except KeyError:
+            raise KeyError(f"{name!r}: not a recorded variable") from None
+
+    def _row(self, name: str, i: int) -> NDArray[Any]:
+        if self.compression is None:
+            return self[name][i]
+
+        counts = self._chunk_index(name)["count"]
+        n = int(np.searchsorted(np.cumsum(counts), i, side="right"))
+        row = self._read_chunk(name, n)[i - int(counts[:n].sum())]
+        row.setflags(write=False)
+        return row
+
+    def _chunk_index(self, name: str) -> NDArray[Any]:
+        info = self._var(name)
+        return _memmap(os.path.join(self._path, info["file"] + ".index"), _INDEX_ENTRY)
+
+    def _read_chunk(self, name: str, n: int) -> NDArray[Any]:
+        info = self._var(name)
+        offset, nbytes, count = self._chunk_index(name)[n]
+        with open(os.path.join(self._path, info["file"]), "rb") as fp:
+            fp.seek(offset)
+            blob = fp.read(nbytes)
+        return _decode(
+            blob, self.compression, np.dtype(info["dtype"]), int(count), info["size"]
+        )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._path!r})"
+
+
+def _memmap(
+    path: str, dtype: np.dtype[Any], shape: tuple[int, ...] | None = None
+) -> NDArray[Any]:
+    """Memory map a file read-only (an empty file gives an empty array)."""
+    if shape is None:
+        shape = (os.path.getsize(path) // dtype.itemsize,)
+    if math.prod(shape) == 0:
+        array = np.empty(shape, dtype=dtype)
+        array.setflags(write=False)
+        return array
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape)
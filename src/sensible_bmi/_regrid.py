@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike
+from numpy.typing import NDArray
+from sensible_bmi._errors import ValidationError
+from sensible_bmi._grid import SensibleGrid
+from sensible_bmi._grid import SensibleRectilinearGrid
+from sensible_bmi._grid import SensibleUniformRectilinearGrid
+from sensible_bmi._spatial import cell_on_axis
+from sensible_bmi._spatial import NodeIndex
+
+METHODS = ("nearest", "bilinear", "idw")
+
+
+def _node_coordinates(
+    grid: SensibleGrid,
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Flat x and y coordinates of each of a rank-2 grid's nodes."""
+    grid._require_rank_2("regrid")
+    x, y = getattr(grid, "x_of_node"), getattr(grid, "y_of_node")
+    if isinstance(grid, SensibleRectilinearGrid):
+        y, x = np.meshgrid(y, x, indexing="ij")
+    return np.ravel(x), np.ravel(y)
+
+
+def _axes(grid: SensibleGrid) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """The y and x axes of a rank-2 (uniform) rectilinear grid."""
+    grid._require_rank_2("regrid")
+    if isinstance(grid, SensibleRectilinearGrid):
+        return grid.y_of_node, grid.x_of_node
+    elif isinstance(grid, SensibleUniformRectilinearGrid):
+        return (
+            grid.node_coordinate_view("y")[:, 0],
+            grid.node_coordinate_view("x")[0, :],
+        )
+    else:
+        raise ValidationError(
+            f"{grid.type}: bilinear interpolation requires a rectilinear source grid"
+        )
+
+
+def _cell_and_fraction(
+    coords: NDArray[np.float64], values: NDArray[np.float64]
+) -> tuple[NDArray[np.intp], NDArray[np.float64]]:
+    """Interval along an axis that contains each value and the distance into it."""
+    if len(coords) < 2:
+        raise ValidationError("bilinear interpolation requires at least two nodes")
+    cell = cell_on_axis(coords, values)
+    lower = coords[np.maximum(cell, 0)]
+    upper = coords[np.maximum(cell, 0) + 1]
+    return cell, (values - lower) / (upper - lower)
+
+
+def _nearest_weights(
+    src: SensibleGrid, x: NDArray[np.float64], y: NDArray[np.float64]
+) -> tuple[NDArray[np.intp], NDArray[np.intp], NDArray[np.float64]]:
+    nearest = getattr(src, "find_nearest_node")(x, y)
+    return (
+        np.arange(len(x) + 1, dtype=np.intp),
+        np.asarray(nearest, dtype=np.intp),
+        np.ones(len(x)),
+    )
+
+
+def _bilinear_weights(
+    src: SensibleGrid, x: NDArray[np.float64], y: NDArray[np.float64]
+) -> tuple[NDArray[np.intp], NDArray[np.intp], NDArray[np.float64]]:
+    y_axis, x_axis = _axes(src)
+    row, ty = _cell_and_fraction(y_axis, y)
+    col, tx = _cell_and_fraction(x_axis, x)
+
+    is_inside = (row >= 0) & (col >= 0)
+    row, col, ty, tx = row[is_inside], col[is_inside], ty[is_inside], tx[is_inside]
+
+    n_cols = len(x_axis)
+    lower_left = row * n_cols + col
+    indices = np.stack(
+        (lower_left, lower_left + 1, lower_left + n_cols, lower_left + n_cols + 1),
+        axis=-1,
+    )
+    weights = np.stack(
+        ((1.0 - ty) * (1.0 - tx), (1.0 - ty) * tx, ty * (1.0 - tx), ty * tx), axis=-1
+    )
+
+    offsets = np.zeros(len(x) + 1, dtype=np.intp)
+    np.cumsum(np.where(is_inside, 4, 0), out=offsets[1:])
+
+    return offsets, indices.reshape(-1), weights.reshape(-1)
+
+
+def _idw_weights(
+    src: SensibleGrid,
+    x: NDArray[np.float64],
+    y: NDArray[np.float64],
+    k: int,
+    power: float,
+) -> tuple[NDArray[np.intp], NDArray[np.intp], NDArray[np.float64]]:
+    src_x, src_y = _node_coordinates(src)
+    k = min(k, len(src_x))
+
+    nearest = NodeIndex(src_x, src_y).nearest(x, y, k=k).reshape((-1, k))
+    distance = np.hypot(src_x[nearest] - x[:, None], src_y[nearest] - y[:, None])
+
+    is_exact = distance[:, 0] == 0.0
+    with np.errstate(divide="ignore"):
+        weights = distance**-power
+    weights[is_exact] = 0.0
+    weights[is_exact, 0] = 1.0
+    weights /= weights.sum(axis=1, keepdims=True)
+
+    return (
+        np.arange(0, k * len(x) + 1, k, dtype=np.intp),
+        nearest.reshape(-1),
+        weights.reshape(-1),
+    )
+
+
+class Regridder:
+    """Interpolate values at the nodes of one grid onto the nodes of another.
+
+    Interpolation weights are computed once, when the regridder is created,
+    and stored as a sparse matrix in compressed sparse row form. Each call to
+    :meth:`regrid` is then a single sparse matrix-vector product.
+
+    Parameters
+    ----------
+    src, dst : SensibleGrid
+        The source and destination grids (both must be of rank 2).
+    method : {"nearest", "bilinear", "idw"}, optional
+        Interpolation method. *"nearest"* uses the value at the nearest source
+        node, *"bilinear"* (rectilinear source grids only) interpolates
+        within the source cell that contains each destination node and *"idw"*
+        weights the *k* nearest source nodes by inverse distance.
+    k : int, optional
+        Number of source nodes used by *"idw"*.
+    power : float, optional
+        Power of the distance used by *"idw"*.
+    cache_dir : str or path-like, optional
+        If given, a directory in which weights are saved, keyed by the
+        fingerprints of the two grids, so they can be reloaded rather than
+        recomputed.
+    """
+
+    def __init__(
+        self,
+        src: SensibleGrid,
+        dst: SensibleGrid,
+        method: str = "nearest",
+        k: int = 4,
+        power: float = 2.0,
+        cache_dir: str | os.PathLike[str] | None = None,
+    ):
+        if method not in METHODS:
+            raise ValidationError(
+                f"{method!r}: invalid method (not one of {', '.join(METHODS)})"
+            )
+        if k < 1:
+            raise ValidationError(f"{k}: number of neighbors must be positive")
+
+        self._src = src
+        self._dst = dst
+        self._method = method
+        self._params: dict[str, Any] = (
+            {"k": k, "power": power} if method == "idw" else {}
+        )
+
+        path = (
+            None
+            if cache_dir is None
+            else os.path.join(cache_dir, self.cache_key + ".npz")
+        )
+        if path is not None and os.path.isfile(path):
+            with np.load(path) as weights:
+                offsets, indices, values = (
+                    weights["offsets"],
+                    weights["indices"],
+                    weights["weights"],
+                )
+        else:
+            offsets, indices, values = self._compute()
+            if cache_dir is not None and path is not None:
+                os.makedirs(cache_dir, exist_ok=True)
+                _save_weights(path, offsets, indices, values)
+
+        self._offsets = offsets
+        self._indices = indices
+        self._weights = values
+        for array in (self._offsets, self._indices, self._weights):
+            array.setflags(write=False)
+
+        counts = np.diff(self._offsets)
+        self._is_empty = counts == 0
+        self._starts = self._offsets[:-1][~self._is_empty]
+        self._gathered = np.empty(len(self._indices))
+
+    def _compute(
+        self,
+    ) -> tuple[NDArray[np.intp], NDArray[np.intp], NDArray[np.float64]]:
+        x, y = _node_coordinates(self._dst)
+        if self._method == "nearest":
+            return _nearest_weights(self._src, x, y)
+        elif self._method == "bilinear":
+            return _bilinear_weights(self._src, x, y)
+        else:
+            return _idw_weights(self._src, x, y, **self._params)
+
+    @property
+    def src(self) -> SensibleGrid:
+        return self._src
+
+    @property
+    def dst(self) -> SensibleGrid:
+        return self._dst
+
+    @property
+    def method(self) -> str:
+        return self._method
+
+    @property
+    def cache_key(self) -> str:
+        """Name under which weights are saved in a cache directory."""
+        params = "".join(f"-{key}{value}" for key, value in self._params.items())
+        return f"{self._src.fingerprint}-{self._dst.fingerprint}-{self._method}{params}"
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """Number of destination and source nodes."""
+        return len(self._offsets) - 1, getattr(self._src, "node_count")
+
+    @property
+    def offsets(self) -> NDArray[np.intp]:
+        return self._offsets
+
+    @property
+    def indices(self) -> NDArray[np.intp]:
+        return self._indices
+
+    @property
+    def weights(self) -> NDArray[np.float64]:
+        return self._weights
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self._offsets.nbytes
+            + self._indices.nbytes
+            + self._weights.nbytes
+            + self._gathered.nbytes
+        )
+
+    def regrid(
+        self, values: ArrayLike, out: NDArray[Any] | None = None
+    ) -> NDArray[Any]:
+        """Interpolate values at the source nodes onto the destination nodes.
+
+        Destination nodes that are outside of the source grid (for
+        *"bilinear"*) are assigned NaN.
+
+        Parameters
+        ----------
+        values : array_like
+            Values at each of the source nodes.
+        out : ndarray, optional
+            Buffer into which the interpolated values are placed.
+
+        Returns
+        -------
+        ndarray
+            Values at each of the destination nodes.
+        """
+        n_dst, n_src = self.shape
+
+        values = np.asarray(values).reshape(-1)
+        if values.shape != (n_src,):
+            raise ValueError(
+                f"values must have shape ({n_src},) to match the number of source"
+                f" nodes (got {values.shape})"
+            )
+        if out is None:
+            out = np.empty(n_dst)
+        elif out.shape != (n_dst,):
+            raise ValueError(f"out must have shape ({n_dst},)")
+
+        if values.dtype == self._gathered.dtype:
+            np.take(values, self._indices, out=self._gathered)
+        else:
+            self._gathered[:] = values[self._indices]
+        np.multiply(self._gathered, self._weights, out=self._gathered)
+
+        if self._gathered.size == 0:
+            pass
+        elif len(self._starts) == n_dst:
+            np.add.reduceat(self._gathered, self._starts, out=out)
+        else:
+            out[~self._is_empty] = np.add.reduceat(self._gathered, self._starts)
+        out[self._is_empty] = np.nan
+
+        return out
+
+    def __call__(
+        self, values: ArrayLike, out: NDArray[Any] | None = None
+    ) -> NDArray[Any]:
+        return self.regrid(values, out=out)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(<grid {self._src.id}>, <grid {self._dst.id}>,"
+            f" method={self._method!r})"
+        )
+
+
+def _save_weights(
+    path: str,
+    offsets: NDArray[np.intp],
+    indices: NDArray[np.intp],
+    weights: NDArray[np.float64],
+) -> None:
+    """Save weights to an ``.npz`` file, replacing *path* only once written."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".npz")
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            np.savez(fp, offsets=offsets, indices=indices, weights=weights)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
@@ -0,0 +1,478 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import pickle
+import threading
+import traceback
+import weakref
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+from typing import NamedTuple
+
+import numpy as np
+from bmipy.bmi import Bmi
+from numpy.typing import NDArray
+from sensible_bmi._errors import SensibleError
+
+_REFRESHES_VALUES = frozenset(
+    ("initialize", "update", "update_until", "set_value", "set_value_at_indices")
+)
+_RELEASE = "_release_block"
+
+
+class _Shared(NamedTuple):
+    """Stands in for an array, in a block of shared memory, in a message."""
+
+    name: str
+    dtype: str
+    size: int
+
+
+class _Host:
+    """The child side of a :class:`RemoteBmi`."""
+
+    def __init__(self, bmi: Bmi):
+        self._bmi = bmi
+        self._blocks: dict[str, SharedMemory] = {}
+
+    def view(self, shared: _Shared) -> NDArray[Any]:
+        try:
+            block = self._blocks[shared.name]
+        except KeyError:
+            block = self._blocks[shared.name] = SharedMemory(name=shared.name)
+        return np.ndarray(shared.size, dtype=shared.dtype, buffer=block.buf)
+
+    def release(self, name: str) -> None:
+        """Unmap a block of shared memory that the parent has replaced."""
+        block = self._blocks.pop(name, None)
+        if block is not None:
+            block.close()
+
+    def call(self, method: str, args: tuple[Any, ...]) -> Any:
+        if method == _RELEASE:
+            return self.release(*args)
+
+        args = tuple(
+            self.view(arg) if isinstance(arg, _Shared) else arg for arg in args
+        )
+        rtn = getattr(self._bmi, method)(*args)
+
+        return None if isinstance(rtn, np.ndarray) else rtn
+
+    def close(self) -> None:
+        for block in self._blocks.values():
+            block.close()
+        self._blocks.clear()
+
+
+def _serve(conn: Connection, bmi_class: type[Bmi]) -> None:
+    """Host an instance of *bmi_class*, running the methods sent by its proxy."""
+    host = _Host(bmi_class())
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            if message is None:
+                conn.send(("ok", None))
+                break
+
+            cwd, method, args = message
+            try:
+                if os.getcwd() != cwd:
+                    os.chdir(cwd)
+                reply = ("ok", host.call(method, args))
+            except Exception as error:
+                try:
+                    pickle.dumps(error)
+                except Exception:
+                    error = SensibleError(traceback.format_exc())
+                reply = ("error", error)
+            conn.send(reply)
+    finally:
+        host.close()
+        conn.close()
+
+
+def _shutdown(process: Any, conn: Connection, blocks: dict[Any, SharedMemory]) -> None:
+    try:
+        conn.send(None)
+        conn.recv()
+    except (EOFError, OSError):
+        pass
+    conn.close()
+
+    process.join(timeout=5.0)
+    if process.is_alive():
+        process.terminate()
+        process.join()
+
+    for block in blocks.values():
+        try:
+            block.close()
+        except BufferError:
+            pass
+        block.unlink()
+    blocks.clear()
+
+
+class RemoteBmi(Bmi):
+    """A BMI whose component runs in a child process.
+
+    Calls are forwarded to an instance of :attr:`bmi_class` hosted by a child
+    process. Arrays (variable values, grid coordinates and connectivity)
+    are passed through blocks of shared memory, sized from the number of
+    bytes of each variable, so only control messages go through the pipe to
+    the child. Values are still copied: once between the caller's array and
+    shared memory and once between shared memory and the component.
+
+    Arrays returned by :meth:`get_value_ptr` are read-only views of shared
+    memory. They are not refreshed by the calls that may change them
+    (``update``, ``set_value``, etc.) but, lazily, the next time they are
+    asked for with :meth:`get_value_ptr` or :meth:`refresh_value_ptr`.
+
+    If the child process dies, calls raise :class:`SensibleError`, but the
+    parent process is unaffected.
+
+    Use :func:`remote_bmi_class` to create a subclass for a particular BMI
+    class.
+    """
+
+    bmi_class: type[Bmi] | None = None
+
+    def __init__(self) -> None:
+        if self.bmi_class is None:
+            raise RuntimeError("There is no BMI class associated with this class.")
+
+        self._lock = threading.RLock()
+        self._blocks: dict[Any, SharedMemory] = {}
+        self._ptrs: dict[str, NDArray[Any]] = {}
+        self._fresh: set[str] = set()
+        self._var_info: dict[str, tuple[np.dtype[Any], int]] = {}
+
+        context = multiprocessing.get_context()
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(
+            target=_serve, args=(child_conn, self.bmi_class), daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+
+        self._finalizer = weakref.finalize(
+            self, _shutdown, self._process, self._conn, self._blocks
+        )
+
+    @property
+    def pid(self) -> int:
+        """Id of the process that hosts the component."""
+        return int(self._process.pid or 0)
+
+    @property
+    def is_alive(self) -> bool:
+        """Whether the process that hosts the component is running."""
+        return bool(self._process.is_alive())
+
+    def close(self) -> None:
+        """Stop the child process and release shared memory."""
+        self._ptrs.clear()
+        self._finalizer()
+
+    def _call(self, method: str, *args: Any) -> Any:
+        if not self._finalizer.alive:
+            raise SensibleError("component process has been closed")
+
+        with self._lock:
+            if method in _REFRESHES_VALUES:
+                self._fresh.clear()
+            try:
+                self._conn.send((os.getcwd(), method, args))
+                status, payload = self._conn.recv()
+            except (EOFError, OSError):
+                self._process.join(timeout=1.0)
+                raise SensibleError(
+                    f"{method}: component process exited unexpectedly"
+                    f" (exit code {self._process.exitcode})"
+                ) from None
+
+        if status == "error":
+            raise payload
+        return payload
+
+    def _block(self, key: Any, nbytes: int) -> SharedMemory:
+        """Get a block of shared memory of at least *nbytes*.
+
+        The caller must hold the lock, and keep holding it while it uses the
+        block, as other calls may use the same block.
+        """
+        block = self._blocks.get(key)
+        if block is None or block.size < nbytes:
+            if block is not None:
+                self._call(_RELEASE, block.name)
+                try:
+                    block.close()
+                except BufferError:
+                    pass
+                block.unlink()
+            block = self._blocks[key] = SharedMemory(create=True, size=max(nbytes, 1))
+        return block
+
+    def _get_into(
+        self, method: str, key: Any, dest: NDArray[Any], *args: Any
+    ) -> NDArray[Any]:
+        """Call a method that fills *dest*, its last argument."""
+        with self._lock:
+            block = self._block(key, dest.nbytes)
+            self._call(method, *args, _Shared(block.name, dest.dtype.str, dest.size))
+            np.copyto(
+                dest,
+                np.ndarray(dest.size, dtype=dest.dtype, buffer=block.buf).reshape(
+                    dest.shape
+                ),
+            )
+        return dest
+
+    def _shared(self, key: Any, values: NDArray[Any]) -> _Shared:
+        values = np.ascontiguousarray(values)
+        block = self._block(key, values.nbytes)
+        np.copyto(
+            np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf), values
+        )
+        return _Shared(block.name, values.dtype.str, values.size)
+
+    def _info(self, name: str) -> tuple[np.dtype[Any], int]:
+        try:
+            return self._var_info[name]
+        except KeyError:
+            info = self._var_info[name] = (
+                np.dtype(self.get_var_type(name)),
+                self.get_var_nbytes(name),
+            )
+            return info
+
+    def initialize(self, config_file: str) -> None:
+        self._ptrs.clear()
+        self._var_info.clear()
+        return self._call("initialize", config_file)
+
+    def update(self) -> None:
+        return self._call("update")
+
+    def update_until(self, time: float) -> None:
+        return self._call("update_until", time)
+
+    def finalize(self) -> None:
+        self._ptrs.clear()
+        return self._call("finalize")
+
+    def get_component_name(self) -> str:
+        return self._call("get_component_name")
+
+    def get_input_item_count(self) -> int:
+        return self._call("get_input_item_count")
+
+    def get_output_item_count(self) -> int:
+        return self._call("get_output_item_count")
+
+    def get_input_var_names(self) -> tuple[str]:
+        return self._call("get_input_var_names")
+
+    def get_output_var_names(self) -> tuple[str]:
+        return self._call("get_output_var_names")
+
+    def get_var_grid(self, name: str) -> int:
+        return self._call("get_var_grid", name)
+
+    def get_var_type(self, name: str) -> str:
+        return self._call("get_var_type", name)
+
+    def get_var_units(self, name: str) -> str:
+        return self._call("get_var_units", name)
+
+    def get_var_itemsize(self, name: str) -> int:
+        return self._call("get_var_itemsize", name)
+
+    def get_var_nbytes(self, name: str) -> int:
+        return self._call("get_var_nbytes", name)
+
+    def get_var_location(self, name: str) -> str:
+        return self._call("get_var_location", name)
+
+    def get_current_time(self) -> float:
+        return self._call("get_current_time")
+
+    def get_start_time(self) -> float:
+        return self._call("get_start_time")
+
+    def get_end_time(self) -> float:
+        return self._call("get_end_time")
+
+    def get_time_units(self) -> str:
+        return self._call("get_time_units")
+
+    def get_time_step(self) -> float:
+        return self._call("get_time_step")
+
+    def get_value(self, name: str, dest: NDArray[Any]) -> NDArray[Any]:
+        return self._get_into("get_value", ("var", name), dest, name)
+
+    def get_value_ptr(self, name: str) -> NDArray[Any]:
+        try:
+            ptr = self._ptrs[name]
+        except KeyError:
+            pass
+        else:
+            self.refresh_value_ptr(name)
+            return ptr
+
+        dtype, nbytes = self._info(name)
+        with self._lock:
+            block = self._block(("ptr", name), nbytes)
+            size = nbytes // dtype.itemsize
+            self._call("get_value", name, _Shared(block.name, dtype.str, size))
+            self._fresh.add(name)
+
+        ptr = np.ndarray(size, dtype=dtype, buffer=block.buf)
+        ptr.setflags(write=False)
+        self._ptrs[name] = ptr
+        return ptr
+
+    def refresh_value_ptr(self, name: str) -> None:
+        """Bring the array returned by :meth:`get_value_ptr` up to date.
+
+        The values are only copied if the component may have changed them
+        since they were last refreshed.
+
+        Parameters
+        ----------
+        name : str
+            Name of a variable whose pointer has been asked for.
+        """
+        with self._lock:
+            if name in self._fresh:
+                return
+            ptr = self._ptrs[name]
+            block = self._blocks[("ptr", name)]
+            self._call("get_value", name, _Shared(block.name, ptr.dtype.str, ptr.size))
+            self._fresh.add(name)
+
+    def get_value_at_indices(
+        self, name: str, dest: NDArray[Any], inds: NDArray[np.int_]
+    ) -> NDArray[Any]:
+        with self._lock:
+            block = self._block(("var", name), dest.nbytes)
+            self._call(
+                "get_value_at_indices",
+                name,
+                _Shared(block.name, dest.dtype.str, dest.size),
+                self._shared(("inds", name), inds),
+            )
+            np.copyto(dest, np.ndarray(dest.shape, dtype=dest.dtype, buffer=block.buf))
+        return dest
+
+    def set_value(self, name: str, src: NDArray[Any]) -> None:
+        with self._lock:
+            return self._call("set_value", name, self._shared(("var", name), src))
+
+    def set_value_at_indices(
+        self, name: str, inds: NDArray[np.int_], src: NDArray[Any]
+    ) -> None:
+        with self._lock:
+            return self._call(
+                "set_value_at_indices",
+                name,
+                self._shared(("inds", name), inds),
+                self._shared(("var", name), src),
+            )
+
+    def get_grid_rank(self, grid: int) -> int:
+        return self._call("get_grid_rank", grid)
+
+    def get_grid_size(self, grid: int) -> int:
+        return self._call("get_grid_size", grid)
+
+    def get_grid_type(self, grid: int) -> str:
+        return self._call("get_grid_type", grid)
+
+    def get_grid_shape(self, grid: int, shape: NDArray[np.int_]) -> NDArray[np.int_]:
+        return self._get_into("get_grid_shape", ("grid", grid, "shape"), shape, grid)
+
+    def get_grid_spacing(
+        self, grid: int, spacing: NDArray[np.float64]
+    ) -> NDArray[np.float64]:
+        return self._get_into(
+            "get_grid_spacing", ("grid", grid, "spacing"), spacing, grid
+        )
+
+    def get_grid_origin(
+        self, grid: int, origin: NDArray[np.float64]
+    ) -> NDArray[np.float64]:
+        return self._get_into("get_grid_origin", ("grid", grid, "origin"), origin, grid)
+
+    def get_grid_x(self, grid: int, x: NDArray[np.float64]) -> NDArray[np.float64]:
+        return self._get_into("get_grid_x", ("grid", grid, "x"), x, grid)
+
+    def get_grid_y(self, grid: int, y: NDArray[np.float64]) -> NDArray[np.float64]:
+        return self._get_into("get_grid_y", ("grid", grid, "y"), y, grid)
+
+    def get_grid_z(self, grid: int, z: NDArray[np.float64]) -> NDArray[np.float64]:
+        return self._get_into("get_grid_z", ("grid", grid, "z"), z, grid)
+
+    def get_grid_node_count(self, grid: int) -> int:
+        return self._call("get_grid_node_count", grid)
+
+    def get_grid_edge_count(self, grid: int) -> int:
+        return self._call("get_grid_edge_count", grid)
+
+    def get_grid_face_count(self, grid: int) -> int:
+        return self._call("get_grid_face_count", grid)
+
+    def get_grid_edge_nodes(
+        self, grid: int, edge_nodes: NDArray[np.int_]
+    ) -> NDArray[np.int_]:
+        return self._get_into(
+            "get_grid_edge_nodes", ("grid", grid, "edge_nodes"), edge_nodes, grid
+        )
+
+    def get_grid_face_edges(
+        self, grid: int, face_edges: NDArray[np.int_]
+    ) -> NDArray[np.int_]:
+        return self._get_into(
+            "get_grid_face_edges", ("grid", grid, "face_edges"), face_edges, grid
+        )
+
+    def get_grid_face_nodes(
+        self, grid: int, face_nodes: NDArray[np.int_]
+    ) -> NDArray[np.int_]:
+        return self._get_into(
+            "get_grid_face_nodes", ("grid", grid, "face_nodes"), face_nodes, grid
+        )
+
+    def get_grid_nodes_per_face(
+        self, grid: int, nodes_per_face: NDArray[np.int_]
+    ) -> NDArray[np.int_]:
+        return self._get_into(
+            "get_grid_nodes_per_face",
+            ("grid", grid, "nodes_per_face"),
+            nodes_per_face,
+            grid,
+        )
+
+
+def remote_bmi_class(bmi_class: type[Bmi]) -> type[RemoteBmi]:
+    """Create a BMI class that runs *bmi_class* in a child process.
+
+    Parameters
+    ----------
+    bmi_class : type
+        The BMI class to host. Unless child processes are started by forking,
+        it must be picklable.
+
+    Returns
+    -------
+    type
+        A subclass of :class:`RemoteBmi`.
+    """
+    return type(f"Remote{bmi_class.__name__}", (RemoteBmi,), {"bmi_class": bmi_class})
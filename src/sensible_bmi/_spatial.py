@@ -0,0 +1,404 @@
+from __future__ import annotations
+
+import math
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike
+from numpy.typing import NDArray
+
+
+class _Buckets:
+    """A uniform grid of rectangular buckets covering a bounding box."""
+
+    def __init__(
+        self, bounds: tuple[float, float, float, float], n_buckets: int
+    ) -> None:
+        x_min, x_max, y_min, y_max = bounds
+        width, height = x_max - x_min, y_max - y_min
+
+        if width > 0.0 and height > 0.0:
+            cell = math.sqrt(width * height / max(n_buckets, 1))
+        else:
+            cell = max(width, height) / max(n_buckets, 1)
+        cell = cell if cell > 0.0 else 1.0
+
+        self.shape = (
+            max(min(math.ceil(height / cell), n_buckets), 1),
+            max(min(math.ceil(width / cell), n_buckets), 1),
+        )
+        self.origin = (y_min, x_min)
+        self.size = (
+            height / self.shape[0] if height > 0.0 else 1.0,
+            width / self.shape[1] if width > 0.0 else 1.0,
+        )
+
+    def row_col(
+        self, x: NDArray[np.float64], y: NDArray[np.float64]
+    ) -> tuple[NDArray[np.intp], NDArray[np.intp]]:
+        """Bucket row and column of each point, clipped to the grid."""
+        row = np.floor((y - self.origin[0]) / self.size[0]).astype(np.intp)
+        col = np.floor((x - self.origin[1]) / self.size[1]).astype(np.intp)
+        np.clip(row, 0, self.shape[0] - 1, out=row)
+        np.clip(col, 0, self.shape[1] - 1, out=col)
+        return row, col
+
+
+def _csr(keys: NDArray[np.intp], n: int) -> tuple[NDArray[np.intp], NDArray[np.intp]]:
+    """Offsets and ordering that group the elements of *keys* by value."""
+    offsets = np.empty(n + 1, dtype=np.intp)
+    offsets[0] = 0
+    np.cumsum(np.bincount(keys, minlength=n), out=offsets[1:])
+    return offsets, np.argsort(keys, kind="stable")
+
+
+def _expand(
+    offsets: NDArray[np.intp], rows: NDArray[np.intp]
+) -> tuple[NDArray[np.intp], NDArray[np.intp]]:
+    """Positions of the entries of each of *rows* of a CSR structure.
+
+    Returns the index into *rows* that each entry came from along with the
+    entry's position.
+    """
+    counts = offsets[rows + 1] - offsets[rows]
+    owner = np.repeat(np.arange(len(rows)), counts)
+    first = np.cumsum(counts) - counts
+    position = np.arange(counts.sum()) - np.repeat(first, counts)
+    return owner, offsets[rows][owner] + position
+
+
+def _ring(r: int) -> tuple[NDArray[np.intp], NDArray[np.intp]]:
+    """Row and column offsets of the buckets *r* buckets away."""
+    if r == 0:
+        return np.zeros(1, dtype=np.intp), np.zeros(1, dtype=np.intp)
+    side = np.arange(-r, r + 1, dtype=np.intp)
+    inner = side[1:-1]
+    d_row = np.concatenate(
+        (np.full_like(side, -r), np.full_like(side, r), inner, inner)
+    )
+    d_col = np.concatenate(
+        (side, side, np.full_like(inner, -r), np.full_like(inner, r))
+    )
+    return d_row, d_col
+
+
+class NodeIndex:
+    """Bucket index of a set of 2D points for nearest-neighbor queries.
+
+    Parameters
+    ----------
+    x, y : array_like
+        Coordinates of the points.
+    points_per_bucket : int, optional
+        Target number of points in each bucket.
+
+    Examples
+    --------
+    >>> from sensible_bmi._spatial import NodeIndex
+    >>> index = NodeIndex([0.0, 1.0, 0.0, 1.0], [0.0, 0.0, 1.0, 1.0])
+    >>> index.nearest([0.1, 0.9, 5.0], [0.2, 0.6, -5.0])
+    array([0, 3, 1])
+    """
+
+    def __init__(self, x: ArrayLike, y: ArrayLike, points_per_bucket: int = 4):
+        self._x = np.asarray(x, dtype=float).reshape(-1)
+        self._y = np.asarray(y, dtype=float).reshape(-1)
+        if self._x.size == 0:
+            raise ValueError("unable to index an empty set of points")
+
+        self._buckets = _Buckets(
+            (self._x.min(), self._x.max(), self._y.min(), self._y.max()),
+            max(self._x.size // points_per_bucket, 1),
+        )
+        n_rows, n_cols = self._buckets.shape
+
+        row, col = self._buckets.row_col(self._x, self._y)
+        self._offsets, self._points = _csr(row * n_cols + col, n_rows * n_cols)
+
+    @property
+    def nbytes(self) -> int:
+        return self._offsets.nbytes + self._points.nbytes
+
+    def nearest(self, x: ArrayLike, y: ArrayLike, k: int = 1) -> NDArray[np.intp]:
+        """Find the point nearest to each query point.
+
+        Parameters
+        ----------
+        x, y : array_like
+            Coordinates of the query points.
+        k : int, optional
+            Number of nearest points to find for each query point.
+
+        Returns
+        -------
+        ndarray of int
+            Index of the nearest point, shaped like the (broadcast) query. If
+            *k* is greater than one, the last dimension holds the indices of
+            the *k* nearest points, closest first (padded with -1 if there are
+            fewer than *k* points).
+        """
+        qx, qy = np.broadcast_arrays(
+            np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        )
+        shape = qx.shape
+        qx, qy = qx.reshape(-1), qy.reshape(-1)
+
+        n_rows, n_cols = self._buckets.shape
+        q_row, q_col = self._buckets.row_col(qx, qy)
+        min_cell = min(self._buckets.size)
+
+        best = np.full((qx.size, k), -1, dtype=np.intp)
+        best_d2 = np.full((qx.size, k), np.inf)
+
+        active = np.arange(qx.size)
+        for r in range(max(n_rows, n_cols) + 1):
+            if active.size == 0:
+                break
+            d_row, d_col = _ring(r)
+            rows = q_row[active, None] + d_row
+            cols = q_col[active, None] + d_col
+            is_valid = (rows >= 0) & (rows < n_rows) & (cols >= 0) & (cols < n_cols)
+
+            query = np.broadcast_to(active[:, None], rows.shape)[is_valid]
+            owner, entries = _expand(
+                self._offsets, rows[is_valid] * n_cols + cols[is_valid]
+            )
+            if entries.size > 0:
+                query = np.concatenate((query[owner], np.repeat(active, k)))
+                points = np.concatenate(
+                    (self._points[entries], best[active].reshape(-1))
+                )
+                d2 = (self._x[points] - qx[query]) ** 2 + (
+                    self._y[points] - qy[query]
+                ) ** 2
+                d2[entries.size :] = best_d2[active].reshape(-1)
+
+                order = np.lexsort((points, d2, query))
+                query, points, d2 = query[order], points[order], d2[order]
+                is_first = np.empty(query.size, dtype=bool)
+                is_first[0] = True
+                np.not_equal(query[1:], query[:-1], out=is_first[1:])
+                first = np.flatnonzero(is_first)
+                rank = np.arange(query.size) - np.repeat(
+                    first, np.diff(np.append(first, query.size))
+                )
+
+                is_kept = rank < k
+                best[query[is_kept], rank[is_kept]] = points[is_kept]
+                best_d2[query[is_kept], rank[is_kept]] = d2[is_kept]
+
+            active = active[best_d2[active, -1] > (r * min_cell) ** 2]
+
+        return best.reshape(shape) if k == 1 else best.reshape(shape + (k,))
+
+
+class FaceIndex:
+    """Bucket index of a set of 2D polygons for point-location queries.
+
+    Parameters
+    ----------
+    x, y : array_like
+        Coordinates of the polygon vertices.
+    offsets : array_like of int
+        Offsets into *vertices* to the start of each polygon.
+    vertices : array_like of int
+        Vertices of each polygon, in order around the polygon.
+
+    Examples
+    --------
+    >>> from sensible_bmi._spatial import FaceIndex
+    >>> index = FaceIndex(
+    ...     [0.0, 1.0, 2.0, 0.0, 1.0, 2.0],
+    ...     [0.0, 0.0, 0.0, 1.0, 1.0, 1.0],
+    ...     [0, 4, 8],
+    ...     [0, 1, 4, 3, 1, 2, 5, 4],
+    ... )
+    >>> index.locate([0.5, 1.5, 3.0], [0.5, 0.5, 0.5])
+    array([ 0,  1, -1])
+    """
+
+    def __init__(
+        self, x: ArrayLike, y: ArrayLike, offsets: ArrayLike, vertices: ArrayLike
+    ):
+        self._x = np.asarray(x, dtype=float).reshape(-1)
+        self._y = np.asarray(y, dtype=float).reshape(-1)
+        self._offsets = np.asarray(offsets, dtype=np.intp)
+        self._vertices = np.asarray(vertices, dtype=np.intp)
+
+        n_faces = len(self._offsets) - 1
+        if n_faces == 0:
+            raise ValueError("unable to index an empty set of polygons")
+
+        starts = self._offsets[:-1]
+        x_of_vertex = self._x[self._vertices]
+        y_of_vertex = self._y[self._vertices]
+        self._bounds = (
+            np.minimum.reduceat(x_of_vertex, starts),
+            np.maximum.reduceat(x_of_vertex, starts),
+            np.minimum.reduceat(y_of_vertex, starts),
+            np.maximum.reduceat(y_of_vertex, starts),
+        )
+        x_min, x_max, y_min, y_max = self._bounds
+        self._extent = (x_min.min(), x_max.max(), y_min.min(), y_max.max())
+
+        self._buckets = _Buckets(self._extent, n_faces)
+        n_rows, n_cols = self._buckets.shape
+
+        row_min, col_min = self._buckets.row_col(x_min, y_min)
+        row_max, col_max = self._buckets.row_col(x_max, y_max)
+        n_row = row_max - row_min + 1
+        n_col = col_max - col_min + 1
+
+        face = np.repeat(np.arange(n_faces), n_row * n_col)
+        k = np.arange(face.size) - np.repeat(
+            np.cumsum(n_row * n_col) - n_row * n_col, n_row * n_col
+        )
+        bucket = (row_min[face] + k // n_col[face]) * n_cols + (
+            col_min[face] + k % n_col[face]
+        )
+
+        self._bucket_offsets, order = _csr(bucket, n_rows * n_cols)
+        self._faces = face[order]
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self._bucket_offsets.nbytes
+            + self._faces.nbytes
+            + sum(bound.nbytes for bound in self._bounds)
+        )
+
+    def locate(self, x: ArrayLike, y: ArrayLike) -> NDArray[np.intp]:
+        """Find the polygon that contains each query point.
+
+        Parameters
+        ----------
+        x, y : array_like
+            Coordinates of the query points.
+
+        Returns
+        -------
+        ndarray of int
+            Index of the polygon that contains each point (or -1 if it is not
+            within any), shaped like the (broadcast) query.
+        """
+        qx, qy = np.broadcast_arrays(
+            np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        )
+        shape = qx.shape
+        qx, qy = qx.reshape(-1), qy.reshape(-1)
+
+        found = np.full(qx.size, -1, dtype=np.intp)
+
+        x_min, x_max, y_min, y_max = self._extent
+        query = np.flatnonzero(
+            (qx >= x_min) & (qx <= x_max) & (qy >= y_min) & (qy <= y_max)
+        )
+        if query.size == 0:
+            return found.reshape(shape)
+
+        row, col = self._buckets.row_col(qx[query], qy[query])
+        owner, entries = _expand(
+            self._bucket_offsets, row * self._buckets.shape[1] + col
+        )
+        query, face = query[owner], self._faces[entries]
+
+        is_inside_box = (
+            (qx[query] >= self._bounds[0][face])
+            & (qx[query] <= self._bounds[1][face])
+            & (qy[query] >= self._bounds[2][face])
+            & (qy[query] <= self._bounds[3][face])
+        )
+        query, face = query[is_inside_box], face[is_inside_box]
+
+        is_inside = self._contains(face, qx[query], qy[query])
+        query, face = query[is_inside], face[is_inside]
+
+        lowest = np.full(qx.size, np.iinfo(np.intp).max, dtype=np.intp)
+        np.minimum.at(lowest, query, face)
+        found[query] = lowest[query]
+
+        return found.reshape(shape)
+
+    def _contains(
+        self, face: NDArray[np.intp], px: NDArray[np.float64], py: NDArray[np.float64]
+    ) -> NDArray[np.bool_]:
+        """Test if each point is inside its paired polygon (crossing number)."""
+        if face.size == 0:
+            return np.zeros(0, dtype=bool)
+
+        n_vertices = self._offsets[face + 1] - self._offsets[face]
+        pair, entry = _expand(self._offsets, face)
+        start = self._offsets[face][pair]
+        next_entry = start + (entry - start + 1) % n_vertices[pair]
+
+        x1, y1 = self._x[self._vertices[entry]], self._y[self._vertices[entry]]
+        x2 = self._x[self._vertices[next_entry]]
+        y2 = self._y[self._vertices[next_entry]]
+        px, py = px[pair], py[pair]
+
+        straddles = (y1 > py) != (y2 > py)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_cross = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+        crosses = straddles & (px < x_cross)
+
+        n_crossings = np.add.reduceat(
+            crosses.astype(np.intp), np.cumsum(n_vertices) - n_vertices
+        )
+        return n_crossings % 2 == 1
+
+
+def nearest_on_axis(coords: NDArray[Any], values: ArrayLike) -> NDArray[np.intp]:
+    """Index of the coordinate nearest to each value.
+
+    *coords* must be monotonic (either increasing or decreasing).
+
+    Examples
+    --------
+    >>> from sensible_bmi._spatial import nearest_on_axis
+    >>> nearest_on_axis(np.array([0.0, 1.0, 3.0]), [-1.0, 1.9, 2.1, 9.0])
+    array([0, 1, 2, 2])
+    >>> nearest_on_axis(np.array([3.0, 1.0, 0.0]), [-1.0, 1.9, 2.1, 9.0])
+    array([2, 1, 0, 0])
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(coords)
+    if n == 1:
+        return np.zeros(values.shape, dtype=np.intp)
+
+    is_decreasing = coords[0] > coords[-1]
+    if is_decreasing:
+        coords = coords[::-1]
+
+    upper = np.clip(np.searchsorted(coords, values), 1, n - 1)
+    lower = upper - 1
+    nearest = np.where(values - coords[lower] <= coords[upper] - values, lower, upper)
+
+    return (n - 1 - nearest) if is_decreasing else nearest
+
+
+def cell_on_axis(coords: NDArray[Any], values: ArrayLike) -> NDArray[np.intp]:
+    """Index of the interval between coordinates that contains each value.
+
+    Values outside of the coordinates are given an index of -1.
+
+    Examples
+    --------
+    >>> from sensible_bmi._spatial import cell_on_axis
+    >>> cell_on_axis(np.array([0.0, 1.0, 3.0]), [-1.0, 0.0, 1.9, 3.0, 9.0])
+    array([-1,  0,  1,  1, -1])
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(coords)
+
+    is_decreasing = coords[0] > coords[-1]
+    if is_decreasing:
+        coords = coords[::-1]
+
+    cell = np.searchsorted(coords, values, side="right") - 1
+    cell[values == coords[-1]] = n - 2
+    cell[(values < coords[0]) | (values > coords[-1])] = -1
+
+    if is_decreasing:
+        cell = np.where(cell >= 0, n - 2 - cell, -1)
+    return cell
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Callable
+from functools import wraps
+from typing import Any
+from typing import TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class CallStats:
+    """Counts, wall time and bytes moved for calls into a component.
+
+    Recording is off until :meth:`enable` is called. While disabled,
+    instrumented methods only pay for checking :attr:`enabled`.
+
+    Examples
+    --------
+    >>> from sensible_bmi._stats import CallStats
+    >>> stats = CallStats()
+    >>> stats.record("get", "foo", 0.5, nbytes=80)
+    >>> stats.as_dict()
+    {}
+    >>> stats.enable()
+    >>> stats.record("get", "foo", 0.5, nbytes=80)
+    >>> stats.record("get", "foo", 0.25, nbytes=80)
+    >>> stats.as_dict()
+    {'get': {'foo': {'calls': 2, 'seconds': 0.75, 'nbytes': 160}}}
+    """
+
+    def __init__(self, enabled: bool = False):
+        self._enabled = enabled
+        self._stats: dict[tuple[str, str], list[Any]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        """Whether calls are being recorded."""
+        return self._enabled
+
+    def enable(self) -> None:
+        """Start recording calls."""
+        self._enabled = True
+
+    def disable(self) -> None:
+        """Stop recording calls (what has been recorded is kept)."""
+        self._enabled = False
+
+    def reset(self) -> None:
+        """Forget everything that has been recorded."""
+        self._stats.clear()
+
+    def record(self, op: str, target: str, seconds: float, nbytes: int = 0) -> None:
+        """Record a call.
+
+        Parameters
+        ----------
+        op : str
+            The operation (``"get"``, ``"update"``, etc.).
+        target : str
+            What the operation acted on (a variable name, for instance).
+        seconds : float
+            Wall time of the call.
+        nbytes : int, optional
+            Number of bytes moved by the call.
+        """
+        if not self._enabled:
+            return
+        try:
+            entry = self._stats[(op, target)]
+        except KeyError:
+            self._stats[(op, target)] = [1, seconds, nbytes]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] += nbytes
+
+    def as_dict(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """Recorded stats keyed by operation and then target."""
+        stats: dict[str, dict[str, dict[str, Any]]] = {}
+        for (op, target), (calls, seconds, nbytes) in self._stats.items():
+            stats.setdefault(op, {})[target] = {
+                "calls": calls,
+                "seconds": seconds,
+                "nbytes": nbytes,
+            }
+        return stats
+
+    def totals(self) -> dict[str, dict[str, Any]]:
+        """Recorded stats for each operation, summed over all targets."""
+        totals: dict[str, dict[str, Any]] = {}
+        for (op, _), (calls, seconds, nbytes) in self._stats.items():
+            total = totals.setdefault(op, {"calls": 0, "seconds": 0.0, "nbytes": 0})
+            total["calls"] += calls
+            total["seconds"] += seconds
+            total["nbytes"] += nbytes
+        return totals
+
+    def to_json(self, **kwds: Any) -> str:
+        """Recorded stats as a JSON string.
+
+        Parameters
+        ----------
+        **kwds
+            Keywords passed on to :func:`json.dumps`.
+        """
+        return json.dumps({"stats": self.as_dict(), "totals": self.totals()}, **kwds)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(enabled={self._enabled!r})"
+
+
+def instrumented(
+    op: str, nbytes: Callable[[Any, Any], int] | None = None
+) -> Callable[[F], F]:
+    """Record calls to a method in its instance's ``_stats``.
+
+    Calls are recorded under *op*, with the instance's ``_name`` as the
+    target.
+
+    Parameters
+    ----------
+    op : str
+        Name of the operation.
+    nbytes : callable, optional
+        Function that takes the instance and the method's return value and
+        returns the number of bytes moved by the call.
+    """
+
+    def decorator(func: F) -> F:
+        @wraps(func)
+        def wrapper(self: Any, *args: Any, **kwds: Any) -> Any:
+            stats = self._stats
+            if not stats._enabled:
+                return func(self, *args, **kwds)
+
+            start = time.perf_counter()
+            rtn = func(self, *args, **kwds)
+            stats.record(
+                op,
+                self._name,
+                time.perf_counter() - start,
+                nbytes=0 if nbytes is None else nbytes(self, rtn),
+            )
+            return rtn
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import functools
+import math
+import re
+from typing import Any
+from typing import NamedTuple
+
+import numpy as np
+from numpy.typing import NDArray
+from sensible_bmi._errors import ValidationError
+
+# length, mass, time, temperature, amount, current, luminous intensity and
+# (though SI treats it as a pure number) plane angle, so that angles are
+# never confused with other dimensionless quantities
+_DIMENSIONS = ("m", "kg", "s", "K", "mol", "A", "cd", "rad")
+
+
+def _dims(**powers: int) -> tuple[int, ...]:
+    return tuple(powers.get(name, 0) for name in _DIMENSIONS)
+
+
+_NONE = _dims()
+_LENGTH = _dims(m=1)
+_MASS = _dims(kg=1)
+_TIME = _dims(s=1)
+_TEMPERATURE = _dims(K=1)
+_ANGLE = _dims(rad=1)
+
+# name: (scale to SI, dimensions, can take a prefix)
+_UNITS: dict[str, tuple[float, tuple[int, ...], bool]] = {
+    "1": (1.0, _NONE, False),
+    "-": (1.0, _NONE, False),
+    "%": (0.01, _NONE, False),
+    "percent": (0.01, _NONE, False),
+    "rad": (1.0, _ANGLE, True),
+    "deg": (math.pi / 180.0, _ANGLE, False),
+    "degree": (math.pi / 180.0, _ANGLE, False),
+    "m": (1.0, _LENGTH, True),
+    "meter": (1.0, _LENGTH, False),
+    "metre": (1.0, _LENGTH, False),
+    "ft": (0.3048, _LENGTH, False),
+    "in": (0.0254, _LENGTH, False),
+    "mi": (1609.344, _LENGTH, False),
+    "ha": (1.0e4, _dims(m=2), False),
+    "L": (1.0e-3, _dims(m=3), True),
+    "l": (1.0e-3, _dims(m=3), True),
+    "g": (1.0e-3, _MASS, True),
+    "t": (1.0e3, _MASS, False),
+    "s": (1.0, _TIME, True),
+    "sec": (1.0, _TIME, False),
+    "min": (60.0, _TIME, False),
+    "h": (3600.0, _TIME, False),
+    "hr": (3600.0, _TIME, False),
+    "hour": (3600.0, _TIME, False),
+    "d": (86400.0, _TIME, False),
+    "day": (86400.0, _TIME, False),
+    "yr": (365.25 * 86400.0, _TIME, True),
+    "year": (365.25 * 86400.0, _TIME, False),
+    "K": (1.0, _TEMPERATURE, True),
+    "mol": (1.0, _dims(mol=1), True),
+    "A": (1.0, _dims(A=1), True),
+    "cd": (1.0, _dims(cd=1), False),
+    "N": (1.0, _dims(kg=1, m=1, s=-2), True),
+    "Pa": (1.0, _dims(kg=1, m=-1, s=-2), True),
+    "bar": (1.0e5, _dims(kg=1, m=-1, s=-2), True),
+    "J": (1.0, _dims(kg=1, m=2, s=-2), True),
+    "W": (1.0, _dims(kg=1, m=2, s=-3), True),
+}
+
+# name: (scale to kelvin, offset to kelvin)
+_TEMPERATURES = {
+    "degC": (1.0, 273.15),
+    "°C": (1.0, 273.15),
+    "celsius": (1.0, 273.15),
+    "degF": (5.0 / 9.0, 273.15 - 32.0 * 5.0 / 9.0),
+    "°F": (5.0 / 9.0, 273.15 - 32.0 * 5.0 / 9.0),
+    "fahrenheit": (5.0 / 9.0, 273.15 - 32.0 * 5.0 / 9.0),
+}
+
+_PREFIXES = {
+    "Y": 1e24,
+    "Z": 1e21,
+    "E": 1e18,
+    "P": 1e15,
+    "T": 1e12,
+    "G": 1e9,
+    "M": 1e6,
+    "k": 1e3,
+    "h": 1e2,
+    "da": 1e1,
+    "d": 1e-1,
+    "c": 1e-2,
+    "m": 1e-3,
+    "u": 1e-6,
+    "µ": 1e-6,
+    "n": 1e-9,
+    "p": 1e-12,
+    "f": 1e-15,
+}
+
+_TERM = re.compile(r"^(?P<name>[^\d^*+-]+?)(?:\^|\*\*)?(?P<power>[+-]?\d+)?$")
+_NUMBER = re.compile(r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$")
+
+
+class Unit(NamedTuple):
+    """A unit as an affine transform to SI base units."""
+
+    scale: float
+    offset: float
+    dims: tuple[int, ...]
+
+
+def _lookup(name: str) -> tuple[float, tuple[int, ...]]:
+    try:
+        scale, dims, _ = _UNITS[name]
+    except KeyError:
+        pass
+    else:
+        return scale, dims
+
+    for prefix in sorted(_PREFIXES, key=len, reverse=True):
+        if name.startswith(prefix) and len(name) > len(prefix):
+            base = _UNITS.get(name[len(prefix) :])
+            if base is not None and base[2]:
+                return _PREFIXES[prefix] * base[0], base[1]
+    raise ValidationError(f"{name!r}: unknown unit")
+
+
+def _tokens(units: str) -> list[str]:
+    tokens = []
+    for word in re.split(r"(/)|\s+|(?<![*])\*(?![*])", units.strip()):
+        if not word:
+            continue
+        if word == "/" or _NUMBER.match(word):
+            tokens.append(word)
+        else:
+            tokens.extend(part for part in word.split(".") if part)
+    return tokens
+
+
+@functools.lru_cache(maxsize=None)
+def parse_units(units: str) -> Unit:
+    """Parse a unit string.
+
+    Units are written as UDUNITS-style products of terms separated by
+    spaces, ``*`` or ``.``. Each term may have an integer power (``m3``,
+    ``s-1``, ``m^2``) and ``/`` divides by the term that follows it.
+    Temperatures with an offset (``degC``, ``degF``) must appear on their
+    own. Results are cached.
+
+    Parameters
+    ----------
+    units : str
+        The units to parse. An empty string is dimensionless.
+
+    Returns
+    -------
+    Unit
+        The scale and offset that convert a value in *units* to SI units
+        and the powers of each of the SI base dimensions.
+
+    Examples
+    --------
+    >>> from sensible_bmi._units import parse_units
+    >>> parse_units("km")
+    Unit(scale=1000.0, offset=0.0, dims=(1, 0, 0, 0, 0, 0, 0, 0))
+    >>> parse_units("kg m-2 s-1").dims
+    (-2, 1, -1, 0, 0, 0, 0, 0)
+    """
+    tokens = _tokens(units)
+    if len(tokens) == 1 and tokens[0] in _TEMPERATURES:
+        scale, offset = _TEMPERATURES[tokens[0]]
+        return Unit(scale, offset, _TEMPERATURE)
+
+    scale, dims = 1.0, [0] * len(_DIMENSIONS)
+    sign = 1
+    for token in tokens:
+        if token == "/":
+            sign = -1
+            continue
+        if _NUMBER.match(token):
+            scale *= float(token) ** sign
+        else:
+            match = _TERM.match(token)
+            if token in _UNITS:
+                name, power = token, sign
+            elif match is not None:
+                name, power = match["name"], int(match["power"] or 1) * sign
+            else:
+                raise ValidationError(f"{units!r}: unable to parse {token!r}")
+            if name in _TEMPERATURES:
+                raise ValidationError(
+                    f"{units!r}: {name!r} can't be combined with other units"
+                )
+            term_scale, term_dims = _lookup(name)
+            scale *= term_scale**power
+            dims = [d + t * power for d, t in zip(dims, term_dims)]
+        sign = 1
+
+    return Unit(scale, 0.0, tuple(dims))
+
+
+class Conversion(NamedTuple):
+    """An affine transform, ``value * scale + offset``, between two units."""
+
+    scale: float
+    offset: float
+
+    @property
+    def is_identity(self) -> bool:
+        return self.scale == 1.0 and self.offset == 0.0
+
+    def __call__(
+        self, values: NDArray[Any], out: NDArray[Any] | None = None
+    ) -> NDArray[Any]:
+        """Convert values.
+
+        Parameters
+        ----------
+        values : ndarray
+            The values to convert.
+        out : ndarray, optional
+            Where to put the converted values. This may be *values*, to
+            convert in place.
+
+        Returns
+        -------
+        ndarray
+            The converted values.
+        """
+        if out is None:
+            out = np.empty_like(values, dtype=np.result_type(values, float))
+        if self.is_identity:
+            if out is not values:
+                np.copyto(out, values)
+            return out
+        np.multiply(values, self.scale, out=out)
+        if self.offset != 0.0:
+            np.add(out, self.offset, out=out)
+        return out
+
+
+@functools.lru_cache(maxsize=None)
+def conversion(src: str, dst: str) -> Conversion:
+    """The transform that converts values from one unit to another.
+
+    Conversions are cached, so that asking again for the same pair of
+    units neither parses nor computes anything.
+
+    Parameters
+    ----------
+    src, dst : str
+        The units to convert from and to.
+
+    Returns
+    -------
+    Conversion
+        The transform.
+
+    Examples
+    --------
+    >>> from sensible_bmi._units import conversion
+    >>> conversion("m", "mm")
+    Conversion(scale=1000.0, offset=0.0)
+    >>> conversion("degC", "K")
+    Conversion(scale=1.0, offset=273.15)
+    >>> round(conversion("m3 s-1", "L d-1").scale)
+    86400000
+    """
+    if src == dst:
+        return Conversion(1.0, 0.0)
+
+    src_unit, dst_unit = parse_units(src), parse_units(dst)
+    if src_unit.dims != dst_unit.dims:
+        raise ValidationError(f"unable to convert {src!r} to {dst!r}")
+
+    scale = src_unit.scale / dst_unit.scale
+    offset = (src_unit.offset - dst_unit.offset) / dst_unit.scale
+    if math.isclose(scale, 1.0, rel_tol=1e-12):
+        scale = 1.0
+    if math.isclose(offset, 0.0, abs_tol=1e-12):
+        offset = 0.0
+    return Conversion(scale, offset)
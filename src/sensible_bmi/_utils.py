@@ -2,13 +2,21 @@ from __future__ import annotations
 
 import contextlib
 import os
+import threading
 from collections.abc import Callable
 from collections.abc import Generator
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Mapping
 from functools import wraps
 from typing import Any
+from typing import TypeVar
 
 from sensible_bmi._errors import SensibleError
 
+K = TypeVar("K")
+V = TypeVar("V")
+
 
 def is_initialized_or_raise(func: Callable[..., Any]) -> Callable[..., Any]:
     @wraps(func)
@@ -26,9 +34,219 @@ def is_initialized_or_raise(func: Callable[..., Any]) -> Callable[..., Any]:
     return wrapper
 
 
+class _Frame:
+    __slots__ = ("path", "restore", "holders")
+
+    def __init__(self, path: str, restore: str, holder: int):
+        self.path = path
+        self.restore = restore
+        self.holders = {holder: 1}
+
+
+class _DirectoryLock:
+    """Coordinate changes of the process-wide working directory between threads.
+
+    Any number of threads may hold the lock for the same directory at once.
+    A thread that asks for a different directory waits until the lock is
+    free or it is the only holder (which allows it to nest directory
+    changes). The working directory is restored when the last holder of a
+    directory releases it.
+
+    Waiting is fair: once a thread is waiting for a different directory,
+    new threads can no longer join the current holders (threads that
+    already hold the directory can still enter it again), so a stream of
+    threads that share one directory can't starve a thread that needs
+    another.
+
+    A thread that shares its directory with other threads and asks for a
+    different one steps out of the shared directory while it waits, and
+    steps back in once it is done with the other directory. Otherwise two
+    threads that share a directory, and each then ask for a directory of
+    their own, would wait for each other forever.
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._frames: list[_Frame] = []
+        self._waiting = 0
+        self._resumes: dict[int, list[tuple[str, int] | None]] = {}
+
+    def acquire(self, path: str) -> str:
+        me = threading.get_ident()
+        with self._condition:
+            top = self._frames[-1] if self._frames else None
+            resume = None
+            if (
+                top is not None
+                and top.path != path
+                and me in top.holders
+                and len(top.holders) > 1
+            ):
+                resume = (top.path, top.holders.pop(me))
+                self._condition.notify_all()
+            prev = self._acquire(me, path)
+            self._resumes.setdefault(me, []).append(resume)
+            return prev if resume is None else resume[0]
+
+    def _acquire(self, me: int, path: str) -> str:
+        queued = False
+        try:
+            while True:
+                top = self._frames[-1] if self._frames else None
+                if (
+                    top is not None
+                    and top.path == path
+                    and (len(self._frames) == 1 or me in top.holders)
+                    and (queued or me in top.holders or not self._waiting)
+                ):
+                    top.holders[me] = top.holders.get(me, 0) + 1
+                    return path
+                if (top is None and (queued or not self._waiting)) or (
+                    top is not None and top.holders.keys() == {me}
+                ):
+                    prev = os.getcwd()
+                    if prev != path:
+                        os.chdir(path)
+                    self._frames.append(_Frame(path, prev, me))
+                    return prev
+                if not queued and top is not None and top.path != path:
+                    queued = True
+                    self._waiting += 1
+                self._condition.wait()
+        finally:
+            if queued:
+                self._waiting -= 1
+                self._condition.notify_all()
+
+    def release(self) -> None:
+        me = threading.get_ident()
+        with self._condition:
+            resumes = self._resumes[me]
+            resume = resumes.pop()
+            if not resumes:
+                del self._resumes[me]
+
+            top = self._frames[-1]
+            top.holders[me] -= 1
+            if top.holders[me] == 0:
+                del top.holders[me]
+            if not top.holders:
+                self._frames.pop()
+                if top.restore != top.path:
+                    os.chdir(top.restore)
+                self._condition.notify_all()
+
+            if resume is not None:
+                path, count = resume
+                self._acquire(me, path)
+                self._frames[-1].holders[me] = count
+
+
+_CWD_LOCK = _DirectoryLock()
+
+
 @contextlib.contextmanager
 def as_cwd(path: str) -> Generator[str]:
-    prev_cwd = os.getcwd()
-    os.chdir(path)
-    yield prev_cwd
-    os.chdir(prev_cwd)
+    """Temporarily change the current working directory.
+
+    If already in *path*, the working directory is left alone. The previous
+    working directory is restored on exit, even if the body raises.
+
+    Changes of directory are coordinated between threads: threads that ask
+    for the same directory run concurrently, while a thread that asks for a
+    different one waits until the others are done. Code that relies on the
+    working directory without going through ``as_cwd`` is not protected.
+    """
+    prev_cwd = _CWD_LOCK.acquire(path)
+    try:
+        yield prev_cwd
+    finally:
+        _CWD_LOCK.release()
+
+
+class LazyMapping(Mapping[K, V]):
+    """A read-only mapping whose values are built on first access.
+
+    Parameters
+    ----------
+    keys : iterable or callable
+        The keys of the mapping or, if the keys themselves are expensive to
+        find, a function that returns them. The function is called once, the
+        first time the keys are needed.
+    factory : callable
+        Function that takes a key and returns its value. It is called at most
+        once per key, even if several threads ask for the key at once.
+
+    Examples
+    --------
+    >>> from sensible_bmi._utils import LazyMapping
+    >>> squares = LazyMapping([1, 2, 3], lambda key: key**2)
+    >>> squares.loaded
+    frozenset()
+    >>> squares[2]
+    4
+    >>> squares.loaded
+    frozenset({2})
+    >>> dict(squares)
+    {1: 1, 2: 4, 3: 9}
+    """
+
+    def __init__(
+        self,
+        keys: Iterable[K] | Callable[[], Iterable[K]],
+        factory: Callable[[K], V],
+    ):
+        self._keys: dict[K, None] | None = None
+        self._find_keys: Callable[[], Iterable[K]] | None = None
+        if callable(keys):
+            self._find_keys = keys
+        else:
+            self._keys = dict.fromkeys(keys)
+        self._factory = factory
+        self._values: dict[K, V] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def loaded(self) -> frozenset[K]:
+        """Keys whose values have already been built."""
+        return frozenset(self._values)
+
+    def load(self) -> None:
+        """Build the values for all keys."""
+        for key in self._get_keys():
+            self[key]
+
+    def _get_keys(self) -> dict[K, None]:
+        if self._keys is None:
+            with self._lock:
+                if self._keys is None:
+                    assert self._find_keys is not None
+                    self._keys = dict.fromkeys(self._find_keys())
+                    self._find_keys = None
+        return self._keys
+
+    def __getitem__(self, key: K) -> V:
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        with self._lock:
+            try:
+                return self._values[key]
+            except KeyError:
+                if key not in self._get_keys():
+                    raise
+            value = self._values[key] = self._factory(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._values or key in self._get_keys()
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self._get_keys())
+
+    def __len__(self) -> int:
+        return len(self._get_keys())
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self._get_keys())!r})"
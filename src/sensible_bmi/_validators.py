@@ -76,6 +76,16 @@ def validate_var_nbytes(nbytes: int) -> int:
     return nbytes
 
 
+def validate_pool_max_bytes(max_bytes: int | None) -> int | None:
+    if max_bytes is None:
+        return None
+    if not isinstance(max_bytes, int):
+        raise TypeError(f"{max_bytes}: max_bytes must be integer")
+    if max_bytes < 0:
+        raise ValidationError(f"{max_bytes}: max_bytes must be non-negative")
+    return max_bytes
+
+
 def validate_grid_rank(rank: int) -> int:
     if not isinstance(rank, int):
         raise TypeError(f"{rank}: rank must be integer")
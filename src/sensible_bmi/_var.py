@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import ctypes
 import os
 import pprint
 from typing import Any
@@ -8,6 +9,12 @@ import numpy as np
 from bmipy.bmi import Bmi
 from numpy.typing import ArrayLike
 from numpy.typing import NDArray
+from sensible_bmi._errors import ValidationError
+from sensible_bmi._pool import BufferPool
+from sensible_bmi._stats import CallStats
+from sensible_bmi._stats import instrumented
+from sensible_bmi._units import Conversion
+from sensible_bmi._units import conversion
 from sensible_bmi._validators import validate_var_dtype
 from sensible_bmi._validators import validate_var_itemsize
 from sensible_bmi._validators import validate_var_location
@@ -15,9 +22,17 @@ from sensible_bmi._validators import validate_var_nbytes
 
 
 class SensibleVar:
-    def __init__(self, bmi: Bmi, name: str):
+    def __init__(
+        self,
+        bmi: Bmi,
+        name: str,
+        pool: BufferPool | None = None,
+        stats: CallStats | None = None,
+    ):
         self._bmi = bmi
         self._name = name
+        self._pool = BufferPool() if pool is None else pool
+        self._stats = CallStats() if stats is None else stats
 
         self._units = bmi.get_var_units(name)
         location_str = validate_var_location(bmi.get_var_location(name))
@@ -60,18 +75,52 @@ class SensibleVar:
     def size(self) -> int:
         return self._size
 
-    def empty(self) -> NDArray[Any]:
+    @property
+    def pool(self) -> BufferPool:
+        return self._pool
+
+    @property
+    def stats(self) -> CallStats:
+        return self._stats
+
+    def empty(self, recycle: bool = False) -> NDArray[Any]:
+        if recycle:
+            return self._pool.acquire(self._size, self._type)
         return np.empty(self._size, dtype=self._type)
 
-    def zeros(self) -> NDArray[Any]:
-        return np.zeros(self._size, dtype=self._type)
+    def zeros(self, recycle: bool = False) -> NDArray[Any]:
+        return self.full(0, recycle=recycle)
 
-    def ones(self) -> NDArray[Any]:
-        return np.ones(self._size, dtype=self._type)
+    def ones(self, recycle: bool = False) -> NDArray[Any]:
+        return self.full(1, recycle=recycle)
 
-    def full(self, fill_value: ArrayLike) -> NDArray[Any]:
+    def full(self, fill_value: ArrayLike, recycle: bool = False) -> NDArray[Any]:
+        if recycle:
+            array = self._pool.acquire(self._size, self._type)
+            array.fill(fill_value)
+            return array
         return np.full(self._size, fill_value, dtype=self._type)
 
+    def release(self, array: NDArray[Any]) -> None:
+        """Hand a buffer back so it can be recycled.
+
+        Parameters
+        ----------
+        array : ndarray
+            A buffer, typically one returned by :meth:`empty` or :meth:`get`,
+            that is no longer needed.
+        """
+        self._pool.release(array)
+
+    def _conversion(self, src: str, dst: str) -> Conversion:
+        convert = conversion(src, dst)
+        if not convert.is_identity and not np.issubdtype(self._type, np.floating):
+            raise ValidationError(
+                f"{self._name!r}: unable to convert {src!r} to {dst!r} for values"
+                f" of type {self._type}"
+            )
+        return convert
+
     def __repr__(self) -> str:
         return os.linesep.join(
             [f"{self.__class__.__name__}({self._bmi!r}, {self._name!r})", str(self)]
@@ -93,24 +142,158 @@ class SensibleVar:
 
 
 class SensibleInputVar(SensibleVar):
-    def set(self, values: ArrayLike) -> None:
+    @instrumented("set", nbytes=lambda self, _: self._nbytes)
+    def set(self, values: ArrayLike, units: str | None = None) -> None:
+        """Set the variable's values.
+
+        Parameters
+        ----------
+        values : array_like
+            New values, broadcast to the size of the variable.
+        units : str, optional
+            Units of *values*, if not the variable's units. Values are
+            converted into a recycled buffer before they are set.
+        """
         values = np.asarray(values).reshape(-1)
-        self._bmi.set_value(
-            self._name, np.broadcast_to(values, self._nbytes // self.itemsize)
-        )
+        if values.size != self._size:
+            values = np.broadcast_to(values, self._size)
+        if units is None or units == self._units:
+            self._bmi.set_value(self._name, values)
+            return
+
+        convert = self._conversion(units, self._units)
+        buffer = self._pool.acquire(self._size, self._type)
+        try:
+            self._bmi.set_value(self._name, convert(values, out=buffer))
+        finally:
+            self._pool.release(buffer)
+
+    def set_at(self, indices: Any, values: ArrayLike) -> None:
+        """Set the values of the variable at particular elements.
+
+        Parameters
+        ----------
+        indices : int, slice, or array_like
+            Elements to set, given as anything that can index a 1D array.
+        values : array_like
+            New values, broadcast to the number of elements being set.
+        """
+        self._set_at(_as_indices(indices, self._size), values)
+
+    @instrumented("set_at", nbytes=lambda self, values: values.nbytes)
+    def _set_at(self, inds: NDArray[np.intc], values: ArrayLike) -> NDArray[Any]:
+        values = np.asarray(values, dtype=self._type).reshape(-1)
+        if values.size != inds.size:
+            values = np.broadcast_to(values, inds.size)
+        self._bmi.set_value_at_indices(self._name, inds, values)
+        return values
+
+    def __setitem__(self, indices: Any, values: ArrayLike) -> None:
+        self.set_at(indices, values)
 
 
 class SensibleOutputVar(SensibleVar):
-    # @property
-    # def data(self) -> NDArray[Any]:
-    #     return self._data_read_only
+    def __init__(
+        self,
+        bmi: Bmi,
+        name: str,
+        pool: BufferPool | None = None,
+        stats: CallStats | None = None,
+    ):
+        super().__init__(bmi, name, pool=pool, stats=stats)
+        self._data_read_only = _get_value_ptr_or_none(bmi, name, self._size, self._type)
+
+    @property
+    def data(self) -> NDArray[Any]:
+        """A read-only view of the variable's values.
+
+        If the component supports ``get_value_ptr``, this is a view into the
+        component's own memory and so no copy is made. Otherwise, the values
+        are copied into a new (read-only) array. If the component has a
+        ``refresh_value_ptr`` method (as components that run in another
+        process do), it is called to bring the view up to date each time
+        it is read.
+        """
+        if self._data_read_only is None:
+            data = self.get()
+            data.setflags(write=False)
+            return data
+        refresh = getattr(self._bmi, "refresh_value_ptr", None)
+        if refresh is not None:
+            refresh(self._name)
+        return self._data_read_only
+
+    @property
+    def is_zero_copy(self) -> bool:
+        """Whether :attr:`data` is a view into the component's memory."""
+        return self._data_read_only is not None
+
+    @instrumented("get", nbytes=lambda self, out: out.nbytes)
+    def get(
+        self,
+        out: NDArray[Any] | None = None,
+        recycle: bool = False,
+        units: str | None = None,
+    ) -> NDArray[Any]:
+        """Get a copy of the variable's values.
+
+        Parameters
+        ----------
+        out : ndarray, optional
+            Buffer into which the values are placed. It must have the size
+            and type of the variable.
+        recycle : bool, optional
+            If *out* is not given, reuse a buffer previously handed back with
+            :meth:`release` (if there is one) rather than allocating a new one.
+        units : str, optional
+            Units to convert the values to, in place, if not the variable's
+            units.
 
-    def get(self, out: NDArray[Any] | None = None) -> NDArray[Any]:
+        Returns
+        -------
+        ndarray
+            The variable's values.
+        """
         if out is None:
-            out = self.empty()
+            out = self.empty(recycle=recycle)
+        elif out.size != self._size or out.dtype != self._type:
+            raise ValidationError(
+                f"{self._name!r}: buffer of {out.size} values of type {out.dtype}"
+                f" can't hold {self._size} values of type {self._type}"
+            )
         self._bmi.get_value(self._name, out)
+        if units is not None and units != self._units:
+            self._conversion(self._units, units)(out, out=out)
         return out
 
+    @instrumented("get_at", nbytes=lambda self, out: out.nbytes)
+    def get_at(self, indices: Any, out: NDArray[Any] | None = None) -> NDArray[Any]:
+        """Get the values of the variable at particular elements.
+
+        Parameters
+        ----------
+        indices : int, slice, or array_like
+            Elements to get, given as anything that can index a 1D array.
+        out : ndarray, optional
+            Buffer into which the values are placed.
+
+        Returns
+        -------
+        ndarray
+            The values at the requested elements.
+        """
+        inds = _as_indices(indices, self._size)
+        if out is None:
+            out = np.empty(inds.size, dtype=self._type)
+        self._bmi.get_value_at_indices(self._name, out, inds)
+        return out
+
+    def __getitem__(self, indices: Any) -> Any:
+        values = self.get_at(indices)
+        if isinstance(indices, slice) or np.ndim(indices) > 0:
+            return values
+        return values[0]
+
     def __str__(self) -> str:
         # with np.printoptions(threshold=6):
         return pprint.pformat(
@@ -130,3 +313,56 @@ class SensibleOutputVar(SensibleVar):
 
 class SensibleInputOutputVar(SensibleInputVar, SensibleOutputVar):
     pass
+
+
+def _get_value_ptr_or_none(
+    bmi: Bmi, name: str, size: int, dtype: str
+) -> NDArray[Any] | None:
+    """Return a flat, read-only view of a variable's values, if possible."""
+    try:
+        ptr = bmi.get_value_ptr(name)
+    except NotImplementedError:
+        return None
+
+    if (
+        not isinstance(ptr, np.ndarray)
+        or ptr.size != size
+        or ptr.dtype != np.dtype(dtype)
+        or not ptr.flags.c_contiguous
+    ):
+        return None
+
+    view = ptr.view().reshape(-1)
+    view.setflags(write=False)
+    return view
+
+
+def _as_indices(index: Any, size: int) -> NDArray[np.intc]:
+    """Convert a 1D index expression into an array of non-negative indices.
+
+    Examples
+    --------
+    >>> from sensible_bmi._var import _as_indices
+    >>> _as_indices(slice(1, None, 2), 6)
+    array([1, 3, 5], dtype=int32)
+    >>> _as_indices([0, -1], 6)
+    array([0, 5], dtype=int32)
+    >>> _as_indices([True, False, True], 3)
+    array([0, 2], dtype=int32)
+    """
+    if isinstance(index, slice):
+        return np.arange(*index.indices(size), dtype=ctypes.c_int)
+
+    inds = np.asarray(index).reshape(-1)
+    if inds.dtype == bool:
+        if inds.size != size:
+            raise IndexError(
+                f"boolean index has {inds.size} elements but variable has {size}"
+            )
+        return np.flatnonzero(inds).astype(ctypes.c_int)
+    if not np.issubdtype(inds.dtype, np.integer) and inds.size > 0:
+        raise IndexError(f"indices must be integers (got {inds.dtype})")
+
+    if inds.size > 0 and (inds.min() < -size or inds.max() >= size):
+        raise IndexError(f"index out of bounds for variable of size {size}")
+    return np.where(inds < 0, inds + size, inds).astype(ctypes.c_int)
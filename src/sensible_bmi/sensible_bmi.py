@@ -1,22 +1,48 @@
 from __future__ import annotations
 
+import contextlib
+import math
 import os
-from types import MappingProxyType
+import threading
+from collections.abc import Callable
+from collections.abc import Generator
+from collections.abc import Iterable
+from collections.abc import Mapping
+from collections.abc import MutableMapping
+from typing import Any
 
+import numpy as np
 from bmipy.bmi import Bmi
+from numpy.typing import ArrayLike
+from numpy.typing import NDArray
+from sensible_bmi._checkpoint import read_checkpoint
+from sensible_bmi._checkpoint import write_checkpoint
 from sensible_bmi._errors import SensibleError
+from sensible_bmi._errors import ValidationError
+from sensible_bmi._geometry import GeometryCache
+from sensible_bmi._geometry import hash_config
 from sensible_bmi._grid import sensible_grid
 from sensible_bmi._grid import SensibleGrid
+from sensible_bmi._pool import BufferPool
+from sensible_bmi._remote import remote_bmi_class
+from sensible_bmi._stats import CallStats
+from sensible_bmi._stats import instrumented
 from sensible_bmi._time import SensibleTime
 from sensible_bmi._utils import as_cwd
 from sensible_bmi._utils import is_initialized_or_raise
+from sensible_bmi._utils import LazyMapping
 from sensible_bmi._var import SensibleInputOutputVar
 from sensible_bmi._var import SensibleInputVar
 from sensible_bmi._var import SensibleOutputVar
 from sensible_bmi._var import SensibleVar
 
 
-def make_sensible(class_name: str, bmi_class: type[Bmi]) -> type[SensibleBmi]:
+def make_sensible(
+    class_name: str,
+    bmi_class: type[Bmi],
+    out_of_process: bool = False,
+    module: str | None = None,
+) -> type[SensibleBmi]:
     """Give a BMI component a more sensible interface.
 
     Parameters
@@ -25,13 +51,37 @@ def make_sensible(class_name: str, bmi_class: type[Bmi]) -> type[SensibleBmi]:
         The name of the new class.
     bmi_class : type
         The BMI class to wrap.
+    out_of_process : bool, optional
+        If ``True``, each instance of the component runs in a child process
+        (see :class:`~sensible_bmi._remote.RemoteBmi`), which keeps a
+        component that crashes, leaks memory or holds the GIL from affecting
+        the calling process.
+    module : str, optional
+        The name of the module in which the new class is defined (usually
+        ``__name__``). The class can only be pickled, which is needed to
+        send it to processes that are started by spawning rather than
+        forking (see :class:`~sensible_bmi._ensemble.Ensemble`), if it can
+        be found, by *class_name*, in this module.
 
     Returns
     -------
     type
         A new class that wraps the BMI class.
+
+    Examples
+    --------
+    >>> from sensible_bmi.sensible_bmi import make_sensible
+    >>> from testing.toy_bmi import ToyBmi
+    >>> SensibleToy = make_sensible("SensibleToy", ToyBmi, module=__name__)
+    >>> SensibleToy.__module__ == __name__
+    True
     """
-    return type(class_name, (SensibleBmi,), {"_cls": bmi_class})
+    if out_of_process:
+        bmi_class = remote_bmi_class(bmi_class)
+    cls = type(class_name, (SensibleBmi,), {"_cls": bmi_class})
+    if module is not None:
+        cls.__module__ = module
+    return cls
 
 
 class SensibleBmi:
@@ -42,16 +92,27 @@ class SensibleBmi:
             raise RuntimeError("There is no BMI class associated with this class.")
 
         self._bmi = self._cls()
+        self._pool = BufferPool()
+        self._stats = CallStats()
+        self._has_update_until = True
+        self._lock = threading.RLock()
 
         self._initdir: str
         self._name: str
-        self._grid: MappingProxyType[int, SensibleGrid]
-        self._var: MappingProxyType[str, SensibleVar]
+        self._grid: LazyMapping[int, SensibleGrid]
+        self._var: LazyMapping[str, SensibleVar]
         self._time: SensibleTime
         self._input_var_names: frozenset[str]
         self._output_var_names: frozenset[str]
 
-    def initialize(self, filepath: str | None = None, where: str | None = ".") -> None:
+    def initialize(
+        self,
+        filepath: str | None = None,
+        where: str | None = ".",
+        eager: bool = False,
+        share_grids: bool = False,
+        geometry_cache: str | os.PathLike[str] | None = None,
+    ) -> None:
         """Initialize component for timestepping.
 
         Parameters
@@ -62,6 +123,20 @@ class SensibleBmi:
             The path to the location where this component will be run. If not
             provided, use the folder in which *filepath* sits. If *filepath* is also
             not provided, use the current working directory.
+        eager : bool, optional
+            If ``True``, describe all of the component's variables and grids now.
+            Otherwise, each variable and grid is described the first time it
+            is accessed through :attr:`var` or :attr:`grid`.
+        share_grids : bool, optional
+            If ``True``, grids share their arrays with identical grids of other
+            components (see :meth:`SensibleGrid.intern`). Matching grids
+            means fetching their coordinates (and connectivity) when they are
+            first accessed.
+        geometry_cache : str or path-like, optional
+            Directory in which to cache the arrays that describe the
+            component's grids. Arrays are keyed by the component's name, the
+            grid id and a hash of *filepath*. Cached arrays are loaded as
+            read-only memory maps rather than fetched from the component.
         """
         if hasattr(self, "_initdir"):
             raise SensibleError(
@@ -77,49 +152,310 @@ class SensibleBmi:
         else:
             where = "." if where is None else where
 
-        init_dir = os.path.abspath(where)
-        with as_cwd(init_dir):
+        init_dir = os.path.realpath(where)
+        with self._lock, as_cwd(init_dir):
             self.bmi.initialize(filepath)
 
         self._name = self.bmi.get_component_name()
         self._input_var_names = frozenset(self._bmi.get_input_var_names())
         self._output_var_names = frozenset(self._bmi.get_output_var_names())
 
-        all_vars = self._output_var_names | self._input_var_names
-        all_grids = {
+        self._var = LazyMapping(
+            sorted(self._output_var_names | self._input_var_names), self._sensible_var
+        )
+        self._share_grids = share_grids
+        self._geometry = (
+            None
+            if geometry_cache is None
+            else GeometryCache(geometry_cache, self._name, hash_config(filepath))
+        )
+        self._grid = LazyMapping(self._find_grids, self._sensible_grid)
+
+        if eager:
+            self._var.load()
+            self._grid.load()
+
+        self._time = SensibleTime(self._bmi)
+        self._initdir = init_dir
+
+    def _find_grids(self) -> list[int]:
+        grids = {
             self._bmi.get_var_grid(name)
-            for name in all_vars
+            for name in self._var
             if self._bmi.get_var_location(name) != "none"
         }
+        return sorted(grids)
 
-        self._grid = MappingProxyType(
-            {grid_id: sensible_grid(self._bmi, grid_id) for grid_id in all_grids}
+    def _sensible_grid(self, grid_id: int) -> SensibleGrid:
+        return sensible_grid(
+            self._bmi,
+            grid_id,
+            stats=self._stats,
+            intern=self._share_grids,
+            geometry=self._geometry,
         )
 
-        self._var = MappingProxyType(
-            {
-                name: SensibleOutputVar(self._bmi, name)
-                for name in self._output_var_names - self._input_var_names
-            }
-            | {
-                name: SensibleInputVar(self._bmi, name)
-                for name in self._input_var_names - self._output_var_names
-            }
-            | {
-                name: SensibleInputOutputVar(self._bmi, name)
-                for name in self._output_var_names & self._input_var_names
-            }
-        )
+    def _sensible_var(self, name: str) -> SensibleVar:
+        is_input = name in self._input_var_names
+        is_output = name in self._output_var_names
 
-        self._time = SensibleTime(self._bmi)
-        self._initdir = init_dir
+        if is_input and is_output:
+            return SensibleInputOutputVar(
+                self._bmi, name, pool=self._pool, stats=self._stats
+            )
+        elif is_input:
+            return SensibleInputVar(self._bmi, name, pool=self._pool, stats=self._stats)
+        else:
+            return SensibleOutputVar(
+                self._bmi, name, pool=self._pool, stats=self._stats
+            )
+
+    @is_initialized_or_raise
+    @contextlib.contextmanager
+    def session(self) -> Generator[SensibleBmi]:
+        """Run the component from within its working directory.
+
+        Within the session, calls to :meth:`update` (and the like) don't have
+        to change the working directory. Other components may still be used
+        within the session; they change into their own working directories and
+        then change back. Other threads that need a different working
+        directory wait until the session is closed.
+        """
+        with self._lock, as_cwd(self._initdir):
+            yield self
 
     @is_initialized_or_raise
+    @instrumented("update")
     def update(self) -> None:
         """Update the component by a single time step."""
-        with as_cwd(self._initdir):
+        with self._lock, as_cwd(self._initdir):
             return self.bmi.update()
 
+    @is_initialized_or_raise
+    @instrumented("run_until")
+    def run_until(
+        self,
+        time: float,
+        every: float | None = None,
+        callback: Callable[[SensibleBmi], Any] | None = None,
+    ) -> None:
+        """Update the component until it reaches a given time.
+
+        Parameters
+        ----------
+        time : float
+            The time to run until.
+        every : float, optional
+            Interval, measured from the current time, at which to
+            call *callback*.
+        callback : callable, optional
+            Function, called with this component, after each interval of
+            *every* or, if *every* is not given, once when the run is
+            complete.
+        """
+        if every is not None and not every > 0.0:
+            raise ValidationError(f"{every}: interval must be positive")
+
+        with self._lock, as_cwd(self._initdir):
+            if every is None:
+                self._update_until(time)
+                if callback is not None:
+                    callback(self)
+                return
+
+            start = self._bmi.get_current_time()
+            n_intervals = math.floor((time - start) / every * (1.0 + 1e-12))
+            for n in range(1, n_intervals + 1):
+                self._update_until(start + n * every)
+                if callback is not None:
+                    callback(self)
+            self._update_until(time)
+
+    def _update_until(self, time: float) -> None:
+        if self._has_update_until:
+            try:
+                return self._bmi.update_until(time)
+            except NotImplementedError:
+                self._has_update_until = False
+
+        step = self._bmi.get_time_step()
+        now = self._bmi.get_current_time()
+        while now < time and not math.isclose(now, time):
+            n_steps = math.ceil((time - now) / step * (1.0 - 1e-12)) if step > 0 else 1
+            for _ in range(max(n_steps, 1)):
+                self._bmi.update()
+            prev, now = now, self._bmi.get_current_time()
+            if now == prev:
+                raise SensibleError(
+                    f"{self.name}: time is stuck at {now} (updating doesn't advance"
+                    f" it), unable to run until {time}"
+                )
+
+    @is_initialized_or_raise
+    def empty_many(
+        self, names: Iterable[str], align: int = 64
+    ) -> dict[str, NDArray[Any]]:
+        """Allocate buffers for several variables from a single block of memory.
+
+        Parameters
+        ----------
+        names : iterable of str
+            Names of the variables to allocate buffers for.
+        align : int, optional
+            Byte alignment of the start of each buffer.
+
+        Returns
+        -------
+        dict
+            Uninitialized arrays, keyed by variable name, that can be passed
+            as *out* to :meth:`get_many`.
+        """
+        variables = [self._var[name] for name in names]
+
+        offsets = []
+        nbytes = 0
+        for var in variables:
+            offsets.append(nbytes)
+            nbytes += -(-var.nbytes // align) * align
+
+        arena = np.empty(nbytes + align, dtype=np.uint8)
+        start = -arena.ctypes.data % align
+
+        return {
+            var.name: arena[start + offset : start + offset + var.nbytes].view(var.type)
+            for var, offset in zip(variables, offsets)
+        }
+
+    @is_initialized_or_raise
+    def get_many(
+        self,
+        names: Iterable[str],
+        out: MutableMapping[str, NDArray[Any]] | None = None,
+    ) -> MutableMapping[str, NDArray[Any]]:
+        """Get the values of several output variables.
+
+        Parameters
+        ----------
+        names : iterable of str
+            Names of the output variables.
+        out : dict, optional
+            Buffers, keyed by variable name, into which values are placed.
+            Each must have the size and type of its variable.
+            Variables without a buffer have one allocated and added to *out*,
+            so passing the same *out* on each call reuses the buffers.
+
+        Returns
+        -------
+        dict
+            The values of each variable, keyed by name.
+        """
+        if out is None:
+            out = {}
+
+        for name in names:
+            var = self._var[name]
+            if not isinstance(var, SensibleOutputVar):
+                raise SensibleError(f"{name!r}: not an output variable")
+            try:
+                buffer = out[name]
+            except KeyError:
+                buffer = out[name] = var.empty()
+            var.get(out=buffer)
+
+        return out
+
+    @is_initialized_or_raise
+    def set_many(self, values: Mapping[str, ArrayLike]) -> None:
+        """Set the values of several input variables.
+
+        Parameters
+        ----------
+        values : dict
+            New values, keyed by the name of the input variable.
+        """
+        for name, value in values.items():
+            var = self._var[name]
+            if not isinstance(var, SensibleInputVar):
+                raise SensibleError(f"{name!r}: not an input variable")
+            var.set(value)
+
+    @is_initialized_or_raise
+    def checkpoint(
+        self, path: str | os.PathLike[str], incremental: bool = False
+    ) -> int:
+        """Save the values of the component's output variables to a file.
+
+        Input-only variables are left out, as many components can't get
+        their values.
+
+        Parameters
+        ----------
+        path : str or path-like
+            Path to the checkpoint file.
+        incremental : bool, optional
+            If ``True``, and *path* is an earlier checkpoint of this
+            component, only write the variables that have changed since.
+
+        Returns
+        -------
+        int
+            The number of bytes of values that were written.
+        """
+        with self._lock:
+            return write_checkpoint(
+                path,
+                self._bmi.get_current_time(),
+                [
+                    var
+                    for var in self._var.values()
+                    if isinstance(var, SensibleOutputVar)
+                ],
+                self._bmi.get_value,
+                incremental=incremental,
+            )
+
+    @is_initialized_or_raise
+    def restore(self, path: str | os.PathLike[str]) -> float:
+        """Set the component's input variables from a checkpoint file.
+
+        Only variables that are both inputs and outputs are restored:
+        output-only variables can't be set and input-only variables aren't
+        checkpointed. A BMI component's time can't be set, so the component's
+        time is left alone; the time of the checkpoint is returned instead.
+
+        Parameters
+        ----------
+        path : str or path-like
+            Path to a checkpoint file written by :meth:`checkpoint`.
+
+        Returns
+        -------
+        float
+            The time at which the checkpoint was written.
+        """
+        time, values = read_checkpoint(path)
+
+        for name, value in values.items():
+            try:
+                var = self._var[name]
+            except KeyError:
+                raise SensibleError(
+                    f"{name!r}: checkpoint has an unknown variable"
+                ) from None
+            if np.dtype(var.type) != value.dtype or var.size != value.size:
+                raise ValidationError(
+                    f"{name!r}: checkpoint values ({value.size} of {value.dtype})"
+                    f" don't match the variable ({var.size} of {var.type})"
+                )
+
+        with self._lock:
+            for name, value in values.items():
+                var = self._var[name]
+                if isinstance(var, SensibleInputVar):
+                    var.set(value)
+
+        return time
+
     def finalize(self) -> None:
         """Call teardown methods putting the component in a state to be initialized."""
         try:
@@ -127,8 +463,9 @@ class SensibleBmi:
         except AttributeError:
             pass
         else:
-            with as_cwd(self._initdir):
+            with self._lock, as_cwd(self._initdir):
                 self.bmi.finalize()
+            self._pool.clear()
             del self._initdir
 
     @property
@@ -136,6 +473,16 @@ class SensibleBmi:
         """The underlying BMI of the component."""
         return self._bmi
 
+    @property
+    def pool(self) -> BufferPool:
+        """Pool of buffers recycled by the component's variables."""
+        return self._pool
+
+    @property
+    def stats(self) -> CallStats:
+        """Call counts, times and bytes moved (see :meth:`CallStats.enable`)."""
+        return self._stats
+
     @property
     @is_initialized_or_raise
     def name(self) -> str:
@@ -144,13 +491,13 @@ class SensibleBmi:
 
     @property
     @is_initialized_or_raise
-    def grid(self) -> MappingProxyType[int, SensibleGrid]:
+    def grid(self) -> Mapping[int, SensibleGrid]:
         """Descriptions of the component's grids."""
         return self._grid
 
     @property
     @is_initialized_or_raise
-    def var(self) -> MappingProxyType[str, SensibleVar]:
+    def var(self) -> Mapping[str, SensibleVar]:
         """The component's input and output variables."""
         return self._var
 
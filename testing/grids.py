@@ -73,3 +73,45 @@ def bmi_structured_quad(shape, *args):
         )
 
     return mock
+
+
+def bmi_unstructured(x, y, edge_nodes, nodes_per_face, face_nodes, face_edges):
+    mock = Mock()
+    mock.get_grid_type.return_value = "unstructured"
+    mock.get_grid_rank.return_value = 2
+    mock.get_grid_node_count.return_value = len(x)
+    mock.get_grid_edge_count.return_value = len(edge_nodes) // 2
+    mock.get_grid_face_count.return_value = len(nodes_per_face)
+
+    for name, vals in (
+        ("x", x),
+        ("y", y),
+        ("edge_nodes", edge_nodes),
+        ("nodes_per_face", nodes_per_face),
+        ("face_nodes", face_nodes),
+        ("face_edges", face_edges),
+    ):
+        getattr(mock, f"get_grid_{name}").side_effect = (
+            lambda grid, array, _v=vals: np.copyto(array, _v)
+        )
+
+    return mock
+
+
+def bmi_two_squares():
+    """Two unit squares that share an edge.
+
+    ::
+
+        3 --- 4 --- 5
+        |  0  |  1  |
+        0 --- 1 --- 2
+    """
+    return bmi_unstructured(
+        x=[0.0, 1.0, 2.0, 0.0, 1.0, 2.0],
+        y=[0.0, 0.0, 0.0, 1.0, 1.0, 1.0],
+        edge_nodes=[0, 1, 1, 2, 0, 3, 1, 4, 2, 5, 3, 4, 4, 5],
+        nodes_per_face=[4, 4],
+        face_nodes=[0, 1, 4, 3, 1, 2, 5, 4],
+        face_edges=[0, 3, 5, 2, 1, 4, 6, 3],
+    )
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import math
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from testing.my_bmi import MyBmi
+
+GRID_TYPES = (
+    "uniform_rectilinear",
+    "rectilinear",
+    "structured_quadrilateral",
+    "points",
+    "unstructured",
+)
+
+
+def synthetic_bmi(n_nodes: int, n_vars: int = 1) -> type[SyntheticBmi]:
+    """Create a synthetic BMI class with grids of about *n_nodes* nodes.
+
+    Parameters
+    ----------
+    n_nodes : int
+        Approximate number of nodes of each grid. Grids are square so the
+        actual number of nodes is rounded up to the next perfect square.
+    n_vars : int, optional
+        Number of output (and input) variables defined on each grid.
+
+    Returns
+    -------
+    type
+        A subclass of :class:`SyntheticBmi`.
+    """
+    n_cols = max(math.isqrt(n_nodes - 1) + 1, 2)
+    return type(
+        f"SyntheticBmi{n_nodes}",
+        (SyntheticBmi,),
+        {"shape": (n_cols, n_cols), "n_vars": n_vars},
+    )
+
+
+class SyntheticBmi(MyBmi):
+    """An in-memory BMI component with one grid of each type.
+
+    Updating the component only advances its time, so it can be used to
+    measure the cost of everything other than the model itself.
+    """
+
+    shape: tuple[int, int] = (4, 4)
+    n_vars: int = 1
+
+    def initialize(self, config_file: str) -> None:
+        self._time = 0.0
+
+        n_rows, n_cols = self.shape
+        self._n_nodes = n_rows * n_cols
+        self._n_faces = (n_rows - 1) * (n_cols - 1)
+        self._n_edges = n_rows * (n_cols - 1) + (n_rows - 1) * n_cols
+
+        self._output_var_names = tuple(
+            f"{grid_type}__out_{n}"
+            for grid_type in GRID_TYPES
+            for n in range(self.n_vars)
+        )
+        self._input_var_names = tuple(
+            f"{grid_type}__in_{n}"
+            for grid_type in GRID_TYPES
+            for n in range(self.n_vars)
+        )
+        self._var_grid = {
+            name: GRID_TYPES.index(name.split("__")[0])
+            for name in self._output_var_names + self._input_var_names
+        }
+        self._values: dict[str, NDArray[Any]] = {
+            name: np.random.default_rng(seed=n).random(self._n_nodes)
+            for n, name in enumerate(self._output_var_names + self._input_var_names)
+        }
+
+        y, x = np.meshgrid(
+            np.arange(n_rows, dtype=float),
+            np.arange(n_cols, dtype=float),
+            indexing="ij",
+        )
+        self._x, self._y = x.reshape(-1), y.reshape(-1)
+
+        self._connectivity: dict[str, NDArray[np.intc]] | None = None
+
+    def _get_connectivity(self) -> dict[str, NDArray[np.intc]]:
+        if self._connectivity is not None:
+            return self._connectivity
+
+        n_rows, n_cols = self.shape
+        nodes = np.arange(self._n_nodes, dtype=np.intc).reshape(self.shape)
+
+        horizontal = np.stack((nodes[:, :-1], nodes[:, 1:]), axis=-1)
+        vertical = np.stack((nodes[:-1, :], nodes[1:, :]), axis=-1)
+        edge_nodes = np.concatenate((horizontal.reshape(-1), vertical.reshape(-1)))
+
+        face_nodes = np.stack(
+            (nodes[:-1, :-1], nodes[:-1, 1:], nodes[1:, 1:], nodes[1:, :-1]), axis=-1
+        )
+
+        n_horizontal = n_rows * (n_cols - 1)
+        horizontal_ids = np.arange(n_horizontal, dtype=np.intc).reshape(
+            (n_rows, n_cols - 1)
+        )
+        vertical_ids = n_horizontal + np.arange(
+            (n_rows - 1) * n_cols, dtype=np.intc
+        ).reshape((n_rows - 1, n_cols))
+        face_edges = np.stack(
+            (
+                horizontal_ids[:-1, :],
+                vertical_ids[:, 1:],
+                horizontal_ids[1:, :],
+                vertical_ids[:, :-1],
+            ),
+            axis=-1,
+        )
+
+        self._connectivity = {
+            "edge_nodes": edge_nodes,
+            "face_nodes": face_nodes.reshape(-1),
+            "face_edges": face_edges.reshape(-1),
+            "nodes_per_face": np.full(self._n_faces, 4, dtype=np.intc),
+        }
+        return self._connectivity
+
+    def update(self) -> None:
+        self._time += 1.0
+
+    def update_until(self, time: float) -> None:
+        self._time = max(self._time, math.ceil(time))
+
+    def finalize(self) -> None:
+        self._values.clear()
+        self._connectivity = None
+
+    def get_component_name(self) -> str:
+        return "Synthetic"
+
+    def get_input_item_count(self) -> int:
+        return len(self._input_var_names)
+
+    def get_input_var_names(self) -> tuple[str, ...]:
+        return self._input_var_names
+
+    def get_output_item_count(self) -> int:
+        return len(self._output_var_names)
+
+    def get_output_var_names(self) -> tuple[str, ...]:
+        return self._output_var_names
+
+    def get_var_grid(self, name: str) -> int:
+        return self._var_grid[name]
+
+    def get_var_itemsize(self, name: str) -> int:
+        return self._values[name].itemsize
+
+    def get_var_location(self, name: str) -> str:
+        return "node"
+
+    def get_var_nbytes(self, name: str) -> int:
+        return self._values[name].nbytes
+
+    def get_var_type(self, name: str) -> str:
+        return str(self._values[name].dtype)
+
+    def get_var_units(self, name: str) -> str:
+        return "m"
+
+    def get_current_time(self) -> float:
+        return self._time
+
+    def get_end_time(self) -> float:
+        return float("inf")
+
+    def get_start_time(self) -> float:
+        return 0.0
+
+    def get_time_step(self) -> float:
+        return 1.0
+
+    def get_time_units(self) -> str:
+        return "s"
+
+    def get_value(self, name: str, dest: NDArray[Any]) -> NDArray[Any]:
+        np.copyto(dest, self._values[name])
+        return dest
+
+    def get_value_at_indices(
+        self, name: str, dest: NDArray[Any], inds: NDArray[np.int_]
+    ) -> NDArray[Any]:
+        np.take(self._values[name], inds, out=dest)
+        return dest
+
+    def get_value_ptr(self, name: str) -> NDArray[Any]:
+        return self._values[name]
+
+    def set_value(self, name: str, src: NDArray[Any]) -> None:
+        np.copyto(self._values[name], src)
+
+    def set_value_at_indices(
+        self, name: str, inds: NDArray[np.int_], src: NDArray[Any]
+    ) -> None:
+        self._values[name][inds] = src
+
+    def get_grid_type(self, grid: int) -> str:
+        return GRID_TYPES[grid]
+
+    def get_grid_rank(self, grid: int) -> int:
+        return 2
+
+    def get_grid_size(self, grid: int) -> int:
+        return self._n_nodes
+
+    def get_grid_node_count(self, grid: int) -> int:
+        return self._n_nodes
+
+    def get_grid_edge_count(self, grid: int) -> int:
+        return self._n_edges
+
+    def get_grid_face_count(self, grid: int) -> int:
+        return self._n_faces
+
+    def get_grid_shape(self, grid: int, shape: NDArray[np.int_]) -> NDArray[np.int_]:
+        shape[:] = self.shape
+        return shape
+
+    def get_grid_spacing(
+        self, grid: int, spacing: NDArray[np.float64]
+    ) -> NDArray[np.float64]:
+        spacing[:] = 1.0
+        return spacing
+
+    def get_grid_origin(
+        self, grid: int, origin: NDArray[np.float64]
+    ) -> NDArray[np.float64]:
+        origin[:] = 0.0
+        return origin
+
+    def get_grid_x(self, grid: int, x: NDArray[np.float64]) -> NDArray[np.float64]:
+        if GRID_TYPES[grid] == "rectilinear":
+            x[:] = np.arange(self.shape[1], dtype=float)
+        else:
+            x[:] = self._x
+        return x
+
+    def get_grid_y(self, grid: int, y: NDArray[np.float64]) -> NDArray[np.float64]:
+        if GRID_TYPES[grid] == "rectilinear":
+            y[:] = np.arange(self.shape[0], dtype=float)
+        else:
+            y[:] = self._y
+        return y
+
+    def get_grid_edge_nodes(
+        self, grid: int, edge_nodes: NDArray[np.int_]
+    ) -> NDArray[np.int_]:
+        edge_nodes[:] = self._get_connectivity()["edge_nodes"]
+        return edge_nodes
+
+    def get_grid_face_edges(
+        self, grid: int, face_edges: NDArray[np.int_]
+    ) -> NDArray[np.int_]:
+        face_edges[:] = self._get_connectivity()["face_edges"]
+        return face_edges
+
+    def get_grid_face_nodes(
+        self, grid: int, face_nodes: NDArray[np.int_]
+    ) -> NDArray[np.int_]:
+        face_nodes[:] = self._get_connectivity()["face_nodes"]
+        return face_nodes
+
+    def get_grid_nodes_per_face(
+        self, grid: int, nodes_per_face: NDArray[np.int_]
+    ) -> NDArray[np.int_]:
+        nodes_per_face[:] = self._get_connectivity()["nodes_per_face"]
+        return nodes_per_face
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import os
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from testing.my_bmi import MyBmi
+
+
+class ToyBmi(MyBmi):
+    """A small, in-memory BMI component.
+
+    The component has a raster grid (``0``) and a grid of points (``1``).
+    Each update adds one to the land-surface elevation and counts the
+    number of steps taken.
+    """
+
+    shape: tuple[int, ...] = (3, 4)
+    n_points: int = 5
+
+    _input_var_names = ("air__temperature", "water__depth")
+    _output_var_names = (
+        "land_surface__elevation",
+        "model__step_count",
+        "sea_floor__depth",
+        "water__depth",
+    )
+    _var_grid = {
+        "air__temperature": 0,
+        "land_surface__elevation": 0,
+        "model__step_count": None,
+        "sea_floor__depth": 1,
+        "water__depth": 0,
+    }
+
+    def initialize(self, config_file: str) -> None:
+        self._time = 0.0
+        self._config_file = config_file
+        self.cwd_at_update: list[str] = []
+
+        n_nodes = int(np.prod(self.shape))
+        self._values: dict[str, NDArray[Any]] = {
+            "air__temperature": np.zeros(n_nodes),
+            "land_surface__elevation": np.arange(n_nodes, dtype=float),
+            "model__step_count": np.zeros(1, dtype=np.int64),
+            "sea_floor__depth": np.linspace(0.0, 1.0, self.n_points),
+            "water__depth": np.ones(n_nodes),
+        }
+
+    def update(self) -> None:
+        self.cwd_at_update.append(os.getcwd())
+        self._values["land_surface__elevation"] += 1.0
+        self._values["model__step_count"] += 1
+        self._time += self.get_time_step()
+
+    def update_until(self, time: float) -> None:
+        while self._time < time:
+            self.update()
+
+    def finalize(self) -> None:
+        self._values.clear()
+
+    def get_component_name(self) -> str:
+        return "Toy"
+
+    def get_input_item_count(self) -> int:
+        return len(self._input_var_names)
+
+    def get_input_var_names(self) -> tuple[str, ...]:
+        return self._input_var_names
+
+    def get_output_item_count(self) -> int:
+        return len(self._output_var_names)
+
+    def get_output_var_names(self) -> tuple[str, ...]:
+        return self._output_var_names
+
+    def get_var_grid(self, name: str) -> int:
+        grid = self._var_grid[name]
+        if grid is None:
+            raise ValueError(f"{name}: variable is not defined on a grid")
+        return grid
+
+    def get_var_itemsize(self, name: str) -> int:
+        return self._values[name].itemsize
+
+    def get_var_location(self, name: str) -> str:
+        return "none" if self._var_grid[name] is None else "node"
+
+    def get_var_nbytes(self, name: str) -> int:
+        return self._values[name].nbytes
+
+    def get_var_type(self, name: str) -> str:
+        return str(self._values[name].dtype)
+
+    def get_var_units(self, name: str) -> str:
+        return "-" if name == "model__step_count" else "m"
+
+    def get_current_time(self) -> float:
+        return self._time
+
+    def get_end_time(self) -> float:
+        return 100.0
+
+    def get_start_time(self) -> float:
+        return 0.0
+
+    def get_time_step(self) -> float:
+        return 1.0
+
+    def get_time_units(self) -> str:
+        return "d"
+
+    def get_value(self, name: str, dest: NDArray[Any]) -> NDArray[Any]:
+        dest[:] = self._values[name]
+        return dest
+
+    def get_value_at_indices(
+        self, name: str, dest: NDArray[Any], inds: NDArray[np.int_]
+    ) -> NDArray[Any]:
+        dest[:] = self._values[name][inds]
+        return dest
+
+    def get_value_ptr(self, name: str) -> NDArray[Any]:
+        return self._values[name]
+
+    def set_value(self, name: str, src: NDArray[Any]) -> None:
+        self._values[name][:] = src
+
+    def set_value_at_indices(
+        self, name: str, inds: NDArray[np.int_], src: NDArray[Any]
+    ) -> None:
+        self._values[name][inds] = src
+
+    def get_grid_node_count(self, grid: int) -> int:
+        if grid == 0:
+            return int(np.prod(self.shape))
+        return self.n_points
+
+    def get_grid_origin(
+        self, grid: int, origin: NDArray[np.float64]
+    ) -> NDArray[np.float64]:
+        origin[:] = 0.0
+        return origin
+
+    def get_grid_rank(self, grid: int) -> int:
+        return len(self.shape) if grid == 0 else 2
+
+    def get_grid_shape(self, grid: int, shape: NDArray[np.int_]) -> NDArray[np.int_]:
+        shape[:] = self.shape
+        return shape
+
+    def get_grid_size(self, grid: int) -> int:
+        return self.get_grid_node_count(grid)
+
+    def get_grid_spacing(
+        self, grid: int, spacing: NDArray[np.float64]
+    ) -> NDArray[np.float64]:
+        spacing[:] = 1.0
+        return spacing
+
+    def get_grid_type(self, grid: int) -> str:
+        return "uniform_rectilinear" if grid == 0 else "points"
+
+    def get_grid_x(self, grid: int, x: NDArray[np.float64]) -> NDArray[np.float64]:
+        x[:] = np.arange(self.n_points, dtype=float)
+        return x
+
+    def get_grid_y(self, grid: int, y: NDArray[np.float64]) -> NDArray[np.float64]:
+        y[:] = np.arange(self.n_points, dtype=float) * 2.0
+        return y
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from numpy.testing import assert_array_equal
+from sensible_bmi._async import AsyncSensibleBmi
+from sensible_bmi._async import AsyncSensibleGrid
+from sensible_bmi._async import AsyncSensibleVar
+from sensible_bmi._async import default_executor
+from sensible_bmi._errors import SensibleError
+from sensible_bmi.sensible_bmi import make_sensible
+
+from testing.toy_bmi import ToyBmi
+
+SensibleToy = make_sensible("SensibleToy", ToyBmi)
+
+
+class SlowToyBmi(ToyBmi):
+    delay = 0.2
+
+    def update(self) -> None:
+        time.sleep(self.delay)
+        super().update()
+
+
+class CwdToyBmi(ToyBmi):
+    def update(self) -> None:
+        with open("steps.txt", "a") as fp:
+            fp.write(f"{self.get_current_time()}\n")
+        super().update()
+
+
+def test_initialize_and_update(tmpdir):
+    async def run():
+        toy = AsyncSensibleBmi(SensibleToy)
+        await toy.initialize(where=str(tmpdir))
+        assert toy.name == "Toy"
+        assert toy.time.start == 0.0
+
+        await toy.update()
+        await toy.run_until(3.0)
+        assert await toy.current_time() == 3.0
+        step_count = await toy.var["model__step_count"].get()
+        await toy.finalize()
+        return step_count
+
+    assert_array_equal(asyncio.run(run()), [3])
+
+
+def test_grid_and_time_do_not_block(tmpdir):
+    loop_thread = threading.get_ident()
+    calls = []
+
+    class WatchedToyBmi(ToyBmi):
+        def __getattribute__(self, name):
+            attr = super().__getattribute__(name)
+            if not name.startswith("get_"):
+                return attr
+
+            def watched(*args):
+                calls.append((name, threading.get_ident()))
+                return attr(*args)
+
+            return watched
+
+    async def run():
+        async with AsyncSensibleBmi(make_sensible("Watched", WatchedToyBmi)) as toy:
+            await toy.initialize(where=str(tmpdir))
+            assert [call for call in calls if call[1] == loop_thread] == []
+            calls.clear()
+
+            grid = toy.grid[1]
+            assert isinstance(grid, AsyncSensibleGrid)
+            assert (grid.id, grid.rank, grid.type) == (1, 2, "points")
+            x_of_node = await grid.get("x_of_node")
+            assert toy.time.step == 1.0
+            assert await toy.time.current() == 0.0
+            return x_of_node
+
+    assert_array_equal(asyncio.run(run()), np.arange(5.0))
+    assert calls
+    assert [call for call in calls if call[1] == loop_thread] == []
+
+
+def test_grid_not_initialized():
+    toy = AsyncSensibleBmi(SensibleToy)
+    with pytest.raises(SensibleError):
+        toy.grid
+    with pytest.raises(SensibleError):
+        toy.time
+
+
+def test_wraps_an_instance(tmpdir):
+    sensible = SensibleToy()
+
+    async def run():
+        async with AsyncSensibleBmi(sensible) as toy:
+            assert toy.sync is sensible
+            await toy.initialize(where=str(tmpdir))
+            await toy.update()
+
+    asyncio.run(run())
+    with pytest.raises(SensibleError):
+        sensible.var
+
+
+def test_var(tmpdir):
+    async def run():
+        async with AsyncSensibleBmi(SensibleToy) as toy:
+            await toy.initialize(where=str(tmpdir))
+            depth = toy.var["water__depth"]
+            assert isinstance(depth, AsyncSensibleVar)
+            assert depth.is_input and depth.is_output
+            assert depth.size == 12
+            assert depth.type == "float64"
+
+            await depth.set(2.0)
+            await depth.set_at([0, 1], [5.0, 6.0])
+            values = await depth.get(out=depth.empty())
+            at = await depth.get_at(slice(0, 3))
+
+            with pytest.raises(SensibleError):
+                await toy.var["air__temperature"].get()
+            with pytest.raises(SensibleError):
+                await toy.var["land_surface__elevation"].set(1.0)
+            return values, at
+
+    values, at = asyncio.run(run())
+    assert_array_equal(values, [5.0, 6.0] + [2.0] * 10)
+    assert_array_equal(at, [5.0, 6.0, 2.0])
+
+
+def test_get_and_set_many(tmpdir):
+    async def run():
+        async with AsyncSensibleBmi(SensibleToy) as toy:
+            await toy.initialize(where=str(tmpdir))
+            await toy.set_many({"water__depth": 3.0})
+            return await toy.get_many(["water__depth", "model__step_count"])
+
+    values = asyncio.run(run())
+    assert_array_equal(values["water__depth"], 3.0)
+    assert_array_equal(values["model__step_count"], 0)
+
+
+def test_var_describes_without_calling_component(tmpdir):
+    async def run():
+        async with AsyncSensibleBmi(SensibleToy) as toy:
+            await toy.initialize(where=str(tmpdir))
+            assert toy.sync.var.loaded == frozenset(toy.sync.var)
+
+    asyncio.run(run())
+
+
+def test_not_initialized():
+    async def run():
+        toy = AsyncSensibleBmi(SensibleToy)
+        with pytest.raises(SensibleError):
+            toy.var
+        with pytest.raises(SensibleError):
+            await toy.update()
+
+    asyncio.run(run())
+
+
+def test_members_step_concurrently(tmpdir):
+    SlowToy = make_sensible("SlowToy", SlowToyBmi)
+
+    async def run(n_members):
+        members = [AsyncSensibleBmi(SlowToy) for _ in range(n_members)]
+        await asyncio.gather(*(m.initialize(where=str(tmpdir)) for m in members))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(m.update() for m in members))
+        elapsed = time.perf_counter() - start
+
+        await asyncio.gather(*(m.finalize() for m in members))
+        return elapsed
+
+    assert asyncio.run(run(4)) < 4 * SlowToyBmi.delay
+
+
+def test_calls_to_a_component_are_serialized(tmpdir):
+    SlowToy = make_sensible("SlowToy", SlowToyBmi)
+
+    async def run():
+        async with AsyncSensibleBmi(SlowToy) as toy:
+            await toy.initialize(where=str(tmpdir))
+            await asyncio.gather(*(toy.update() for _ in range(3)))
+            return await toy.var["model__step_count"].get()
+
+    assert_array_equal(asyncio.run(run()), [3])
+
+
+def test_event_loop_is_not_blocked(tmpdir):
+    SlowToy = make_sensible("SlowToy", SlowToyBmi)
+    ticks = []
+
+    async def tick():
+        for _ in range(5):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(SlowToyBmi.delay / 10)
+
+    async def run():
+        async with AsyncSensibleBmi(SlowToy) as toy:
+            await toy.initialize(where=str(tmpdir))
+            await asyncio.gather(toy.update(), tick())
+
+    asyncio.run(run())
+    assert len(ticks) == 5
+    assert ticks[-1] - ticks[0] < SlowToyBmi.delay
+
+
+def test_var_access_does_not_wait_for_other_dirs(tmpdir):
+    SlowToy = make_sensible("SlowToy", SlowToyBmi)
+
+    async def get_later(toy):
+        await asyncio.sleep(SlowToyBmi.delay / 4)
+        start = time.perf_counter()
+        await toy.var["land_surface__elevation"].get()
+        return time.perf_counter() - start
+
+    async def run():
+        slow, fast = AsyncSensibleBmi(SlowToy), AsyncSensibleBmi(SensibleToy)
+        await slow.initialize(where=str(tmpdir.mkdir("slow")))
+        await fast.initialize(where=str(tmpdir.mkdir("fast")))
+        _, elapsed = await asyncio.gather(slow.update(), get_later(fast))
+        await asyncio.gather(slow.finalize(), fast.finalize())
+        return elapsed
+
+    assert asyncio.run(run()) < SlowToyBmi.delay / 2
+
+
+def test_members_run_in_their_own_dirs(tmpdir):
+    CwdToy = make_sensible("CwdToy", CwdToyBmi)
+    dirs = [str(tmpdir.mkdir(f"member-{n}")) for n in range(3)]
+
+    async def run():
+        members = [AsyncSensibleBmi(CwdToy) for _ in dirs]
+        await asyncio.gather(*(m.initialize(where=d) for m, d in zip(members, dirs)))
+        for _ in range(2):
+            await asyncio.gather(*(m.update() for m in members))
+        await asyncio.gather(*(m.finalize() for m in members))
+
+    cwd = os.getcwd()
+    asyncio.run(run())
+    assert os.getcwd() == cwd
+    for where in dirs:
+        with open(os.path.join(where, "steps.txt")) as fp:
+            assert fp.read().split() == ["0.0", "1.0"]
+
+
+def test_custom_executor(tmpdir):
+    names = set()
+
+    def callback(component):
+        names.add(threading.current_thread().name)
+
+    async def run(executor):
+        async with AsyncSensibleBmi(SensibleToy, executor=executor) as toy:
+            assert toy.executor is executor
+            await toy.initialize(where=str(tmpdir))
+            await toy.run_until(2.0, every=1.0, callback=callback)
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="custom") as executor:
+        asyncio.run(run(executor))
+    assert all(name.startswith("custom") for name in names)
+
+
+def test_default_executor_is_shared():
+    assert default_executor() is default_executor()
+    assert AsyncSensibleBmi(SensibleToy).executor is default_executor()
+
+
+def test_component_errors_propagate(tmpdir):
+    async def run():
+        async with AsyncSensibleBmi(SensibleToy) as toy:
+            await toy.initialize(where=str(tmpdir))
+            with pytest.raises(ValueError):
+                await toy.var["water__depth"].set(np.ones(5))
+
+    asyncio.run(run())
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import os
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from numpy.testing import assert_array_equal
+from sensible_bmi._checkpoint import ALIGN
+from sensible_bmi._checkpoint import read_checkpoint
+from sensible_bmi._errors import SensibleError
+from sensible_bmi._errors import ValidationError
+from sensible_bmi.sensible_bmi import make_sensible
+
+from testing.toy_bmi import ToyBmi
+
+SensibleToy = make_sensible("SensibleToy", ToyBmi)
+
+
+class BiggerToyBmi(ToyBmi):
+    shape = (4, 5)
+
+
+class StrictToyBmi(ToyBmi):
+    def get_value(self, name, dest):
+        if name not in self._output_var_names:
+            raise ValueError(f"{name!r}: not an output variable")
+        return super().get_value(name, dest)
+
+
+@pytest.fixture
+def toy(tmpdir):
+    sensible = SensibleToy()
+    sensible.initialize(where=str(tmpdir))
+    yield sensible
+    sensible.finalize()
+
+
+def test_checkpoint_writes_every_output_var(toy, tmpdir):
+    path = str(tmpdir / "toy.ckpt")
+    toy.run_until(3.0)
+    nbytes = toy.checkpoint(path)
+    assert nbytes == sum(toy.var[name].nbytes for name in toy.output_var_names)
+
+    time, values = read_checkpoint(path)
+    assert time == 3.0
+    assert sorted(values) == sorted(toy.output_var_names)
+    for name, value in values.items():
+        assert value.dtype == toy.var[name].type
+        assert_array_equal(value, toy.bmi.get_value(name, toy.var[name].empty()))
+
+
+def test_checkpoint_values_are_aligned_memory_maps(toy, tmpdir):
+    path = str(tmpdir / "toy.ckpt")
+    toy.checkpoint(path)
+
+    _, values = read_checkpoint(path)
+    for value in values.values():
+        assert isinstance(value.base, np.memmap) or isinstance(value, np.memmap)
+        assert value.ctypes.data % ALIGN == 0
+        assert not value.flags.writeable
+
+
+def test_restore(toy, tmpdir):
+    path = str(tmpdir / "toy.ckpt")
+    toy.var["water__depth"].set(np.arange(12.0))
+    toy.var["air__temperature"].set(25.0)
+    toy.run_until(5.0)
+    toy.checkpoint(path)
+
+    other = SensibleToy()
+    other.initialize(where=str(tmpdir))
+    try:
+        assert other.restore(path) == 5.0
+        assert_array_equal(other.var["water__depth"].get(), np.arange(12.0))
+        assert_array_equal(other.bmi.get_value("air__temperature", np.empty(12)), 0.0)
+        assert_array_equal(other.var["model__step_count"].get(), [0])
+        assert other.time.current == 0.0
+    finally:
+        other.finalize()
+
+
+def test_checkpoint_skips_input_only_vars(tmpdir):
+    strict = make_sensible("StrictToy", StrictToyBmi)()
+    strict.initialize(where=str(tmpdir))
+    try:
+        path = str(tmpdir / "strict.ckpt")
+        strict.checkpoint(path)
+        _, values = read_checkpoint(path)
+        assert "air__temperature" not in values
+        assert "water__depth" in values
+        assert strict.restore(path) == 0.0
+    finally:
+        strict.finalize()
+
+
+def test_incremental_checkpoint(toy, tmpdir):
+    path = str(tmpdir / "toy.ckpt")
+    full = toy.checkpoint(path, incremental=True)
+    assert toy.checkpoint(path, incremental=True) == 0
+
+    toy.update()
+    written = toy.checkpoint(path, incremental=True)
+    assert written == (
+        toy.var["land_surface__elevation"].nbytes + toy.var["model__step_count"].nbytes
+    )
+    assert written < full
+
+    time, values = read_checkpoint(path)
+    assert time == 1.0
+    assert_array_equal(values["model__step_count"], [1])
+    assert_array_equal(
+        values["land_surface__elevation"], toy.var["land_surface__elevation"].get()
+    )
+    assert toy.checkpoint(path) == full
+
+
+def test_incremental_checkpoints_alternate(toy, tmpdir):
+    path = str(tmpdir / "toy.ckpt")
+    toy.checkpoint(path)
+    for step in range(1, 5):
+        toy.update()
+        toy.checkpoint(path, incremental=True)
+
+        time, values = read_checkpoint(path)
+        assert time == step
+        for name, value in values.items():
+            assert_array_equal(value, toy.bmi.get_value(name, toy.var[name].empty()))
+
+
+def test_interrupted_checkpoint_keeps_the_last_one(toy, tmpdir):
+    path = str(tmpdir / "toy.ckpt")
+    with patch("sensible_bmi._checkpoint.os.fsync") as fsync:
+        toy.checkpoint(path)
+    assert fsync.called
+    before = toy.var["land_surface__elevation"].get()
+
+    toy.update()
+    with patch(
+        "sensible_bmi._checkpoint.os.fsync", side_effect=[None, OSError("disk full")]
+    ):
+        with pytest.raises(OSError):
+            toy.checkpoint(path, incremental=True)
+
+    time, values = read_checkpoint(path)
+    assert time == 0.0
+    assert_array_equal(values["land_surface__elevation"], before)
+
+    assert toy.checkpoint(path, incremental=True) > 0
+    time, values = read_checkpoint(path)
+    assert time == 1.0
+    assert_array_equal(
+        values["land_surface__elevation"], toy.var["land_surface__elevation"].get()
+    )
+
+
+def test_incremental_checkpoint_of_another_component(toy, tmpdir):
+    path = str(tmpdir / "toy.ckpt")
+    toy.checkpoint(path)
+
+    bigger = make_sensible("BiggerToy", BiggerToyBmi)()
+    bigger.initialize(where=str(tmpdir))
+    try:
+        written = bigger.checkpoint(path, incremental=True)
+        assert written == sum(
+            bigger.var[name].nbytes for name in bigger.output_var_names
+        )
+        _, values = read_checkpoint(path)
+        assert values["water__depth"].size == 20
+
+        with pytest.raises(ValidationError):
+            toy.restore(path)
+    finally:
+        bigger.finalize()
+
+
+def test_incomplete_checkpoint(toy, tmpdir):
+    path = str(tmpdir / "toy.ckpt")
+    toy.checkpoint(path)
+    with open(path, "r+b") as fp:
+        fp.seek(12)
+        fp.write(b"\x00\x00\x00\x00")
+
+    with pytest.raises(SensibleError):
+        toy.restore(path)
+    assert toy.checkpoint(path, incremental=True) > 0
+    assert read_checkpoint(path)[0] == 0.0
+
+
+def test_truncated_checkpoint(toy, tmpdir):
+    path = str(tmpdir / "toy.ckpt")
+    toy.checkpoint(path)
+    with open(path, "r+b") as fp:
+        fp.truncate(os.path.getsize(path) - 128)
+
+    with pytest.raises(SensibleError):
+        toy.restore(path)
+
+
+def test_not_a_checkpoint(toy, tmpdir):
+    path = str(tmpdir / "toy.ckpt")
+    with open(path, "wb") as fp:
+        fp.write(b"not a checkpoint")
+    with pytest.raises(SensibleError):
+        toy.restore(path)
+    toy.checkpoint(path, incremental=True)
+    assert read_checkpoint(path)[0] == 0.0
+
+
+def test_checkpoint_not_initialized(tmpdir):
+    with pytest.raises(SensibleError):
+        SensibleToy().checkpoint(str(tmpdir / "toy.ckpt"))
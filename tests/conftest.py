@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+
+def _bmi_var(
+    array,
+    units="m",
+    location="node",
+    grid=0,
+    dtype=None,
+    itemsize=None,
+    nbytes=None,
+    ptr=False,
+):
+    mock = Mock()
+    mock.get_var_units.return_value = units
+    mock.get_var_location.return_value = location
+    mock.get_var_grid.return_value = grid
+    mock.get_var_type.return_value = str(array.dtype) if dtype is None else str(dtype)
+    mock.get_var_itemsize.return_value = (
+        array.itemsize if itemsize is None else itemsize
+    )
+    mock.get_var_nbytes.return_value = array.nbytes if nbytes is None else nbytes
+
+    mock.get_value.side_effect = lambda name, out: np.copyto(out, array)
+    mock.set_value.return_value = None
+    if ptr:
+        mock.get_value_ptr.return_value = array
+    else:
+        mock.get_value_ptr.side_effect = NotImplementedError("get_value_ptr")
+
+    return mock
+
+
+@pytest.fixture
+def bmi_var():
+    """Make a mock BMI that holds a single variable with the values of an array."""
+    return _bmi_var
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from numpy.testing import assert_array_almost_equal
+from numpy.testing import assert_array_equal
+from sensible_bmi._coupler import Coupler
+from sensible_bmi._coupler import Link
+from sensible_bmi._errors import SensibleError
+from sensible_bmi._errors import ValidationError
+from sensible_bmi._regrid import Regridder
+from sensible_bmi.sensible_bmi import make_sensible
+
+from testing.toy_bmi import ToyBmi
+
+
+class BiggerToyBmi(ToyBmi):
+    shape = (6, 8)
+
+    def get_grid_spacing(self, grid, spacing):
+        spacing[:] = (2.0 / 5.0, 3.0 / 7.0) if grid == 0 else 1.0
+        return spacing
+
+
+class FeetToyBmi(ToyBmi):
+    def get_var_units(self, name):
+        return "ft"
+
+
+class IntDepthToyBmi(ToyBmi):
+    def initialize(self, config_file):
+        super().initialize(config_file)
+        self._values["water__depth"] = self._values["water__depth"].astype(np.int32)
+
+
+class NoPtrToyBmi(ToyBmi):
+    def get_value_ptr(self, name):
+        raise NotImplementedError("get_value_ptr")
+
+
+SensibleToy = make_sensible("SensibleToy", ToyBmi)
+
+
+def _initialized(cls, where):
+    sensible = cls()
+    sensible.initialize(where=str(where))
+    return sensible
+
+
+@pytest.fixture
+def a(tmpdir):
+    sensible = _initialized(SensibleToy, tmpdir)
+    yield sensible
+    sensible.finalize()
+
+
+@pytest.fixture
+def b(tmpdir):
+    sensible = _initialized(SensibleToy, tmpdir)
+    yield sensible
+    sensible.finalize()
+
+
+def test_link_same_grid(a, b):
+    link = Link(a, "land_surface__elevation", b, "water__depth")
+    assert link.name == "Toy.land_surface__elevation->Toy.water__depth"
+    assert link.n_steps == 1
+
+    a.update()
+    link()
+    assert_array_equal(b.var["water__depth"].get(), np.arange(12.0) + 1.0)
+
+
+def test_link_without_value_ptr(tmpdir, b):
+    a = _initialized(make_sensible("NoPtrToy", NoPtrToyBmi), tmpdir)
+    link = Link(a, "land_surface__elevation", b, "water__depth")
+    assert link.n_steps == 2
+    link()
+    assert_array_equal(b.var["water__depth"].get(), np.arange(12.0))
+
+
+def test_link_broadcasts_and_casts(a, b):
+    link = Link(a, "model__step_count", b, "water__depth", scale=0.5)
+    a.run_until(4.0)
+    link()
+    assert_array_equal(b.var["water__depth"].get(), 2.0)
+
+
+def test_link_scale_and_offset(tmpdir, a):
+    feet = _initialized(make_sensible("FeetToy", FeetToyBmi), tmpdir)
+    link = Link(
+        a, "land_surface__elevation", feet, "water__depth", scale=3.0, offset=1.0
+    )
+    assert (link.scale, link.offset) == (3.0, 1.0)
+    link()
+    assert_array_equal(feet.var["water__depth"].get(), np.arange(12.0) * 3.0 + 1.0)
+
+
+def test_link_converts_units(tmpdir, a):
+    feet = _initialized(make_sensible("FeetToy", FeetToyBmi), tmpdir)
+    link = Link(a, "land_surface__elevation", feet, "water__depth")
+    assert link.scale == pytest.approx(1.0 / 0.3048)
+    link()
+    assert_array_almost_equal(feet.var["water__depth"].get(), np.arange(12.0) / 0.3048)
+
+
+def test_link_incompatible_units(a, b):
+    with pytest.raises(ValidationError):
+        Link(a, "model__step_count", b, "water__depth")
+
+
+def test_link_regrid(tmpdir, a):
+    bigger = _initialized(make_sensible("BiggerToy", BiggerToyBmi), tmpdir)
+    with pytest.raises(ValidationError):
+        Link(a, "land_surface__elevation", bigger, "water__depth")
+
+    link = Link(a, "land_surface__elevation", bigger, "water__depth", regrid="bilinear")
+    assert isinstance(link.regridder, Regridder)
+    link()
+
+    expected = link.regridder.regrid(a.var["land_surface__elevation"].get())
+    assert_array_almost_equal(bigger.var["water__depth"].get(), expected)
+    assert bigger.var["water__depth"].get()[-1] == pytest.approx(11.0)
+
+
+def test_link_with_a_regridder(tmpdir, a, b):
+    bigger = _initialized(make_sensible("BiggerToy", BiggerToyBmi), tmpdir)
+    regridder = Regridder(a.grid[0], bigger.grid[0], method="nearest")
+    link = Link(a, "land_surface__elevation", bigger, "water__depth", regrid=regridder)
+    assert link.regridder is regridder
+
+    with pytest.raises(ValidationError):
+        Link(b, "land_surface__elevation", a, "water__depth", regrid=regridder)
+
+
+def test_link_regrid_needs_nodes(a, b):
+    with pytest.raises(ValidationError):
+        Link(a, "model__step_count", b, "water__depth", regrid="nearest")
+
+
+def test_link_bad_vars(a, b):
+    with pytest.raises(SensibleError):
+        Link(a, "air__temperature", b, "water__depth")
+    with pytest.raises(SensibleError):
+        Link(a, "land_surface__elevation", b, "sea_floor__depth")
+    with pytest.raises(ValidationError):
+        Link(a, "sea_floor__depth", b, "water__depth")
+
+
+def test_link_casting(tmpdir, a):
+    ints = _initialized(make_sensible("IntDepthToy", IntDepthToyBmi), tmpdir)
+    with pytest.raises(ValidationError):
+        Link(a, "land_surface__elevation", ints, "water__depth")
+
+    link = Link(a, "land_surface__elevation", ints, "water__depth", casting="unsafe")
+    link()
+    assert ints.var["water__depth"].type == "int32"
+    assert_array_equal(ints.var["water__depth"].get(), np.arange(12))
+
+
+def test_link_does_not_allocate(tmpdir, a):
+    bigger = _initialized(make_sensible("BiggerToy", BiggerToyBmi), tmpdir)
+    link = Link(
+        a, "model__step_count", bigger, "water__depth", scale=2.0, casting="unsafe"
+    )
+    link()
+    buffers = [link._src_buf.ctypes.data, link._dst_buf.ctypes.data]
+    a.update()
+    link()
+    assert [link._src_buf.ctypes.data, link._dst_buf.ctypes.data] == buffers
+    assert_array_equal(bigger.var["water__depth"].get(), 2.0)
+
+
+def test_coupler(tmpdir, a, b):
+    bigger = _initialized(make_sensible("BiggerToy", BiggerToyBmi), tmpdir)
+
+    coupler = Coupler()
+    coupler.link(a, "land_surface__elevation", b, "water__depth")
+    coupler.link(b, "water__depth", bigger, "water__depth", regrid="nearest")
+    assert len(coupler) == 2
+    assert [link.name for link in coupler] == [
+        "Toy.land_surface__elevation->Toy.water__depth",
+        "Toy.water__depth->Toy.water__depth",
+    ]
+
+    for _ in range(3):
+        a.update()
+        coupler.exchange()
+
+    assert_array_equal(b.var["water__depth"].get(), np.arange(12.0) + 3.0)
+    assert bigger.var["water__depth"].get().max() == 14.0
+
+    timings = coupler.timings()
+    assert sorted(timings) == sorted(link.name for link in coupler)
+    for link in coupler:
+        assert timings[link.name]["calls"] == 3
+        assert timings[link.name]["seconds"] > 0.0
+        assert timings[link.name]["nbytes"] == 3 * link.dst.nbytes
+
+
+def test_coupler_without_timing(a, b):
+    coupler = Coupler(timing=False)
+    coupler.link(a, "land_surface__elevation", b, "water__depth")
+    coupler.exchange()
+    assert coupler.timings() == {}
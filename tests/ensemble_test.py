@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pytest
+from numpy.testing import assert_array_equal
+from sensible_bmi._ensemble import Ensemble
+from sensible_bmi._errors import SensibleError
+from sensible_bmi._errors import ValidationError
+from sensible_bmi.sensible_bmi import make_sensible
+
+from testing.toy_bmi import ToyBmi
+
+
+class SizedToyBmi(ToyBmi):
+    def initialize(self, config_file):
+        if config_file:
+            with open(config_file) as fp:
+                self.shape = (int(fp.read()), 4)
+        super().initialize(config_file)
+
+
+SensibleToy = make_sensible("SensibleToy", ToyBmi)
+SensibleSizedToy = make_sensible("SensibleSizedToy", SizedToyBmi)
+
+
+@pytest.fixture
+def member_dirs(tmpdir):
+    return [str(tmpdir.mkdir(f"member-{n}")) for n in range(5)]
+
+
+@pytest.mark.parametrize("n_workers", (1, 2, 5))
+def test_ensemble_run_until(member_dirs, n_workers):
+    members = [{"where": where} for where in member_dirs]
+    with Ensemble(
+        SensibleToy,
+        members,
+        outputs=["land_surface__elevation", "model__step_count"],
+        n_workers=n_workers,
+    ) as ensemble:
+        assert ensemble.n_workers == n_workers
+        assert ensemble.outputs["land_surface__elevation"].shape == (5, 12)
+        assert ensemble.outputs["model__step_count"].dtype == np.int64
+        assert_array_equal(ensemble.time, 0.0)
+
+        ensemble.run_until(3.0)
+        assert_array_equal(ensemble.time, 3.0)
+        assert_array_equal(ensemble.outputs["model__step_count"], 3)
+
+        ensemble.update()
+        assert_array_equal(ensemble.time, 4.0)
+        assert_array_equal(ensemble.outputs["model__step_count"], 4)
+
+    assert not ensemble.is_running
+    assert ensemble.outputs == {}
+
+
+def test_ensemble_members_run_in_their_own_dirs(member_dirs):
+    with Ensemble(SensibleToy, [{"where": where} for where in member_dirs]) as ens:
+        ens.update()
+
+    assert os.getcwd() not in member_dirs
+
+
+def test_ensemble_outputs_are_read_only(member_dirs):
+    with Ensemble(
+        SensibleToy, [{"where": member_dirs[0]}], outputs=["land_surface__elevation"]
+    ) as ensemble:
+        with pytest.raises(ValueError):
+            ensemble.outputs["land_surface__elevation"][0, 0] = 1.0
+        with pytest.raises(TypeError):
+            ensemble.outputs["foo"] = np.zeros(3)
+
+
+def test_ensemble_bad_output(member_dirs):
+    ensemble = Ensemble(SensibleToy, [{"where": member_dirs[0]}], outputs=["not_a_var"])
+    with pytest.raises(SensibleError, match="not_a_var"):
+        ensemble.start()
+    assert not ensemble.is_running
+
+
+def _sized_members(member_dirs, rows):
+    members = []
+    for where, n_rows in zip(member_dirs, rows):
+        with open(os.path.join(where, "rows.txt"), "w") as fp:
+            fp.write(n_rows)
+        members.append({"filepath": os.path.join(where, "rows.txt")})
+    return members
+
+
+@pytest.mark.parametrize("n_workers", (1, 2))
+def test_ensemble_outputs_must_match(member_dirs, n_workers):
+    ensemble = Ensemble(
+        SensibleSizedToy,
+        _sized_members(member_dirs, ["3", "3", "5"]),
+        outputs=["model__step_count", "land_surface__elevation"],
+        n_workers=n_workers,
+    )
+    with pytest.raises(ValidationError, match="land_surface__elevation.*member 2"):
+        ensemble.start()
+    assert not ensemble.is_running
+
+
+def test_ensemble_member_fails_to_initialize(member_dirs):
+    ensemble = Ensemble(
+        SensibleSizedToy, _sized_members(member_dirs, ["3", "three"]), n_workers=1
+    )
+    with pytest.raises(SensibleError, match="invalid literal"):
+        ensemble.start()
+    assert not ensemble.is_running
+
+
+def test_ensemble_worker_dies(member_dirs):
+    with Ensemble(
+        SensibleToy, [{"where": where} for where in member_dirs], n_workers=2
+    ) as ensemble:
+        process, _, dead = ensemble._workers[0]
+        process.kill()
+        process.join()
+
+        for _ in range(2):
+            with pytest.raises(SensibleError, match="exited unexpectedly"):
+                ensemble.update()
+        alive = ensemble._workers[1][2]
+        assert_array_equal(ensemble.time[alive], 2.0)
+        assert_array_equal(ensemble.time[dead], 0.0)
+
+
+def test_ensemble_not_running(member_dirs):
+    ensemble = Ensemble(SensibleToy, [{"where": member_dirs[0]}])
+    with pytest.raises(SensibleError):
+        ensemble.update()
+    ensemble.close()
+
+
+def test_ensemble_bad_args():
+    with pytest.raises(ValidationError):
+        Ensemble(SensibleToy, [])
+    with pytest.raises(ValidationError):
+        Ensemble(SensibleToy, [{}], n_workers=0)
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pytest
+from numpy.testing import assert_array_equal
+from sensible_bmi._geometry import GeometryCache
+from sensible_bmi._geometry import hash_config
+
+
+def test_hash_config(tmpdir):
+    with tmpdir.as_cwd():
+        with open("a.yaml", "w") as fp:
+            fp.write("a: 1")
+        with open("b.yaml", "w") as fp:
+            fp.write("a: 2")
+
+        assert hash_config("a.yaml") == hash_config(os.path.abspath("a.yaml"))
+        assert hash_config("a.yaml") != hash_config("b.yaml")
+        assert hash_config("a.yaml") != hash_config(None)
+
+
+def test_geometry_cache_round_trip(tmpdir):
+    cache = GeometryCache(tmpdir, "Model", "abc")
+    assert cache.load(0, "x") is None
+
+    cache.save(0, "x", np.arange(4.0))
+    cache.save(1, "edge_nodes", np.arange(6, dtype=np.intc).reshape((3, 2)))
+
+    x = cache.load(0, "x")
+    assert isinstance(x, np.memmap)
+    assert not x.flags.writeable
+    assert_array_equal(x, np.arange(4.0))
+
+    edge_nodes = cache.load(1, "edge_nodes")
+    assert edge_nodes.dtype == np.intc
+    assert edge_nodes.shape == (3, 2)
+
+    assert cache.load(1, "x") is None
+
+
+def test_geometry_cache_is_keyed_by_component_and_config(tmpdir):
+    GeometryCache(tmpdir, "Model", "abc").save(0, "x", np.arange(4.0))
+
+    assert GeometryCache(tmpdir, "Model", "abc").load(0, "x") is not None
+    assert GeometryCache(tmpdir, "Model", "def").load(0, "x") is None
+    assert GeometryCache(tmpdir, "Other", "abc").load(0, "x") is None
+
+
+@pytest.mark.parametrize("name", ("My Model", "../model", "a/b"))
+def test_geometry_cache_component_name_is_sanitized(tmpdir, name):
+    cache = GeometryCache(tmpdir, name)
+    cache.save(0, "x", np.zeros(1))
+
+    assert os.path.dirname(cache.path) == str(tmpdir)
+    assert cache.load(0, "x") is not None
+
+
+def test_geometry_cache_clear(tmpdir):
+    cache = GeometryCache(tmpdir, "Model")
+    cache.save(0, "x", np.arange(4.0))
+
+    cache.clear()
+    assert cache.load(0, "x") is None
+    cache.clear()
@@ -1,16 +1,29 @@
 from __future__ import annotations
 
+import gc
+from unittest.mock import patch
+
 import numpy as np
 import pytest
+from numpy.testing import assert_array_equal
+from sensible_bmi._errors import ValidationError
+from sensible_bmi._geometry import GeometryCache
+from sensible_bmi._grid import _SensibleMesh
+from sensible_bmi._grid import sensible_grid
 from sensible_bmi._grid import SensiblePointGrid
 from sensible_bmi._grid import SensibleRectilinearGrid
 from sensible_bmi._grid import SensibleStructuredQuadrilateralGrid
 from sensible_bmi._grid import SensibleUniformRectilinearGrid
+from sensible_bmi._grid import SensibleUnstructuredGrid
+from sensible_bmi._grid import shared_grid_count
+from sensible_bmi._stats import CallStats
 
 from testing.grids import bmi_points
 from testing.grids import bmi_raster
 from testing.grids import bmi_rectilinear
 from testing.grids import bmi_structured_quad
+from testing.grids import bmi_two_squares
+from testing.grids import bmi_unstructured
 
 
 @pytest.mark.parametrize("rank", (1, 2, 3))
@@ -43,6 +56,47 @@ def test_grid_raster(rank):
     assert grid.shape == tuple(shape)
     assert grid.spacing == tuple(spacing)
     assert grid.origin == tuple(origin)
+    assert grid.node_count == np.prod(shape)
+
+
+def test_grid_raster_coordinates():
+    grid = SensibleUniformRectilinearGrid(
+        bmi_raster((3, 4), (2.0, 1.0), (10.0, 5.0)), 0
+    )
+
+    y, x = np.meshgrid(10.0 + 2.0 * np.arange(3), 5.0 + np.arange(4.0), indexing="ij")
+    assert_array_equal(grid.node_coordinate_view("x"), x)
+    assert grid.cached == {"x"}
+    assert_array_equal(grid.node_coordinate_view("y"), y)
+    assert not grid.node_coordinate_view("x").flags.writeable
+    assert grid.node_coordinate_view("x").strides[0] == 0
+
+    assert grid.x_of_node.shape == (grid.node_count,)
+    assert_array_equal(grid.x_of_node, x.reshape(-1))
+    assert_array_equal(grid.y_of_node, y.reshape(-1))
+    assert grid.x_of_node is grid.x_of_node
+    assert not grid.x_of_node.flags.writeable
+
+    with pytest.raises(AttributeError):
+        grid.z_of_node
+    with pytest.raises(AttributeError):
+        grid.node_coordinate_view("z")
+
+
+def test_grid_raster_coordinates_3d():
+    shape = (2, 3, 4)
+    grid = SensibleUniformRectilinearGrid(
+        bmi_raster(shape, (3.0, 2.0, 1.0), (0, 0, 0)), 0
+    )
+
+    z, y, x = np.meshgrid(
+        3.0 * np.arange(2), 2.0 * np.arange(3), np.arange(4.0), indexing="ij"
+    )
+    assert_array_equal(grid.node_coordinate_view("x"), x)
+    assert_array_equal(grid.node_coordinate_view("y"), y)
+    assert_array_equal(grid.node_coordinate_view("z"), z)
+    assert sum(grid._cache[dim].nbytes for dim in "xyz") == 8 * sum(shape)
+    assert_array_equal(grid.z_of_node, z.reshape(-1))
 
 
 @pytest.mark.parametrize("rank", (1, 2, 3))
@@ -80,3 +134,501 @@ def test_grid_structured_quad(rank):
         assert all(grid.y_of_node == args[rank - 2])
     if rank > 2:
         assert all(grid.z_of_node == args[rank - 3])
+
+
+def test_grid_unstructured():
+    bmi = bmi_two_squares()
+    grid = SensibleUnstructuredGrid(bmi, 3)
+
+    assert grid.id == 3
+    assert grid.rank == 2
+    assert grid.type == "unstructured"
+    assert grid.node_count == 6
+    assert grid.edge_count == 7
+    assert grid.face_count == 2
+    assert list(grid.x_of_node) == [0.0, 1.0, 2.0, 0.0, 1.0, 2.0]
+    assert list(grid.y_of_node) == [0.0, 0.0, 0.0, 1.0, 1.0, 1.0]
+    assert grid.edge_nodes.shape == (7, 2)
+    assert list(grid.edge_nodes[3]) == [1, 4]
+    assert list(grid.nodes_per_face) == [4, 4]
+    assert list(grid.face_nodes) == [0, 1, 4, 3, 1, 2, 5, 4]
+    assert list(grid.face_edges) == [0, 3, 5, 2, 1, 4, 6, 3]
+    with pytest.raises(AttributeError):
+        grid.z_of_node
+
+
+def test_grid_arrays_are_lazy():
+    bmi = bmi_two_squares()
+    grid = SensibleUnstructuredGrid(bmi, 0)
+
+    assert grid.cached == set()
+    bmi.get_grid_x.assert_not_called()
+    bmi.get_grid_face_nodes.assert_not_called()
+
+    assert grid.x_of_node is grid.x_of_node
+    bmi.get_grid_x.assert_called_once()
+    assert grid.cached == {"x"}
+
+    grid.face_nodes
+    assert grid.cached == {"x", "nodes_per_face", "face_nodes"}
+    bmi.get_grid_y.assert_not_called()
+    bmi.get_grid_edge_nodes.assert_not_called()
+
+
+def test_grid_arrays_are_read_only():
+    grid = SensibleUnstructuredGrid(bmi_two_squares(), 0)
+
+    with pytest.raises(ValueError):
+        grid.x_of_node[0] = 1.0
+    with pytest.raises(ValueError):
+        grid.edge_nodes[0] = 1
+
+
+def test_grid_clear_cache():
+    bmi = bmi_two_squares()
+    grid = SensibleUnstructuredGrid(bmi, 0)
+
+    grid.x_of_node
+    grid.y_of_node
+    grid.clear_cache("x")
+    assert grid.cached == {"y"}
+
+    grid.x_of_node
+    assert bmi.get_grid_x.call_count == 2
+
+    grid.clear_cache()
+    assert grid.cached == set()
+
+
+def test_grid_unstructured_face_offsets():
+    grid = SensibleUnstructuredGrid(bmi_two_squares(), 0)
+
+    assert list(grid.face_offsets) == [0, 4, 8]
+    assert list(grid.nodes_at_face[1]) == [1, 2, 5, 4]
+    assert list(grid.edges_at_face[0]) == [0, 3, 5, 2]
+    assert len(grid.nodes_at_face) == 2
+
+
+def test_grid_unstructured_faces_at_node():
+    grid = SensibleUnstructuredGrid(bmi_two_squares(), 0)
+    faces_at_node = grid.faces_at_node
+
+    assert len(faces_at_node) == 6
+    assert [list(faces_at_node[node]) for node in range(6)] == [
+        [0],
+        [0, 1],
+        [1],
+        [0],
+        [0, 1],
+        [1],
+    ]
+    assert list(faces_at_node.counts) == [1, 2, 1, 1, 2, 1]
+    assert grid.faces_at_node is faces_at_node
+
+
+def test_grid_unstructured_edges_at_node():
+    grid = SensibleUnstructuredGrid(bmi_two_squares(), 0)
+
+    assert [list(grid.edges_at_node[node]) for node in range(6)] == [
+        [0, 2],
+        [0, 1, 3],
+        [1, 4],
+        [2, 5],
+        [3, 5, 6],
+        [4, 6],
+    ]
+
+
+def test_grid_unstructured_faces_at_edge():
+    grid = SensibleUnstructuredGrid(bmi_two_squares(), 0)
+
+    assert [list(grid.faces_at_edge[edge]) for edge in range(7)] == [
+        [0],
+        [1],
+        [0],
+        [0, 1],
+        [1],
+        [0],
+        [1],
+    ]
+
+
+def test_grid_unstructured_adjacency_is_cached():
+    grid = SensibleUnstructuredGrid(bmi_two_squares(), 0)
+    grid.faces_at_node
+
+    assert {"faces_at_node", "face_nodes", "nodes_per_face"} <= grid.cached
+    with pytest.raises(ValueError):
+        grid.faces_at_node.indices[0] = 1
+
+    grid.clear_cache("faces_at_node")
+    assert "faces_at_node" not in grid.cached
+
+
+def test_grid_unstructured_adjacency_random_mesh():
+    rng = np.random.default_rng(1945)
+    n_nodes, n_faces = 50, 40
+    nodes_per_face = rng.integers(3, 6, n_faces)
+    face_nodes = rng.integers(0, n_nodes, nodes_per_face.sum())
+    bmi = bmi_unstructured(
+        x=np.zeros(n_nodes),
+        y=np.zeros(n_nodes),
+        edge_nodes=[],
+        nodes_per_face=nodes_per_face,
+        face_nodes=face_nodes,
+        face_edges=np.zeros_like(face_nodes),
+    )
+    grid = SensibleUnstructuredGrid(bmi, 0)
+
+    offsets = np.concatenate(([0], np.cumsum(nodes_per_face)))
+    for node in range(n_nodes):
+        expected = [
+            face
+            for face in range(n_faces)
+            for _ in range(
+                np.count_nonzero(face_nodes[offsets[face] : offsets[face + 1]] == node)
+            )
+        ]
+        assert list(grid.faces_at_node[node]) == expected
+
+
+def test_grid_map_node_to_face():
+    grid = SensibleUnstructuredGrid(bmi_two_squares(), 0)
+    values = np.arange(6.0)
+
+    assert_array_equal(grid.map_node_to_face(values), [2.0, 3.0])
+    assert_array_equal(grid.map_node_to_face(values, how="sum"), [8.0, 12.0])
+    assert_array_equal(grid.map_node_to_face(values, how="min"), [0.0, 1.0])
+    assert_array_equal(grid.map_node_to_face(values, how="max"), [4.0, 5.0])
+
+
+def test_grid_map_face_to_node():
+    grid = SensibleUnstructuredGrid(bmi_two_squares(), 0)
+
+    assert_array_equal(
+        grid.map_face_to_node([1.0, 3.0]), [1.0, 2.0, 3.0, 1.0, 2.0, 3.0]
+    )
+    assert_array_equal(
+        grid.map_face_to_node([1.0, 3.0], how="sum"), [1.0, 4.0, 3.0, 1.0, 4.0, 3.0]
+    )
+
+
+def test_grid_map_node_to_edge_and_back():
+    grid = SensibleUnstructuredGrid(bmi_two_squares(), 0)
+    values = np.arange(6.0)
+
+    at_edge = grid.map_node_to_edge(values)
+    assert_array_equal(at_edge, [0.5, 1.5, 1.5, 2.5, 3.5, 3.5, 4.5])
+    assert_array_equal(
+        grid.map_edge_to_node(at_edge, how="max"), [1.5, 2.5, 3.5, 3.5, 4.5, 4.5]
+    )
+
+
+def test_grid_map_edge_and_face():
+    grid = SensibleUnstructuredGrid(bmi_two_squares(), 0)
+
+    assert_array_equal(grid.map_edge_to_face(np.arange(7.0), how="sum"), [10, 14])
+    assert_array_equal(
+        grid.map_face_to_edge([1.0, 3.0]), [1.0, 3.0, 1.0, 2.0, 3.0, 1.0, 3.0]
+    )
+
+
+def test_grid_map_with_out():
+    grid = SensibleUnstructuredGrid(bmi_two_squares(), 0)
+    out = np.empty(2)
+
+    rtn = grid.map_node_to_face(np.arange(6.0), out=out)
+    assert rtn is out
+    assert_array_equal(out, [2.0, 3.0])
+
+    with pytest.raises(ValueError):
+        grid.map_node_to_face(np.arange(6.0), out=np.empty(3))
+    with pytest.raises(ValueError):
+        grid.map_node_to_face(np.arange(6), out=np.empty(2, dtype=int))
+
+    out = np.empty(2, dtype=int)
+    assert_array_equal(grid.map_node_to_face(np.arange(6), how="sum", out=out), [8, 12])
+
+
+def test_grid_map_integers():
+    grid = SensibleUnstructuredGrid(bmi_two_squares(), 0)
+    values = np.arange(6)
+
+    assert grid.map_node_to_face(values).dtype == np.float64
+    actual = grid.map_node_to_face(values, how="max")
+    assert actual.dtype == values.dtype
+    assert_array_equal(actual, [4, 5])
+
+
+def test_grid_map_to_unconnected_element():
+    bmi = bmi_unstructured(
+        x=np.zeros(5),
+        y=np.zeros(5),
+        edge_nodes=[0, 1, 1, 2, 2, 0],
+        nodes_per_face=[3],
+        face_nodes=[0, 1, 2],
+        face_edges=[0, 1, 2],
+    )
+    grid = SensibleUnstructuredGrid(bmi, 0)
+
+    actual = grid.map_face_to_node([2.0])
+    assert_array_equal(actual[:3], [2.0, 2.0, 2.0])
+    assert np.all(np.isnan(actual[3:]))
+
+
+@pytest.mark.parametrize(
+    "kwds",
+    (
+        {"src": "node", "dst": "node"},
+        {"src": "node", "dst": "cell"},
+        {"src": "node", "dst": "face", "how": "median"},
+    ),
+)
+def test_grid_map_bad_args(kwds):
+    grid = SensibleUnstructuredGrid(bmi_two_squares(), 0)
+    with pytest.raises(ValidationError):
+        grid.map_values(np.arange(6.0), **kwds)
+
+
+def test_grid_map_bad_shape():
+    grid = SensibleUnstructuredGrid(bmi_two_squares(), 0)
+    with pytest.raises(ValueError):
+        grid.map_node_to_face(np.arange(5.0))
+
+
+def test_grid_structured_quad_topology():
+    shape = (2, 3)
+    args = [arg.flatten() for arg in np.meshgrid(range(2), range(3), indexing="ij")]
+    grid = SensibleStructuredQuadrilateralGrid(bmi_structured_quad(shape, *args), 0)
+
+    assert grid.node_count == 6
+    assert grid.edge_count == 7
+    assert grid.face_count == 2
+    assert [list(nodes) for nodes in grid.edge_nodes] == [
+        [0, 1],
+        [1, 2],
+        [3, 4],
+        [4, 5],
+        [0, 3],
+        [1, 4],
+        [2, 5],
+    ]
+    assert list(grid.face_nodes) == [0, 1, 4, 3, 1, 2, 5, 4]
+    assert list(grid.face_edges) == [0, 5, 2, 4, 1, 6, 3, 5]
+    assert [list(faces) for faces in grid.faces_at_edge] == [
+        [0],
+        [1],
+        [0],
+        [1],
+        [0],
+        [0, 1],
+        [1],
+    ]
+    assert_array_equal(grid.map_node_to_face(np.arange(6.0)), [2.0, 3.0])
+
+
+def test_grid_structured_quad_topology_is_built_once():
+    shape = (2, 3)
+    args = [arg.flatten() for arg in np.meshgrid(range(2), range(3), indexing="ij")]
+    grid = SensibleStructuredQuadrilateralGrid(bmi_structured_quad(shape, *args), 0)
+
+    with patch.object(
+        grid, "_build_topology", wraps=grid._build_topology
+    ) as build_topology:
+        grid.edge_nodes, grid.face_nodes, grid.face_edges
+        grid.faces_at_edge, grid.edges_at_node
+    assert build_topology.call_count == 1
+    assert {"edge_nodes", "face_nodes", "face_edges"} <= grid.cached
+    assert not grid.face_edges.flags.writeable
+
+
+def test_mesh_is_abstract():
+    with pytest.raises(TypeError):
+        _SensibleMesh(bmi_two_squares(), 0)
+
+
+def test_grid_structured_quad_topology_needs_rank_2():
+    args = [arg.flatten() for arg in np.meshgrid(range(2), range(3), range(4))]
+    grid = SensibleStructuredQuadrilateralGrid(bmi_structured_quad((2, 3, 4), *args), 0)
+
+    assert grid.node_count == 24
+    with pytest.raises(AttributeError):
+        grid.face_count
+    with pytest.raises(AttributeError):
+        grid.map_node_to_face(np.zeros(24))
+
+
+def test_grid_find_nearest_node_points():
+    grid = SensiblePointGrid(bmi_points([0.0, 1.0, 2.0], [0.0, 0.0, 5.0]), 0)
+    assert_array_equal(
+        grid.find_nearest_node([0.2, 1.9, 1.0], [0.0, 4.0, 0.1]), [0, 2, 1]
+    )
+    assert "node_index" in grid.cached
+
+
+def test_grid_find_nearest_node_needs_rank_2():
+    grid = SensiblePointGrid(bmi_points([0.0, 1.0, 2.0]), 0)
+    with pytest.raises(AttributeError):
+        grid.find_nearest_node(0.0, 0.0)
+
+
+def test_grid_find_raster():
+    grid = SensibleUniformRectilinearGrid(
+        bmi_raster((3, 4), (2.0, 1.0), (10.0, 0.0)), 0
+    )
+
+    assert_array_equal(
+        grid.find_nearest_node([-1.0, 0.4, 2.6, 9.0], [0.0, 11.2, 12.0, 20.0]),
+        [0, 4, 7, 11],
+    )
+    assert_array_equal(
+        grid.find_face([0.5, 2.5, 3.0, 3.5, -0.1], [10.5, 13.0, 14.0, 9.0, 11.0]),
+        [0, 5, 5, -1, -1],
+    )
+
+
+@pytest.mark.parametrize("y", ([0.0, 1.0, 3.0], [3.0, 1.0, 0.0]))
+def test_grid_find_rectilinear(y):
+    grid = SensibleRectilinearGrid(bmi_rectilinear(y, [0.0, 10.0]), 0)
+
+    nearest = grid.find_nearest_node([1.0, 9.0, 20.0], [0.1, 2.5, -1.0])
+    assert_array_equal(grid.x_of_node[nearest % 2], [0.0, 10.0, 10.0])
+    assert_array_equal(grid.y_of_node[nearest // 2], [0.0, 3.0, 0.0])
+
+    faces = grid.find_face([5.0, 5.0, 11.0], [0.5, 2.0, 0.5])
+    assert_array_equal(faces[-1], -1)
+    assert_array_equal(faces[:-1] >= 0, True)
+    assert faces[0] != faces[1]
+
+
+def test_grid_find_face_unstructured():
+    grid = SensibleUnstructuredGrid(bmi_two_squares(), 0)
+
+    assert_array_equal(
+        grid.find_face([0.5, 1.5, 2.5, 0.5], [0.5, 0.5, 0.5, -0.5]), [0, 1, -1, -1]
+    )
+    assert_array_equal(grid.find_nearest_node([0.1, 1.9], [0.9, 0.2]), [3, 2])
+    assert {"node_index", "face_index"} <= grid.cached
+
+
+def test_grid_find_face_structured_quad_matches_raster():
+    shape = (4, 5)
+    y, x = np.meshgrid(np.arange(4.0), np.arange(5.0) * 2.0, indexing="ij")
+    quad = SensibleStructuredQuadrilateralGrid(
+        bmi_structured_quad(shape, y.flatten(), x.flatten()), 0
+    )
+    raster = SensibleUniformRectilinearGrid(
+        bmi_raster(shape, (1.0, 2.0), (0.0, 0.0)), 0
+    )
+
+    rng = np.random.default_rng(seed=42)
+    qx, qy = rng.uniform(0.0, 8.0, 100), rng.uniform(0.0, 3.0, 100)
+    assert_array_equal(quad.find_face(qx, qy), raster.find_face(qx, qy))
+    assert_array_equal(quad.find_nearest_node(qx, qy), raster.find_nearest_node(qx, qy))
+
+
+def test_grid_fingerprint():
+    def raster(origin):
+        return SensibleUniformRectilinearGrid(bmi_raster((3, 4), (1.0, 1.0), origin), 0)
+
+    assert raster((0.0, 0.0)).fingerprint == raster((0.0, 0.0)).fingerprint
+    assert raster((0.0, 0.0)).fingerprint != raster((0.0, 1.0)).fingerprint
+
+    uniform = raster((0.0, 1.0))
+    assert [type(n) for n in uniform.shape + uniform.spacing + uniform.origin] == [
+        int
+    ] * 2 + [float] * 4
+
+    x, y = np.arange(12.0), np.zeros(12)
+    assert (
+        SensiblePointGrid(bmi_points(x), 0).fingerprint
+        != raster((0.0, 0.0)).fingerprint
+    )
+    assert (
+        SensiblePointGrid(bmi_points(x, y), 0).fingerprint
+        != SensiblePointGrid(bmi_points(y, x), 0).fingerprint
+    )
+
+    grid = SensibleUnstructuredGrid(bmi_two_squares(), 0)
+    assert (
+        grid.fingerprint == SensibleUnstructuredGrid(bmi_two_squares(), 0).fingerprint
+    )
+    assert "fingerprint" in grid.cached
+
+
+def test_grid_intern():
+    x, y = np.arange(5.0), np.zeros(5)
+    first = SensiblePointGrid(bmi_points(x, y), 0)
+    first.x_of_node
+    second = SensiblePointGrid(bmi_points(x, y), 1)
+
+    assert second.intern() is second
+    assert first.intern().is_interned
+    assert second.x_of_node is first.x_of_node
+    assert shared_grid_count() >= 1
+
+    nearest = first.find_nearest_node(1.2, 0.0)
+    assert "node_index" in second.cached
+    assert second.find_nearest_node(1.2, 0.0) == nearest
+
+    different = SensiblePointGrid(bmi_points(y, x), 0).intern()
+    assert different.x_of_node is not first.x_of_node
+
+
+def test_grid_intern_clear_cache_detaches():
+    x, y = np.arange(5.0), np.zeros(5)
+    first = sensible_grid(bmi_points(x, y), 0, intern=True)
+    second = sensible_grid(bmi_points(x, y), 0, intern=True)
+
+    second.clear_cache()
+
+    assert not second.is_interned
+    assert second.cached == frozenset()
+    assert "x" in first.cached
+
+
+def test_grid_intern_releases_unused():
+    n_shared = shared_grid_count()
+    grid = SensibleUniformRectilinearGrid(
+        bmi_raster((3, 4), (1.0, 1.0), (1234.0, 5678.0)), 0
+    ).intern()
+    assert shared_grid_count() == n_shared + 1
+
+    del grid
+    gc.collect()
+    assert shared_grid_count() == n_shared
+
+
+def test_grid_geometry_cache(tmpdir):
+    geometry = GeometryCache(tmpdir, "Model")
+    grid = SensibleUnstructuredGrid(bmi_two_squares(), 0, geometry=geometry)
+    grid.x_of_node
+    grid.face_nodes
+
+    bmi = bmi_two_squares()
+    bmi.get_grid_x.side_effect = AssertionError("x was fetched")
+    bmi.get_grid_face_nodes.side_effect = AssertionError("face_nodes was fetched")
+    cached = SensibleUnstructuredGrid(
+        bmi, 0, stats=CallStats(enabled=True), geometry=geometry
+    )
+
+    assert isinstance(cached.x_of_node, np.memmap)
+    assert_array_equal(cached.x_of_node, grid.x_of_node)
+    assert_array_equal(cached.face_nodes, grid.face_nodes)
+    assert_array_equal(cached.y_of_node, grid.y_of_node)
+    assert set(cached.stats.as_dict()["load"]) == {
+        "grid 0: x",
+        "grid 0: nodes_per_face",
+        "grid 0: face_nodes",
+    }
+    assert set(cached.stats.as_dict()["fetch"]) == {"grid 0: y"}
+
+
+def test_grid_geometry_cache_ignores_mismatched_arrays(tmpdir):
+    geometry = GeometryCache(tmpdir, "Model")
+    geometry.save(0, "x", np.arange(3.0))
+
+    grid = SensiblePointGrid(bmi_points([1.0, 2.0], [3.0, 4.0]), 0, geometry=geometry)
+
+    assert_array_equal(grid.x_of_node, [1.0, 2.0])
+    assert_array_equal(geometry.load(0, "x"), [1.0, 2.0])
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from sensible_bmi._errors import ValidationError
+from sensible_bmi._pool import BufferPool
+
+
+def test_pool_miss_then_hit():
+    pool = BufferPool()
+
+    a = pool.acquire(10, "float64")
+    assert a.size == 10
+    assert a.dtype == np.float64
+    assert pool.stats == {
+        "hits": 0,
+        "misses": 1,
+        "evictions": 0,
+        "buffers": 0,
+        "bytes_held": 0,
+    }
+
+    pool.release(a)
+    assert pool.bytes_held == 80
+    assert pool.stats["buffers"] == 1
+
+    assert pool.acquire(10, "float64") is a
+    assert pool.stats["hits"] == 1
+    assert pool.bytes_held == 0
+
+
+@pytest.mark.parametrize(
+    "size, dtype", ((11, "float64"), (10, "float32"), (10, "int64"), (10, "f4,f4"))
+)
+def test_pool_matches_size_and_type(size, dtype):
+    pool = BufferPool()
+    a = np.empty(10, dtype="float64")
+    pool.release(a)
+
+    b = pool.acquire(size, dtype)
+    assert b is not a
+    assert b.size == size
+    assert b.dtype == np.dtype(dtype)
+
+
+def test_pool_release_twice():
+    pool = BufferPool()
+    a = pool.acquire(10, "float64")
+    pool.release(a)
+    pool.release(a)
+
+    assert pool.stats["buffers"] == 1
+
+
+def test_pool_evicts_least_recently_released():
+    pool = BufferPool(max_bytes=200)
+    arrays = [np.empty(10) for _ in range(3)]
+    for array in arrays:
+        pool.release(array)
+
+    assert pool.bytes_held == 160
+    assert pool.stats["evictions"] == 1
+    assert pool.acquire(10, "float64") is arrays[2]
+    assert pool.acquire(10, "float64") is arrays[1]
+    assert pool.acquire(10, "float64") is not arrays[0]
+
+
+def test_pool_lower_max_bytes():
+    pool = BufferPool()
+    for _ in range(4):
+        pool.release(np.empty(10))
+    pool.max_bytes = 100
+
+    assert pool.bytes_held == 80
+    assert pool.stats["evictions"] == 3
+
+
+def test_pool_clear():
+    pool = BufferPool()
+    pool.release(np.empty(10))
+    pool.clear()
+
+    assert pool.bytes_held == 0
+    assert pool.stats["buffers"] == 0
+
+
+@pytest.mark.parametrize(
+    "array",
+    (np.empty((2, 5)), np.empty(10)[::2], np.broadcast_to(np.empty(1), 10)),
+)
+def test_pool_release_bad_array(array):
+    with pytest.raises(ValueError):
+        BufferPool().release(array)
+
+
+@pytest.mark.parametrize("max_bytes, err", ((-1, ValidationError), (1.5, TypeError)))
+def test_pool_bad_max_bytes(max_bytes, err):
+    with pytest.raises(err):
+        BufferPool(max_bytes=max_bytes)
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import json
+import os
+
+import numpy as np
+import pytest
+from numpy.testing import assert_array_equal
+from sensible_bmi._errors import SensibleError
+from sensible_bmi._errors import ValidationError
+from sensible_bmi._recorder import _decode
+from sensible_bmi._recorder import _encode
+from sensible_bmi._recorder import Recorder
+from sensible_bmi._recorder import RecordStore
+from sensible_bmi.sensible_bmi import make_sensible
+
+from testing.toy_bmi import ToyBmi
+
+SensibleToy = make_sensible("SensibleToy", ToyBmi)
+
+NAMES = ["land_surface__elevation", "model__step_count"]
+
+
+@pytest.fixture
+def toy(tmpdir):
+    sensible = SensibleToy()
+    sensible.initialize(where=str(tmpdir))
+    yield sensible
+    sensible.finalize()
+
+
+@pytest.mark.parametrize("compression", (None, "zlib", "delta"))
+@pytest.mark.parametrize("chunk_size", (1, 3, 16))
+def test_record_and_read_back(toy, tmpdir, compression, chunk_size):
+    path = str(tmpdir / "store")
+    expected = []
+    with Recorder(
+        toy, NAMES, path, chunk_size=chunk_size, compression=compression
+    ) as recorder:
+        for _ in range(7):
+            recorder.record()
+            expected.append(toy.var["land_surface__elevation"].get())
+            toy.update()
+    assert recorder.count == 7
+
+    store = RecordStore(path)
+    assert store.names == tuple(NAMES)
+    assert store.compression == compression
+    assert len(store) == 7
+    assert_array_equal(store.time, np.arange(7.0))
+    assert_array_equal(store["land_surface__elevation"], expected)
+    assert_array_equal(store["model__step_count"], np.arange(7).reshape((-1, 1)))
+    assert store["model__step_count"].dtype == np.int64
+
+    snapshot = store.snapshot(4.0)
+    assert_array_equal(snapshot["land_surface__elevation"], expected[4])
+    assert_array_equal(snapshot["model__step_count"], [4])
+
+
+def test_uncompressed_store_is_memory_mapped(toy, tmpdir):
+    path = str(tmpdir / "store")
+    with Recorder(toy, NAMES, path) as recorder:
+        recorder.record()
+
+    store = RecordStore(path)
+    assert isinstance(store.time, np.memmap)
+    assert isinstance(store["land_surface__elevation"], np.memmap)
+    with pytest.raises(ValueError):
+        store["land_surface__elevation"][0, 0] = 1.0
+
+
+def test_compressed_store_is_read_only(toy, tmpdir):
+    path = str(tmpdir / "store")
+    with Recorder(toy, NAMES, path, compression="delta") as recorder:
+        recorder.record()
+
+    store = RecordStore(path)
+    with pytest.raises(ValueError):
+        store["land_surface__elevation"][0, 0] = 1.0
+    with pytest.raises(ValueError):
+        store.snapshot(0.0)["land_surface__elevation"][0] = 1.0
+
+
+def test_header(toy, tmpdir):
+    path = str(tmpdir / "store")
+    Recorder(toy, NAMES, path, compression="zlib").close()
+
+    store = RecordStore(path)
+    assert store.component == "Toy"
+    assert store.header["time_units"] == toy.time.units
+    assert store.header["vars"]["land_surface__elevation"]["size"] == 12
+    assert store.header["vars"]["land_surface__elevation"]["grid"] == 0
+    assert store.header["vars"]["model__step_count"]["grid"] is None
+    assert store.header["grids"]["0"]["type"] == "uniform_rectilinear"
+    assert store.header["grids"]["0"]["shape"] == [3, 4]
+    assert list(store.header["grids"]) == ["0"]
+    with open(os.path.join(path, "header.json")) as fp:
+        assert json.load(fp) == store.header
+
+
+def test_empty_store(toy, tmpdir):
+    path = str(tmpdir / "store")
+    Recorder(toy, NAMES, path, compression="zlib").close()
+
+    store = RecordStore(path)
+    assert len(store) == 0
+    assert store["land_surface__elevation"].shape == (0, 12)
+
+
+def test_update_every(toy, tmpdir):
+    path = str(tmpdir / "store")
+    with Recorder(toy, NAMES, path, every=2.0) as recorder:
+        taken = []
+        for _ in range(6):
+            taken.append(recorder.update())
+            toy.update()
+    assert taken == [True, False, True, False, True, False]
+    assert_array_equal(RecordStore(path).time, [0.0, 2.0, 4.0])
+
+
+def test_as_run_until_callback(toy, tmpdir):
+    path = str(tmpdir / "store")
+    with Recorder(toy, ["model__step_count"], path, every=3.0) as recorder:
+        toy.run_until(9.0, every=3.0, callback=recorder)
+
+    store = RecordStore(path)
+    assert_array_equal(store.time, [3.0, 6.0, 9.0])
+    assert_array_equal(store["model__step_count"].reshape(-1), [3, 6, 9])
+
+
+def test_flush_makes_snapshots_readable(toy, tmpdir):
+    path = str(tmpdir / "store")
+    with Recorder(toy, NAMES, path, chunk_size=10) as recorder:
+        recorder.record()
+        toy.update()
+        recorder.record()
+        assert len(RecordStore(path)) == 0
+
+        recorder.flush()
+        assert_array_equal(RecordStore(path).time, [0.0, 1.0])
+
+        toy.update()
+        recorder.record()
+    assert_array_equal(RecordStore(path).time, [0.0, 1.0, 2.0])
+
+
+def test_snapshot_missing_time(toy, tmpdir):
+    path = str(tmpdir / "store")
+    with Recorder(toy, NAMES, path) as recorder:
+        recorder.record()
+
+    store = RecordStore(path)
+    assert store.index(0.0) == 0
+    with pytest.raises(KeyError):
+        store.snapshot(0.5)
+    with pytest.raises(KeyError):
+        store["not_recorded"]
+
+
+def test_bad_arguments(toy, tmpdir):
+    path = str(tmpdir / "store")
+    with pytest.raises(ValidationError):
+        Recorder(toy, NAMES, path, compression="lz4")
+    with pytest.raises(ValidationError):
+        Recorder(toy, NAMES, path, chunk_size=0)
+    with pytest.raises(ValidationError):
+        Recorder(toy, NAMES, path, every=0.0)
+    with pytest.raises(SensibleError):
+        Recorder(toy, ["air__temperature"], path)
+    assert not os.path.exists(path)
+
+
+def test_store_exists(toy, tmpdir):
+    path = str(tmpdir / "store")
+    Recorder(toy, NAMES, path).close()
+    with pytest.raises(SensibleError):
+        Recorder(toy, NAMES, path)
+
+
+def test_not_a_store(tmpdir):
+    with pytest.raises(SensibleError):
+        RecordStore(str(tmpdir))
+
+
+def test_record_after_close(toy, tmpdir):
+    recorder = Recorder(toy, NAMES, str(tmpdir / "store"))
+    recorder.close()
+    recorder.close()
+    assert recorder.closed
+    with pytest.raises(SensibleError):
+        recorder.record()
+
+
+def test_write_errors_are_raised(toy, tmpdir):
+    recorder = Recorder(toy, NAMES, str(tmpdir / "store"), chunk_size=1)
+    recorder._time.close()
+    recorder.record()
+    with pytest.raises(SensibleError):
+        recorder.flush()
+    with pytest.raises(SensibleError):
+        recorder.close()
+
+
+@pytest.mark.parametrize("dtype", ("float64", "float32", "int32", "uint8"))
+@pytest.mark.parametrize("compression", (None, "zlib", "delta"))
+def test_encode_decode_round_trip(dtype, compression):
+    values = (np.random.default_rng(1945).random((5, 7)) * 100).astype(dtype)
+    blob = _encode(values, compression, 6)
+    assert_array_equal(_decode(blob, compression, values.dtype, 5, 7), values)
+
+
+def test_delta_compresses_slowly_changing_values():
+    values = np.cumsum(np.ones((64, 1000), dtype=np.int64), axis=0)
+    assert len(_encode(values, "delta", 6)) < len(_encode(values, "zlib", 6))
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pytest
+from numpy.testing import assert_array_almost_equal
+from numpy.testing import assert_array_equal
+from sensible_bmi._errors import ValidationError
+from sensible_bmi._grid import SensiblePointGrid
+from sensible_bmi._grid import SensibleRectilinearGrid
+from sensible_bmi._grid import SensibleUniformRectilinearGrid
+from sensible_bmi._grid import SensibleUnstructuredGrid
+from sensible_bmi._regrid import Regridder
+
+from testing.grids import bmi_points
+from testing.grids import bmi_raster
+from testing.grids import bmi_rectilinear
+from testing.grids import bmi_two_squares
+
+
+def raster(shape=(4, 5), spacing=(1.0, 2.0), origin=(0.0, 0.0)):
+    return SensibleUniformRectilinearGrid(bmi_raster(shape, spacing, origin), 0)
+
+
+def points(x, y):
+    return SensiblePointGrid(bmi_points(np.asarray(x), np.asarray(y)), 0)
+
+
+def random_points(n, seed=0, x_max=8.0, y_max=3.0):
+    rng = np.random.default_rng(seed=seed)
+    return points(rng.uniform(0.0, x_max, n), rng.uniform(0.0, y_max, n))
+
+
+def test_regrid_nearest():
+    src = raster()
+    dst = points([0.9, 1.1, 7.9, 100.0], [0.4, 0.6, 3.0, 1.2])
+
+    regridder = Regridder(src, dst, method="nearest")
+
+    assert regridder.shape == (4, 20)
+    assert_array_equal(regridder.regrid(np.arange(20.0)), [0.0, 6.0, 19.0, 9.0])
+
+
+def test_regrid_bilinear_is_exact_for_linear_fields():
+    src = raster()
+    dst = random_points(50)
+    x, y = np.ravel(src.x_of_node), np.ravel(src.y_of_node)
+
+    regridder = Regridder(src, dst, method="bilinear")
+
+    assert_array_almost_equal(
+        regridder.regrid(3.0 * x - 2.0 * y + 1.0),
+        3.0 * dst.x_of_node - 2.0 * dst.y_of_node + 1.0,
+    )
+
+
+def test_regrid_bilinear_outside_is_nan():
+    regridder = Regridder(
+        raster(), points([-1.0, 4.0, 9.0], [1.0, 1.0, 1.0]), "bilinear"
+    )
+    assert_array_equal(np.isnan(regridder.regrid(np.ones(20))), [True, False, True])
+
+
+@pytest.mark.parametrize("y", ([0.0, 1.0, 3.0], [3.0, 1.0, 0.0]))
+def test_regrid_bilinear_rectilinear(y):
+    src = SensibleRectilinearGrid(bmi_rectilinear(y, [0.0, 1.0, 5.0, 6.0]), 0)
+    dst = random_points(50, x_max=6.0)
+    yy, xx = np.meshgrid(y, [0.0, 1.0, 5.0, 6.0], indexing="ij")
+
+    regridder = Regridder(src, dst, method="bilinear")
+
+    assert_array_almost_equal(
+        regridder.regrid(np.ravel(xx + 10.0 * yy)), dst.x_of_node + 10.0 * dst.y_of_node
+    )
+
+
+def test_regrid_bilinear_needs_rectilinear_source():
+    with pytest.raises(ValidationError):
+        Regridder(random_points(5), raster(), method="bilinear")
+
+
+def test_regrid_idw():
+    src = random_points(100)
+    dst = points([src.x_of_node[3], 4.0], [src.y_of_node[3], 1.5])
+    values = np.random.default_rng(seed=1).random(100)
+
+    regridder = Regridder(src, dst, method="idw", k=6)
+
+    assert_array_almost_equal(np.add.reduceat(regridder.weights, [0, 6]), [1.0, 1.0])
+    regridded = regridder.regrid(values)
+    assert regridded[0] == values[3]
+    assert values.min() <= regridded[1] <= values.max()
+    assert_array_almost_equal(regridder.regrid(np.full(100, 2.0)), [2.0, 2.0])
+
+
+def test_regrid_idw_from_unstructured():
+    src = SensibleUnstructuredGrid(bmi_two_squares(), 0)
+    dst = points([0.5, 1.0], [0.5, 0.0])
+
+    regridder = Regridder(src, dst, method="idw", k=4)
+
+    assert_array_almost_equal(
+        regridder.regrid([0.0, 1.0, 2.0, 0.0, 1.0, 2.0]), [0.5, 1.0]
+    )
+
+
+def test_regrid_into_out():
+    regridder = Regridder(raster(), random_points(10), method="bilinear")
+    values = np.arange(20.0)
+
+    out = np.empty(10)
+    assert regridder.regrid(values, out=out) is out
+    assert_array_equal(out, regridder(values))
+
+    out = np.empty(10, dtype=np.float32)
+    regridder.regrid(values.astype(np.float32), out=out)
+    assert_array_almost_equal(out, regridder(values), decimal=5)
+
+
+def test_regrid_bad_args():
+    with pytest.raises(ValidationError):
+        Regridder(raster(), raster(), method="cubic")
+    with pytest.raises(ValidationError):
+        Regridder(raster(), raster(), method="idw", k=0)
+
+    regridder = Regridder(raster(), raster())
+    with pytest.raises(ValueError):
+        regridder.regrid(np.zeros(5))
+    with pytest.raises(ValueError):
+        regridder.regrid(np.zeros(20), out=np.empty(5))
+
+
+def test_regrid_weights_are_cached_to_disk(tmpdir, monkeypatch):
+    src, dst = raster(), random_points(10)
+    cache_dir = os.path.join(tmpdir, "weights")
+
+    regridder = Regridder(src, dst, method="bilinear", cache_dir=cache_dir)
+    assert os.listdir(cache_dir) == [regridder.cache_key + ".npz"]
+
+    def fail(self):
+        raise AssertionError("weights were recomputed")
+
+    monkeypatch.setattr(Regridder, "_compute", fail)
+    cached = Regridder(
+        raster(), random_points(10), method="bilinear", cache_dir=cache_dir
+    )
+
+    assert_array_equal(cached.indices, regridder.indices)
+    assert_array_equal(cached.weights, regridder.weights)
+    with pytest.raises(AssertionError):
+        Regridder(
+            src, random_points(10, seed=1), method="bilinear", cache_dir=cache_dir
+        )
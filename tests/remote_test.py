@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import os
+import threading
+from multiprocessing.shared_memory import SharedMemory
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from numpy.testing import assert_array_equal
+from sensible_bmi._errors import SensibleError
+from sensible_bmi._remote import remote_bmi_class
+from sensible_bmi._remote import RemoteBmi
+from sensible_bmi.sensible_bmi import make_sensible
+
+from testing.toy_bmi import ToyBmi
+
+
+class CrashingToyBmi(ToyBmi):
+    def update(self) -> None:
+        os._exit(3)
+
+
+class FileWritingToyBmi(ToyBmi):
+    def update(self) -> None:
+        super().update()
+        with open("updated.txt", "a") as fp:
+            print(self._time, file=fp)
+
+
+SensibleRemoteToy = make_sensible("SensibleRemoteToy", ToyBmi, out_of_process=True)
+
+
+@pytest.fixture
+def remote_toy(tmpdir):
+    sensible = SensibleRemoteToy()
+    sensible.initialize(where=str(tmpdir))
+    yield sensible
+    sensible.finalize()
+    sensible.bmi.close()
+
+
+def test_remote_runs_in_child_process(remote_toy):
+    assert isinstance(remote_toy.bmi, RemoteBmi)
+    assert remote_toy.bmi.pid != os.getpid()
+    assert remote_toy.bmi.is_alive
+    assert remote_toy.name == "Toy"
+    assert "water__depth" in remote_toy.input_var_names
+
+
+def test_remote_get_and_set(remote_toy):
+    var = remote_toy.var["water__depth"]
+    var.set(np.arange(12.0))
+    assert_array_equal(var.get(), np.arange(12.0))
+
+    var.set_at([1, 3], [-1.0, -3.0])
+    assert_array_equal(var.get_at([0, 1, 3]), [0.0, -1.0, -3.0])
+    assert var[3] == -3.0
+
+
+def test_remote_data_is_refreshed(remote_toy):
+    var = remote_toy.var["land_surface__elevation"]
+    assert var.is_zero_copy
+    data = var.data
+    before = data.copy()
+
+    remote_toy.update()
+    assert_array_equal(data, before)
+
+    assert var.data is data
+    assert_array_equal(data, before + 1.0)
+    assert not data.flags.writeable
+
+
+def test_remote_data_is_refreshed_only_when_read(remote_toy):
+    remote_toy.var["land_surface__elevation"].data
+    with patch.object(remote_toy.bmi, "_call", wraps=remote_toy.bmi._call) as call:
+        remote_toy.update()
+        assert [c.args[0] for c in call.call_args_list] == ["update"]
+
+        remote_toy.var["land_surface__elevation"].data
+        remote_toy.var["land_surface__elevation"].data
+        assert [c.args[0] for c in call.call_args_list] == ["update", "get_value"]
+
+
+def test_remote_get_and_set_from_threads(remote_toy):
+    var = remote_toy.var["water__depth"]
+    errors = []
+
+    def run(value):
+        for _ in range(50):
+            var.set(np.full(12, value))
+            values = var.get()
+            if not np.all((values == 1.0) | (values == 2.0)):
+                errors.append(values)
+
+    threads = [threading.Thread(target=run, args=(value,)) for value in (1.0, 2.0)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+
+
+def test_remote_replaced_blocks_are_released(remote_toy):
+    var = remote_toy.var["water__depth"]
+    var.get_at([0])
+    old = remote_toy.bmi._blocks[("inds", "water__depth")]
+
+    with patch.object(remote_toy.bmi, "_call", wraps=remote_toy.bmi._call) as call:
+        assert_array_equal(var.get_at(range(12)), var.get())
+
+    assert remote_toy.bmi._blocks[("inds", "water__depth")] is not old
+    assert ("_release_block", old.name) in [c.args for c in call.call_args_list]
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=old.name)
+
+
+def test_remote_time_and_run_until(remote_toy):
+    remote_toy.run_until(5.0)
+    assert remote_toy.time.current == 5.0
+    assert remote_toy.var["model__step_count"].get()[0] == 5
+
+
+def test_remote_grids(remote_toy):
+    local = ToyBmi()
+    local.initialize("")
+    x, y = np.empty(5), np.empty(5)
+
+    assert remote_toy.grid[0].shape == (3, 4)
+    assert_array_equal(remote_toy.grid[1].x_of_node, local.get_grid_x(1, x))
+    assert_array_equal(remote_toy.grid[1].y_of_node, local.get_grid_y(1, y))
+
+
+def test_remote_runs_in_init_dir(tmpdir):
+    sensible = make_sensible("Remote", FileWritingToyBmi, out_of_process=True)()
+    sensible.initialize(where=str(tmpdir))
+    sensible.update()
+    sensible.update()
+    sensible.finalize()
+    sensible.bmi.close()
+
+    assert os.path.isfile(os.path.join(tmpdir, "updated.txt"))
+    assert not os.path.exists("updated.txt")
+
+
+def test_remote_errors_are_raised(remote_toy):
+    with pytest.raises(KeyError):
+        remote_toy.bmi.get_var_type("not_a_var")
+    assert remote_toy.bmi.is_alive
+
+
+def test_remote_crash(tmpdir):
+    sensible = make_sensible("Remote", CrashingToyBmi, out_of_process=True)()
+    sensible.initialize(where=str(tmpdir))
+
+    with pytest.raises(SensibleError, match="exit code 3"):
+        sensible.update()
+    assert not sensible.bmi.is_alive
+    sensible.bmi.close()
+
+
+def test_remote_close():
+    bmi = remote_bmi_class(ToyBmi)()
+    bmi.close()
+    assert not bmi.is_alive
+    with pytest.raises(SensibleError):
+        bmi.get_component_name()
+    bmi.close()
+
+
+def test_remote_needs_a_class():
+    with pytest.raises(RuntimeError):
+        RemoteBmi()
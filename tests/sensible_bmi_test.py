@@ -0,0 +1,456 @@
+from __future__ import annotations
+
+import os
+import pickle
+import threading
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from sensible_bmi._errors import SensibleError
+from sensible_bmi._errors import ValidationError
+from sensible_bmi._grid import SensiblePointGrid
+from sensible_bmi._grid import SensibleUniformRectilinearGrid
+from sensible_bmi._var import SensibleInputOutputVar
+from sensible_bmi._var import SensibleInputVar
+from sensible_bmi._var import SensibleOutputVar
+from sensible_bmi.sensible_bmi import make_sensible
+
+from testing.toy_bmi import ToyBmi
+
+SensibleToy = make_sensible("SensibleToy", ToyBmi)
+PicklableToy = make_sensible("PicklableToy", ToyBmi, module=__name__)
+
+
+@pytest.fixture
+def toy(tmpdir):
+    sensible = SensibleToy()
+    sensible.initialize(where=str(tmpdir))
+    yield sensible
+    sensible.finalize()
+
+
+def test_make_sensible_module():
+    assert PicklableToy.__module__ == __name__
+    assert pickle.loads(pickle.dumps(PicklableToy)) is PicklableToy
+
+
+def test_not_initialized():
+    sensible = SensibleToy()
+    with pytest.raises(SensibleError):
+        sensible.var
+    with pytest.raises(SensibleError):
+        sensible.update()
+
+
+def test_initialize(toy):
+    assert toy.name == "Toy"
+    assert toy.input_var_names == {"air__temperature", "water__depth"}
+    assert toy.output_var_names == {
+        "land_surface__elevation",
+        "model__step_count",
+        "sea_floor__depth",
+        "water__depth",
+    }
+    assert isinstance(toy.var["air__temperature"], SensibleInputVar)
+    assert isinstance(toy.var["land_surface__elevation"], SensibleOutputVar)
+    assert isinstance(toy.var["water__depth"], SensibleInputOutputVar)
+    assert isinstance(toy.grid[0], SensibleUniformRectilinearGrid)
+    assert isinstance(toy.grid[1], SensiblePointGrid)
+
+
+def test_initialize_twice(toy):
+    with pytest.raises(SensibleError):
+        toy.initialize()
+
+
+def test_initialize_is_lazy(tmpdir):
+    sensible = SensibleToy()
+    with (
+        patch.object(ToyBmi, "get_var_units") as get_var_units,
+        patch.object(ToyBmi, "get_grid_rank") as get_grid_rank,
+    ):
+        get_var_units.return_value = "m"
+        get_grid_rank.return_value = 2
+
+        sensible.initialize(where=str(tmpdir))
+        assert sorted(sensible.var) == sorted(
+            sensible.input_var_names | sensible.output_var_names
+        )
+        get_var_units.assert_not_called()
+        get_grid_rank.assert_not_called()
+
+        var = sensible.var["land_surface__elevation"]
+        assert sensible.var["land_surface__elevation"] is var
+        get_var_units.assert_called_once_with("land_surface__elevation")
+        assert sensible.var.loaded == {"land_surface__elevation"}
+
+
+def test_initialize_eager(tmpdir):
+    sensible = SensibleToy()
+    sensible.initialize(where=str(tmpdir), eager=True)
+
+    assert sensible.var.loaded == set(sensible.var)
+    assert sensible.grid.loaded == {0, 1}
+
+
+def test_grids_of_vars(toy):
+    assert sorted(toy.grid) == [0, 1]
+    assert 2 not in toy.grid
+    with pytest.raises(KeyError):
+        toy.grid[2]
+    with pytest.raises(KeyError):
+        toy.var["not_a_var"]
+
+
+class WanderingToyBmi(ToyBmi):
+    def initialize(self, config_file):
+        super().initialize(config_file)
+        os.chdir(os.pardir)
+
+
+def test_initialize_records_where(tmpdir):
+    sensible = make_sensible("WanderingToy", WanderingToyBmi)()
+    sensible.initialize(where=str(tmpdir.mkdir("run")))
+    sensible.update()
+    assert sensible.bmi.cwd_at_update == [os.path.realpath(tmpdir / "run")]
+    sensible.finalize()
+
+
+def test_update(toy):
+    before = toy.var["land_surface__elevation"].get()
+    toy.update()
+
+    assert toy.time.current == 1.0
+    assert np.all(toy.var["land_surface__elevation"].get() == before + 1.0)
+
+
+def test_get_many(toy):
+    names = ["land_surface__elevation", "water__depth"]
+    values = toy.get_many(names)
+
+    assert sorted(values) == sorted(names)
+    for name in names:
+        assert np.all(values[name] == toy.var[name].get())
+
+
+def test_get_many_reuses_buffers(toy):
+    names = ["land_surface__elevation", "sea_floor__depth"]
+    out = toy.empty_many(names)
+    buffers = dict(out)
+
+    toy.get_many(names, out=out)
+    toy.update()
+    rtn = toy.get_many(names, out=out)
+
+    assert rtn is out
+    for name in names:
+        assert out[name] is buffers[name]
+        assert np.all(out[name] == toy.var[name].get())
+
+
+def test_get_many_with_partial_out(toy):
+    out = {"land_surface__elevation": toy.var["land_surface__elevation"].empty()}
+    toy.get_many(["land_surface__elevation", "sea_floor__depth"], out=out)
+
+    assert sorted(out) == ["land_surface__elevation", "sea_floor__depth"]
+
+
+@pytest.mark.parametrize("buffer", (np.empty(11), np.empty(12, dtype=np.float32)))
+def test_get_many_bad_out(toy, buffer):
+    with pytest.raises(ValidationError):
+        toy.get_many(
+            ["land_surface__elevation"], out={"land_surface__elevation": buffer}
+        )
+
+
+def test_get_many_is_recorded(toy):
+    toy.stats.enable()
+    toy.get_many(["land_surface__elevation", "sea_floor__depth"])
+
+    actual = toy.stats.as_dict()
+    assert actual["get"]["land_surface__elevation"]["nbytes"] == 12 * 8
+    assert actual["get"]["sea_floor__depth"]["calls"] == 1
+
+
+def test_get_many_not_output(toy):
+    with pytest.raises(SensibleError):
+        toy.get_many(["air__temperature"])
+
+
+def test_empty_many(toy):
+    names = ["land_surface__elevation", "model__step_count", "sea_floor__depth"]
+    buffers = toy.empty_many(names, align=64)
+
+    for name in names:
+        var = toy.var[name]
+        assert buffers[name].dtype == var.type
+        assert buffers[name].size == var.size
+        assert buffers[name].ctypes.data % 64 == 0
+    assert buffers[names[0]].base is buffers[names[1]].base
+
+
+def test_set_many(toy):
+    toy.set_many({"air__temperature": 2.0, "water__depth": np.arange(12.0)})
+
+    assert np.all(toy.var["water__depth"].get() == np.arange(12.0))
+    assert np.all(toy.bmi.get_value_ptr("air__temperature") == 2.0)
+
+
+def test_set_many_not_input(toy):
+    with pytest.raises(SensibleError):
+        toy.set_many({"land_surface__elevation": 1.0})
+
+
+class ToyBmiWithoutUpdateUntil(ToyBmi):
+    def update_until(self, time):
+        raise NotImplementedError("update_until")
+
+
+@pytest.mark.parametrize("bmi_class", (ToyBmi, ToyBmiWithoutUpdateUntil))
+def test_run_until(tmpdir, bmi_class):
+    sensible = make_sensible("SensibleToy", bmi_class)()
+    sensible.initialize(where=str(tmpdir))
+
+    with patch("os.chdir", wraps=os.chdir) as chdir:
+        sensible.run_until(10.0)
+    assert chdir.call_count == 2
+
+    assert sensible.time.current == 10.0
+    assert sensible.var["model__step_count"].get()[0] == 10
+    assert sensible.bmi.cwd_at_update == [os.path.realpath(tmpdir)] * 10
+
+
+@pytest.mark.parametrize("bmi_class", (ToyBmi, ToyBmiWithoutUpdateUntil))
+def test_run_until_with_callback(tmpdir, bmi_class):
+    sensible = make_sensible("SensibleToy", bmi_class)()
+    sensible.initialize(where=str(tmpdir))
+
+    times = []
+    sensible.run_until(
+        10.0, every=3.0, callback=lambda component: times.append(component.time.current)
+    )
+
+    assert times == [3.0, 6.0, 9.0]
+    assert sensible.time.current == 10.0
+
+
+def test_run_until_callback_once(toy):
+    times = []
+    toy.run_until(5.0, callback=lambda component: times.append(component.time.current))
+
+    assert times == [5.0]
+
+
+class StuckToyBmi(ToyBmiWithoutUpdateUntil):
+    def get_time_step(self):
+        return 0.0
+
+
+def test_run_until_stuck(tmpdir):
+    sensible = make_sensible("StuckToy", StuckToyBmi)()
+    sensible.initialize(where=str(tmpdir))
+    try:
+        with pytest.raises(SensibleError, match="stuck"):
+            sensible.run_until(5.0)
+        assert sensible.time.current == 0.0
+    finally:
+        sensible.finalize()
+
+
+@pytest.mark.parametrize("every", (0.0, -1.0))
+def test_run_until_bad_interval(toy, every):
+    with pytest.raises(ValidationError):
+        toy.run_until(5.0, every=every)
+
+
+def test_session(toy):
+    with patch("os.chdir", wraps=os.chdir) as chdir:
+        with toy.session() as session:
+            assert session is toy
+            for _ in range(5):
+                toy.update()
+            toy.run_until(10.0)
+    assert chdir.call_count == 2
+    assert toy.time.current == 10.0
+
+
+def test_session_interleaved(tmpdir):
+    dir_a = os.path.realpath(tmpdir / "a")
+    dir_b = os.path.realpath(tmpdir / "b")
+    os.mkdir(dir_a)
+    os.mkdir(dir_b)
+    a, b = SensibleToy(), SensibleToy()
+    a.initialize(where=dir_a)
+    b.initialize(where=dir_b)
+
+    cwd = os.getcwd()
+    with a.session():
+        a.update()
+        b.update()
+        a.update()
+        assert os.getcwd() == dir_a
+    assert os.getcwd() == cwd
+
+    assert a.bmi.cwd_at_update == [dir_a] * 2
+    assert b.bmi.cwd_at_update == [dir_b]
+
+
+def test_session_restores_cwd_on_error(toy):
+    cwd = os.getcwd()
+    with pytest.raises(ZeroDivisionError), toy.session():
+        1 / 0
+    assert os.getcwd() == cwd
+
+
+def test_session_not_initialized():
+    with pytest.raises(SensibleError):
+        SensibleToy().session()
+
+
+def test_stats(toy):
+    toy.stats.enable()
+    toy.update()
+    toy.run_until(5.0)
+    toy.var["land_surface__elevation"].get()
+    toy.var["air__temperature"].set(1.0)
+    toy.grid[1].x_of_node
+
+    actual = toy.stats.as_dict()
+    assert actual["update"]["Toy"]["calls"] == 1
+    assert actual["run_until"]["Toy"]["calls"] == 1
+    assert actual["get"]["land_surface__elevation"]["nbytes"] == 12 * 8
+    assert actual["set"]["air__temperature"]["nbytes"] == 12 * 8
+    assert actual["fetch"]["grid 1: x"]["nbytes"] == 5 * 8
+
+
+def test_initialize_share_grids(tmpdir):
+    members = [SensibleToy() for _ in range(3)]
+    for member in members:
+        member.initialize(where=str(tmpdir), share_grids=True)
+
+    assert all(member.grid[1].is_interned for member in members)
+    x_of_node = members[0].grid[1].x_of_node
+    assert all(member.grid[1].x_of_node is x_of_node for member in members)
+
+    other = SensibleToy()
+    other.initialize(where=str(tmpdir))
+    assert not other.grid[1].is_interned
+    assert other.grid[1].x_of_node is not x_of_node
+
+    for member in members + [other]:
+        member.finalize()
+
+
+def test_initialize_geometry_cache(tmpdir):
+    cache_dir = str(tmpdir.mkdir("geometry"))
+
+    first = SensibleToy()
+    first.initialize(where=str(tmpdir), geometry_cache=cache_dir)
+    x_of_node = first.grid[1].x_of_node.copy()
+    first.finalize()
+
+    second = SensibleToy()
+    second.initialize(where=str(tmpdir), geometry_cache=cache_dir)
+    with patch.object(second.bmi, "get_grid_x", side_effect=AssertionError):
+        assert isinstance(second.grid[1].x_of_node, np.memmap)
+        np.testing.assert_array_equal(second.grid[1].x_of_node, x_of_node)
+    second.finalize()
+
+
+def test_update_from_threads(tmpdir):
+    members = [SensibleToy() for _ in range(4)]
+    for n, member in enumerate(members):
+        member.initialize(where=str(tmpdir.mkdir(f"member-{n}")))
+
+    def run(member):
+        for _ in range(25):
+            member.update()
+
+    threads = [threading.Thread(target=run, args=(member,)) for member in members]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for member in members:
+        assert member.bmi.cwd_at_update == [os.path.realpath(member._initdir)] * 25
+        assert member.time.current == 25.0
+        member.finalize()
+
+
+def test_update_same_component_from_threads(toy):
+    threads = [
+        threading.Thread(target=lambda: [toy.update() for _ in range(25)])
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert toy.time.current == 100.0
+    assert toy.var["model__step_count"].get()[0] == 100
+
+
+def test_session_and_update_from_threads(tmpdir):
+    a, b = SensibleToy(), SensibleToy()
+    a.initialize(where=str(tmpdir.mkdir("a")))
+    b.initialize(where=str(tmpdir.mkdir("b")))
+    in_session = threading.Event()
+
+    def use_session():
+        with a.session():
+            in_session.set()
+            time.sleep(0.1)
+            b.update()
+
+    def update():
+        in_session.wait()
+        a.update()
+
+    threads = [
+        threading.Thread(target=use_session, daemon=True),
+        threading.Thread(target=update, daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5.0)
+
+    assert not any(thread.is_alive() for thread in threads)
+    assert a.time.current == 1.0
+    assert b.time.current == 1.0
+    a.finalize()
+    b.finalize()
+
+
+def test_nested_updates_from_a_shared_dir(tmpdir):
+    shared = str(tmpdir.mkdir("x"))
+    a, b, c, d = SensibleToy(), SensibleToy(), SensibleToy(), SensibleToy()
+    a.initialize(where=shared)
+    b.initialize(where=shared)
+    c.initialize(where=str(tmpdir.mkdir("y")))
+    d.initialize(where=str(tmpdir.mkdir("z")))
+    barrier = threading.Barrier(2, timeout=5.0)
+
+    def step(outer, inner):
+        with outer.session():
+            barrier.wait()
+            inner.update()
+
+    threads = [
+        threading.Thread(target=step, args=(a, c), daemon=True),
+        threading.Thread(target=step, args=(b, d), daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5.0)
+
+    assert not any(thread.is_alive() for thread in threads)
+    assert c.time.current == 1.0
+    assert d.time.current == 1.0
+    for sensible in (a, b, c, d):
+        sensible.finalize()
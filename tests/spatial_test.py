@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from numpy.testing import assert_array_equal
+from sensible_bmi._spatial import cell_on_axis
+from sensible_bmi._spatial import FaceIndex
+from sensible_bmi._spatial import nearest_on_axis
+from sensible_bmi._spatial import NodeIndex
+
+
+def brute_force_nearest(x, y, qx, qy):
+    d2 = (x[None, :] - qx[:, None]) ** 2 + (y[None, :] - qy[:, None]) ** 2
+    return np.argmin(d2, axis=1)
+
+
+@pytest.mark.parametrize("n_points", (1, 2, 17, 1000))
+def test_node_index_matches_brute_force(n_points):
+    rng = np.random.default_rng(seed=n_points)
+    x, y = rng.random(n_points), rng.random(n_points) * 10.0
+    qx, qy = rng.uniform(-1.0, 2.0, 500), rng.uniform(-5.0, 15.0, 500)
+
+    index = NodeIndex(x, y)
+
+    assert_array_equal(index.nearest(qx, qy), brute_force_nearest(x, y, qx, qy))
+
+
+def test_node_index_clustered_points():
+    rng = np.random.default_rng(seed=1945)
+    x = np.concatenate((rng.normal(0.0, 0.01, 500), rng.normal(100.0, 0.01, 5)))
+    y = np.concatenate((rng.normal(0.0, 0.01, 500), rng.normal(100.0, 0.01, 5)))
+    qx, qy = rng.uniform(-10.0, 110.0, 200), rng.uniform(-10.0, 110.0, 200)
+
+    index = NodeIndex(x, y)
+
+    assert_array_equal(index.nearest(qx, qy), brute_force_nearest(x, y, qx, qy))
+
+
+def test_node_index_collinear_points():
+    index = NodeIndex(np.arange(10.0), np.zeros(10))
+    assert_array_equal(index.nearest([-3.0, 4.4, 4.6, 20.0], 1.0), [0, 4, 5, 9])
+
+
+def test_node_index_query_shape():
+    index = NodeIndex([0.0, 1.0], [0.0, 0.0])
+    assert index.nearest(0.9, 0.0).shape == ()
+    assert index.nearest(np.zeros((2, 3)), 0.0).shape == (2, 3)
+
+
+def test_node_index_empty():
+    with pytest.raises(ValueError):
+        NodeIndex([], [])
+
+
+def test_face_index_mixed_polygons():
+    x = [0.0, 2.0, 4.0, 0.0, 2.0, 4.0, 2.0]
+    y = [0.0, 0.0, 0.0, 2.0, 2.0, 2.0, 4.0]
+    index = FaceIndex(x, y, [0, 4, 7, 10, 13], [0, 1, 4, 3, 1, 2, 5, 1, 5, 4, 3, 4, 6])
+
+    assert_array_equal(
+        index.locate(
+            [1.0, 3.5, 2.5, 1.5, 5.0, 1.0, 3.0],
+            [1.0, 0.5, 1.5, 3.0, 1.0, 3.5, 3.5],
+        ),
+        [0, 1, 2, 3, -1, -1, -1],
+    )
+
+
+def test_face_index_matches_grid_of_cells():
+    n_rows, n_cols = 7, 11
+    y, x = np.meshgrid(np.arange(n_rows + 1.0), np.arange(n_cols + 1.0), indexing="ij")
+    nodes = np.arange(x.size).reshape(x.shape)
+    vertices = np.stack(
+        (nodes[:-1, :-1], nodes[:-1, 1:], nodes[1:, 1:], nodes[1:, :-1]), axis=-1
+    ).reshape(-1)
+
+    index = FaceIndex(x, y, np.arange(0, vertices.size + 1, 4), vertices)
+
+    rng = np.random.default_rng(seed=1973)
+    qx, qy = rng.uniform(0.0, n_cols, 300), rng.uniform(0.0, n_rows, 300)
+    assert_array_equal(
+        index.locate(qx, qy), np.floor(qy).astype(int) * n_cols + np.floor(qx)
+    )
+
+
+def test_axis_helpers_with_one_coordinate():
+    assert_array_equal(nearest_on_axis(np.array([2.0]), [0.0, 5.0]), [0, 0])
+    assert_array_equal(cell_on_axis(np.array([0.0, 1.0]), [0.0, 1.0, 1.5]), [0, 0, -1])
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+from sensible_bmi._grid import SensibleUnstructuredGrid
+from sensible_bmi._stats import CallStats
+from sensible_bmi._stats import instrumented
+from sensible_bmi._var import SensibleInputOutputVar
+
+from testing.grids import bmi_two_squares
+
+
+class Thing:
+    def __init__(self, stats):
+        self._name = "thing"
+        self._stats = stats
+
+    @instrumented("double", nbytes=lambda self, rtn: rtn.nbytes)
+    def double(self, array):
+        return array * 2
+
+
+def test_stats_disabled_by_default():
+    stats = CallStats()
+    Thing(stats).double(np.ones(4))
+
+    assert not stats.enabled
+    assert stats.as_dict() == {}
+
+
+def test_stats_instrumented():
+    stats = CallStats()
+    stats.enable()
+    thing = Thing(stats)
+    thing.double(np.ones(4))
+    thing.double(np.ones(2))
+
+    actual = stats.as_dict()["double"]["thing"]
+    assert actual["calls"] == 2
+    assert actual["nbytes"] == 6 * 8
+    assert actual["seconds"] > 0.0
+
+
+def test_stats_disable_and_reset():
+    stats = CallStats(enabled=True)
+    stats.record("get", "foo", 1.0)
+    stats.disable()
+    stats.record("get", "foo", 1.0)
+
+    assert stats.as_dict()["get"]["foo"]["calls"] == 1
+
+    stats.reset()
+    assert stats.as_dict() == {}
+
+
+def test_stats_totals():
+    stats = CallStats(enabled=True)
+    stats.record("get", "foo", 1.0, nbytes=10)
+    stats.record("get", "bar", 2.0, nbytes=20)
+    stats.record("set", "foo", 4.0, nbytes=40)
+
+    assert stats.totals() == {
+        "get": {"calls": 2, "seconds": 3.0, "nbytes": 30},
+        "set": {"calls": 1, "seconds": 4.0, "nbytes": 40},
+    }
+
+
+def test_stats_to_json():
+    stats = CallStats(enabled=True)
+    stats.record("get", "foo", 1.0, nbytes=10)
+
+    actual = json.loads(stats.to_json())
+    assert actual["stats"] == stats.as_dict()
+    assert actual["totals"] == stats.totals()
+
+
+def test_stats_var(bmi_var):
+    stats = CallStats(enabled=True)
+    var = SensibleInputOutputVar(bmi_var(np.ones(10)), "foo", stats=stats)
+    var.get()
+    var.get()
+    var.set(1.0)
+
+    actual = stats.as_dict()
+    assert actual["get"]["foo"]["calls"] == 2
+    assert actual["get"]["foo"]["nbytes"] == 160
+    assert actual["set"]["foo"]["calls"] == 1
+    assert actual["set"]["foo"]["nbytes"] == 80
+
+
+def test_stats_var_at_indices(bmi_var):
+    stats = CallStats(enabled=True)
+    var = SensibleInputOutputVar(bmi_var(np.ones(10)), "foo", stats=stats)
+    var.get_at([0, 2, 4])
+    var[1]
+    var.set_at(slice(0, 6), 2.0)
+
+    actual = stats.as_dict()
+    assert actual["get_at"]["foo"]["calls"] == 2
+    assert actual["get_at"]["foo"]["nbytes"] == 32
+    assert actual["set_at"]["foo"]["calls"] == 1
+    assert actual["set_at"]["foo"]["nbytes"] == 48
+
+
+def test_stats_grid():
+    stats = CallStats(enabled=True)
+    grid = SensibleUnstructuredGrid(bmi_two_squares(), 3, stats=stats)
+    grid.x_of_node
+    grid.x_of_node
+    grid.face_nodes
+
+    actual = stats.as_dict()["fetch"]
+    assert actual["grid 3: x"] == {
+        "calls": 1,
+        "seconds": actual["grid 3: x"]["seconds"],
+        "nbytes": 48,
+    }
+    assert sorted(actual) == [
+        "grid 3: face_nodes",
+        "grid 3: nodes_per_face",
+        "grid 3: x",
+    ]
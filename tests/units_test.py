@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pytest
+from numpy.testing import assert_array_almost_equal
+from sensible_bmi._errors import ValidationError
+from sensible_bmi._units import Conversion
+from sensible_bmi._units import conversion
+from sensible_bmi._units import parse_units
+
+
+@pytest.mark.parametrize(
+    "src, dst, scale, offset",
+    (
+        ("m", "mm", 1000.0, 0.0),
+        ("mm", "m", 0.001, 0.0),
+        ("degC", "K", 1.0, 273.15),
+        ("K", "degC", 1.0, -273.15),
+        ("degF", "degC", 5.0 / 9.0, -32.0 * 5.0 / 9.0),
+        ("m3 s-1", "L d-1", 8.64e7, 0.0),
+        ("m/s", "km h-1", 3.6, 0.0),
+        ("kg/m2/s", "g m-2 d-1", 8.64e7, 0.0),
+        ("m.s-2", "m s^-2", 1.0, 0.0),
+        ("m**2", "ha", 1.0e-4, 0.0),
+        ("ft", "in", 12.0, 0.0),
+        ("Pa", "hPa", 0.01, 0.0),
+        ("1e3 m", "km", 1.0, 0.0),
+        ("%", "1", 0.01, 0.0),
+        ("deg", "rad", math.pi / 180.0, 0.0),
+        ("degree s-1", "mrad/s", 1000.0 * math.pi / 180.0, 0.0),
+        ("", "-", 1.0, 0.0),
+        ("m", "m", 1.0, 0.0),
+    ),
+)
+def test_conversion(src, dst, scale, offset):
+    convert = conversion(src, dst)
+    assert convert.scale == pytest.approx(scale)
+    assert convert.offset == pytest.approx(offset)
+
+
+@pytest.mark.parametrize(
+    "src, dst",
+    (
+        ("m", "s"),
+        ("degC", "m"),
+        ("kg m-2 s-1", "mm d-1"),
+        ("m2", "m3"),
+        ("deg", "1"),
+        ("rad", "%"),
+        ("rad s-1", "s-1"),
+    ),
+)
+def test_conversion_incompatible(src, dst):
+    with pytest.raises(ValidationError):
+        conversion(src, dst)
+
+
+@pytest.mark.parametrize("units", ("furlong", "m(2)", "degC m", "m degC-1", "kft"))
+def test_parse_bad_units(units):
+    with pytest.raises(ValidationError):
+        parse_units(units)
+
+
+def test_parse_units_prefixes():
+    assert parse_units("km").scale == 1000.0
+    assert parse_units("µm").scale == pytest.approx(1e-6)
+    assert parse_units("dam").scale == pytest.approx(10.0)
+    assert parse_units("kg") == parse_units("1000 g")
+    assert parse_units("cd").dims != parse_units("d").dims
+    assert parse_units("min").scale == 60.0
+
+
+def test_conversion_is_cached():
+    conversion.cache_clear()
+    parse_units.cache_clear()
+
+    first = conversion("m3 s-1", "L d-1")
+    parsed = parse_units.cache_info().misses
+
+    assert conversion("m3 s-1", "L d-1") is first
+    assert conversion.cache_info().hits == 1
+    assert parse_units.cache_info().misses == parsed
+    assert parse_units.cache_info().hits == 0
+
+
+def test_conversion_in_place():
+    values = np.array([0.0, 100.0])
+    out = conversion("degC", "degF")(values, out=values)
+    assert out is values
+    assert_array_almost_equal(values, [32.0, 212.0])
+
+
+def test_conversion_new_array():
+    values = np.array([1, 2])
+    out = conversion("m", "cm")(values)
+    assert out is not values
+    assert out.dtype == np.float64
+    assert_array_almost_equal(out, [100.0, 200.0])
+
+
+def test_identity_conversion():
+    convert = conversion("m", "m")
+    assert convert == Conversion(1.0, 0.0)
+    assert convert.is_identity
+
+    values, out = np.arange(3.0), np.empty(3)
+    assert convert(values, out=out) is out
+    assert_array_almost_equal(out, values)
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+from sensible_bmi._utils import as_cwd
+from sensible_bmi._utils import LazyMapping
+
+
+def test_lazy_mapping():
+    factory = Mock(side_effect=lambda key: key * 2)
+    mapping = LazyMapping(["a", "b"], factory)
+
+    factory.assert_not_called()
+    assert len(mapping) == 2
+    assert list(mapping) == ["a", "b"]
+    assert "a" in mapping
+    assert "c" not in mapping
+
+    assert mapping["a"] == "aa"
+    assert mapping["a"] == "aa"
+    factory.assert_called_once_with("a")
+    assert mapping.loaded == {"a"}
+
+    with pytest.raises(KeyError):
+        mapping["c"]
+
+
+def test_lazy_mapping_with_key_function():
+    find_keys = Mock(return_value=[1, 2, 3])
+    mapping = LazyMapping(find_keys, str)
+
+    find_keys.assert_not_called()
+    assert sorted(mapping) == [1, 2, 3]
+    assert 3 in mapping
+    find_keys.assert_called_once_with()
+
+
+def test_lazy_mapping_load():
+    factory = Mock(side_effect=str)
+    mapping = LazyMapping(range(3), factory)
+    mapping.load()
+
+    assert mapping.loaded == {0, 1, 2}
+    assert factory.call_count == 3
+    assert dict(mapping) == {0: "0", 1: "1", 2: "2"}
+    assert factory.call_count == 3
+
+
+def test_lazy_mapping_from_threads():
+    barrier = threading.Barrier(4, timeout=5.0)
+    factory = Mock(side_effect=lambda key: time.sleep(0.05) or key * 2)
+    mapping = LazyMapping([1, 2], factory)
+    values = []
+
+    def run():
+        barrier.wait()
+        values.append(mapping[1])
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert values == [2] * 4
+    assert factory.call_count == 1
+
+
+def test_as_cwd(tmpdir):
+    cwd = os.getcwd()
+    with as_cwd(str(tmpdir)) as prev:
+        assert prev == cwd
+        assert os.getcwd() == str(tmpdir)
+    assert os.getcwd() == cwd
+
+
+def test_as_cwd_restores_on_error(tmpdir):
+    cwd = os.getcwd()
+    with pytest.raises(ZeroDivisionError):
+        with as_cwd(str(tmpdir)):
+            1 / 0
+    assert os.getcwd() == cwd
+
+
+def test_as_cwd_nested(tmpdir):
+    cwd = os.getcwd()
+    inner = str(tmpdir.mkdir("inner"))
+    with as_cwd(str(tmpdir)):
+        with as_cwd(inner):
+            assert os.getcwd() == inner
+        assert os.getcwd() == str(tmpdir)
+    assert os.getcwd() == cwd
+
+
+def test_as_cwd_same_dir_is_concurrent(tmpdir):
+    barrier = threading.Barrier(3, timeout=5.0)
+    seen = []
+
+    def run():
+        with as_cwd(str(tmpdir)):
+            barrier.wait()
+            seen.append(os.getcwd())
+
+    threads = [threading.Thread(target=run) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert seen == [str(tmpdir)] * 3
+
+
+def test_as_cwd_different_dirs_are_serialized(tmpdir):
+    dirs = [str(tmpdir.mkdir(f"dir-{n}")) for n in range(4)]
+    cwd = os.getcwd()
+    errors = []
+
+    def run(path):
+        for _ in range(50):
+            with as_cwd(path):
+                if os.getcwd() != path:
+                    errors.append(os.getcwd())
+                with as_cwd(path):
+                    if os.getcwd() != path:
+                        errors.append(os.getcwd())
+
+    threads = [threading.Thread(target=run, args=(path,)) for path in dirs]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert os.getcwd() == cwd
+
+
+def test_as_cwd_is_fair(tmpdir):
+    dir_x, dir_y = str(tmpdir.mkdir("x")), str(tmpdir.mkdir("y"))
+    done = threading.Event()
+    counts = {dir_x: 0, dir_y: 0}
+
+    def run(path):
+        while not done.is_set():
+            with as_cwd(path):
+                counts[path] += 1
+                time.sleep(0.001)
+
+    threads = [threading.Thread(target=run, args=(path,)) for path in (dir_x,) * 4]
+    threads.append(threading.Thread(target=run, args=(dir_y,)))
+    for thread in threads:
+        thread.start()
+    time.sleep(0.5)
+    done.set()
+    for thread in threads:
+        thread.join()
+
+    assert counts[dir_y] > 10
+    assert counts[dir_x] > 10
+
+
+def test_as_cwd_nested_from_a_shared_dir(tmpdir):
+    dir_x = str(tmpdir.mkdir("x"))
+    dirs = [str(tmpdir.mkdir("y")), str(tmpdir.mkdir("z"))]
+    cwd = os.getcwd()
+    barrier = threading.Barrier(2, timeout=5.0)
+    seen = []
+
+    def run(path):
+        with as_cwd(dir_x):
+            barrier.wait()
+            with as_cwd(path):
+                seen.append((path, os.getcwd()))
+            seen.append((dir_x, os.getcwd()))
+
+    threads = [threading.Thread(target=run, args=(path,), daemon=True) for path in dirs]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5.0)
+
+    assert not any(thread.is_alive() for thread in threads)
+    assert sorted(seen) == sorted(
+        [(path, path) for path in dirs] + [(dir_x, dir_x)] * 2
+    )
+    assert os.getcwd() == cwd
@@ -5,13 +5,22 @@ from unittest.mock import Mock
 import numpy as np
 import pytest
 from numpy.testing import assert_array_equal
+from sensible_bmi._errors import ValidationError
+from sensible_bmi._pool import BufferPool
 from sensible_bmi._var import SensibleInputOutputVar
 from sensible_bmi._var import SensibleInputVar
 from sensible_bmi._var import SensibleOutputVar
 
 
 def bmi_var(
-    array, units="m", location="node", grid=0, dtype=None, itemsize=None, nbytes=None
+    array,
+    units="m",
+    location="node",
+    grid=0,
+    dtype=None,
+    itemsize=None,
+    nbytes=None,
+    ptr=False,
 ):
     mock = Mock()
     mock.get_var_units.return_value = units
@@ -25,6 +34,10 @@ def bmi_var(
 
     mock.get_value.side_effect = lambda name, out: np.copyto(out, array)
     mock.set_value.return_value = None
+    if ptr:
+        mock.get_value_ptr.return_value = array
+    else:
+        mock.get_value_ptr.side_effect = NotImplementedError("get_value_ptr")
 
     return mock
 
@@ -72,8 +85,8 @@ def test_var_out_structured_data(cls, dtype):
     assert var.itemsize == dt.itemsize
     assert var.nbytes == dt.itemsize * 10
     assert var.get().tobytes() == values.tobytes()
-    # with pytest.raises(ValueError):
-    #     var.data[0] = 1.0
+    with pytest.raises(ValueError):
+        var.data[0] = var.data[1]
 
     array = var.empty()
     assert array.dtype == var.type
@@ -89,10 +102,10 @@ def test_var_out(cls):
 
     assert var.size == 10
     assert all(var.get() == values)
-    # assert all(var.data == values)
-    # assert var.get() is not var.data
-    # with pytest.raises(ValueError):
-    #     var.data[0] = 1.0
+    assert all(var.data == values)
+    assert var.get() is not var.data
+    with pytest.raises(ValueError):
+        var.data[0] = 1.0
 
     array = var.empty()
     assert array.dtype == var.type
@@ -101,6 +114,49 @@ def test_var_out(cls):
     assert array.size == var.size
 
 
+@pytest.mark.parametrize("cls", (SensibleInputOutputVar, SensibleOutputVar))
+def test_var_out_data_is_zero_copy(cls):
+    values = np.random.rand(10)
+    bmi = bmi_var(values, ptr=True)
+    var = cls(bmi, "bar")
+
+    assert var.is_zero_copy
+    assert np.shares_memory(var.data, values)
+    assert var.data is var.data
+    with pytest.raises(ValueError):
+        var.data[0] = 1.0
+
+    values[0] = 42.0
+    assert var.data[0] == 42.0
+    bmi.get_value_ptr.assert_called_once_with("bar")
+    bmi.get_value.assert_not_called()
+
+
+@pytest.mark.parametrize("cls", (SensibleInputOutputVar, SensibleOutputVar))
+def test_var_out_data_without_value_ptr(cls):
+    values = np.random.rand(10)
+    var = cls(bmi_var(values), "bar")
+
+    assert not var.is_zero_copy
+    assert_array_equal(var.data, values)
+    assert not np.shares_memory(var.data, values)
+
+
+@pytest.mark.parametrize("cls", (SensibleInputOutputVar, SensibleOutputVar))
+@pytest.mark.parametrize(
+    "ptr", (np.zeros(3), np.zeros(10, dtype=int), np.zeros((10, 2))[:, 0], None)
+)
+def test_var_out_data_with_bad_value_ptr(cls, ptr):
+    values = np.random.rand(10)
+    bmi = bmi_var(values)
+    bmi.get_value_ptr.side_effect = None
+    bmi.get_value_ptr.return_value = ptr
+    var = cls(bmi, "bar")
+
+    assert not var.is_zero_copy
+    assert_array_equal(var.data, values)
+
+
 @pytest.mark.parametrize("cls", (SensibleInputOutputVar, SensibleOutputVar))
 def test_var_out_with_keyword(cls):
     expected = np.zeros(10)
@@ -128,8 +184,8 @@ def test_var_in(cls, dtype):
     assert var.size == 10
     with pytest.raises(AttributeError):
         var.get()
-    # with pytest.raises(AttributeError):
-    #     var.data
+    with pytest.raises(AttributeError):
+        var.data
     var.set(values)
 
 
@@ -167,3 +223,180 @@ def test_full(cls, dtype):
 
     assert_array_equal(var.full(1), var.ones())
     assert_array_equal(var.full(0), var.zeros())
+
+
+def bmi_var_at_indices(array):
+    mock = bmi_var(array)
+    mock.get_value_at_indices.side_effect = lambda name, out, inds: np.copyto(
+        out, array[inds]
+    )
+
+    def set_value_at_indices(name, inds, src):
+        array[inds] = src
+
+    mock.set_value_at_indices.side_effect = set_value_at_indices
+    return mock
+
+
+@pytest.mark.parametrize("cls", (SensibleInputOutputVar, SensibleOutputVar))
+@pytest.mark.parametrize(
+    "index",
+    (
+        [0, 3, 5],
+        [-1, 0],
+        np.array([9, 1]),
+        slice(2, 8, 3),
+        slice(None),
+        np.arange(10) % 2 == 0,
+        [],
+    ),
+)
+def test_var_get_at(cls, index):
+    values = np.random.rand(10)
+    bmi = bmi_var_at_indices(values)
+    var = cls(bmi, "bar")
+
+    assert_array_equal(var.get_at(index), values[index])
+    assert_array_equal(var[index], values[index])
+    bmi.get_value.assert_not_called()
+
+
+@pytest.mark.parametrize("cls", (SensibleInputOutputVar, SensibleOutputVar))
+def test_var_get_at_scalar(cls):
+    values = np.random.rand(10)
+    var = cls(bmi_var_at_indices(values), "bar")
+
+    assert var[3] == values[3]
+    assert var[-2] == values[-2]
+    assert_array_equal(var.get_at(3), values[3:4])
+
+
+@pytest.mark.parametrize("cls", (SensibleInputOutputVar, SensibleOutputVar))
+def test_var_get_at_with_out(cls):
+    values = np.random.rand(10)
+    var = cls(bmi_var_at_indices(values), "bar")
+
+    out = np.empty(3)
+    rtn = var.get_at([1, 2, 3], out=out)
+    assert rtn is out
+    assert_array_equal(out, values[1:4])
+
+
+@pytest.mark.parametrize("cls", (SensibleInputOutputVar, SensibleOutputVar))
+@pytest.mark.parametrize(
+    "index", (10, -11, [0, 10], np.ones(5, dtype=bool), [0.5], "foo")
+)
+def test_var_get_at_bad_index(cls, index):
+    var = cls(bmi_var_at_indices(np.random.rand(10)), "bar")
+
+    with pytest.raises(IndexError):
+        var[index]
+
+
+@pytest.mark.parametrize("cls", (SensibleInputOutputVar, SensibleInputVar))
+def test_var_set_at(cls):
+    values = np.zeros(10)
+    bmi = bmi_var_at_indices(values)
+    var = cls(bmi, "bar")
+
+    var.set_at([1, 3], [1.0, 3.0])
+    var[5:7] = 5.0
+    var[-1] = 9.0
+
+    assert_array_equal(values, [0, 1, 0, 3, 0, 5, 5, 0, 0, 9])
+    bmi.set_value.assert_not_called()
+
+
+@pytest.mark.parametrize("cls", (SensibleInputOutputVar, SensibleInputVar))
+def test_var_set_at_shape_mismatch(cls):
+    var = cls(bmi_var_at_indices(np.zeros(10)), "bar")
+
+    with pytest.raises(ValueError):
+        var.set_at([1, 2, 3], [1.0, 2.0])
+
+
+@pytest.mark.parametrize("cls", (SensibleInputOutputVar, SensibleOutputVar))
+def test_var_get_recycle(cls):
+    values = np.random.rand(10)
+    var = cls(bmi_var(values), "bar")
+
+    first = var.get(recycle=True)
+    var.release(first)
+    second = var.get(recycle=True)
+
+    assert second is first
+    assert_array_equal(second, values)
+    assert var.pool.stats["hits"] == 1
+    assert var.get() is not second
+
+
+@pytest.mark.parametrize("cls", (SensibleInputOutputVar, SensibleOutputVar))
+@pytest.mark.parametrize(
+    "func, expected", (("zeros", 0), ("ones", 1), ("full", 7), ("empty", None))
+)
+def test_var_recycle(cls, func, expected):
+    var = cls(bmi_var(np.random.rand(10)), "bar")
+    args = (7,) if func == "full" else ()
+
+    buffer = var.empty()
+    var.release(buffer)
+    actual = getattr(var, func)(*args, recycle=True)
+
+    assert actual is buffer
+    if expected is not None:
+        assert np.all(actual == expected)
+
+
+def test_var_shared_pool():
+    pool = BufferPool()
+    foo = SensibleOutputVar(bmi_var(np.random.rand(10)), "foo", pool=pool)
+    bar = SensibleOutputVar(bmi_var(np.random.rand(10)), "bar", pool=pool)
+
+    foo.release(foo.get())
+    assert bar.pool is pool
+    bar.get(recycle=True)
+    assert pool.stats["hits"] == 1
+
+
+@pytest.mark.parametrize("cls", (SensibleInputOutputVar, SensibleOutputVar))
+def test_var_get_with_units(cls):
+    values = np.arange(10.0)
+    var = cls(bmi_var(values, units="m"), "bar")
+
+    out = var.empty()
+    assert var.get(out=out, units="mm") is out
+    assert_array_equal(out, values * 1000.0)
+    assert_array_equal(var.get(units="m"), values)
+
+
+@pytest.mark.parametrize("cls", (SensibleInputOutputVar, SensibleInputVar))
+def test_var_set_with_units(cls):
+    values = np.arange(10.0)
+    bmi = bmi_var(values, units="K")
+    bmi.set_value.side_effect = lambda name, src: np.copyto(values, src)
+    var = cls(bmi, "bar")
+
+    celsius = np.arange(10.0)
+    var.set(celsius, units="degC")
+    assert_array_equal(values, np.arange(10.0) + 273.15)
+    assert_array_equal(celsius, np.arange(10.0))
+    assert var.pool.stats["misses"] == 1
+
+    var.set(0.0, units="degC")
+    assert_array_equal(values, 273.15)
+    assert var.pool.stats["hits"] == 1
+
+
+@pytest.mark.parametrize("cls", (SensibleInputOutputVar, SensibleOutputVar))
+def test_var_get_with_bad_units(cls):
+    var = cls(bmi_var(np.arange(10.0), units="m"), "bar")
+    with pytest.raises(ValidationError):
+        var.get(units="s")
+
+
+@pytest.mark.parametrize("cls", (SensibleInputOutputVar, SensibleOutputVar))
+def test_var_get_with_units_of_int_var(cls):
+    var = cls(bmi_var(np.arange(10), units="m"), "bar")
+    with pytest.raises(ValidationError):
+        var.get(units="mm")
+    assert_array_equal(var.get(units="m"), np.arange(10))